@@ -0,0 +1,203 @@
+"""
+Audio Buffer Module
+
+This module provides the `AudioBuffer` class, an in-memory 16 kHz mono float32 waveform that is
+decoded and resampled once and then handed directly to PyAnnote and Whisper. Writing the audio to
+disk is an optional archival step rather than a hand-off between pipeline stages.
+"""
+
+import wave
+from math import gcd
+
+import numpy as np
+
+from result_cache import content_hash
+
+SAMPLE_RATE = 16000  # Whisper and PyAnnote both work on 16 kHz mono audio
+
+
+class AudioBuffer:
+    """
+    A decoded, resampled audio waveform shared by the pipeline stages.
+
+    Attributes:
+        samples (numpy.ndarray): 16 kHz mono float32 samples in [-1, 1].
+        sample_rate (int): Sample rate of `samples` (always 16000).
+        source (str): Where the audio came from (file path or "memory"), for logging.
+    """
+
+    def __init__(self, samples, source="memory"):
+        """
+        Wrap an existing 16 kHz mono waveform.
+
+        Args:
+            samples (numpy.ndarray): 16 kHz mono samples; converted to contiguous float32 if needed.
+            source (str): Where the audio came from, for logging.
+        """
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = SAMPLE_RATE
+        self.source = source
+        self._content_hash = None
+
+    @classmethod
+    def from_file(cls, audio_path):
+        """
+        Decode an audio file once into a buffer (via ffmpeg, as Whisper does).
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            AudioBuffer: The decoded audio.
+        """
+        import whisper
+
+        return cls(whisper.load_audio(audio_path, sr=SAMPLE_RATE), source=audio_path)
+
+    @classmethod
+    def from_pcm(cls, pcm, rate, channels=1):
+        """
+        Build a buffer from 16-bit PCM audio, downmixing and resampling to 16 kHz mono.
+
+        Args:
+            pcm (bytes, memoryview or numpy.ndarray): Interleaved 16-bit PCM samples.
+            rate (int): Sample rate of the PCM audio.
+            channels (int): Number of interleaved channels.
+
+        Returns:
+            AudioBuffer: The converted audio.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16) if not isinstance(pcm, np.ndarray) else pcm
+        samples = samples.astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+        return cls(resample(samples, rate, SAMPLE_RATE))
+
+    @classmethod
+    def from_frames(cls, frames, rate, channels=1):
+        """
+        Build a buffer from the 16-bit PCM audio captured by `AudioRecorder`.
+
+        A `CaptureSegment` is converted straight from its samples and then released, so its backing
+        array goes back to the capture pool.
+
+        Args:
+            frames (CaptureSegment, bytes or list): A capture segment, raw PCM bytes, or a list of raw
+                                                    16-bit PCM byte strings.
+            rate (int): Sample rate of the recording.
+            channels (int): Number of interleaved channels.
+
+        Returns:
+            AudioBuffer: The converted audio.
+        """
+        if hasattr(frames, "release"):
+            try:
+                return cls.from_pcm(frames.samples, rate, channels)
+            finally:
+                frames.release()
+        if isinstance(frames, (bytes, bytearray, memoryview)):
+            return cls.from_pcm(frames, rate, channels)
+        return cls.from_pcm(b''.join(frames), rate, channels)
+
+    @property
+    def duration(self):
+        """
+        Length of the audio in seconds.
+        """
+        return len(self.samples) / self.sample_rate
+
+    def speech_only(self, vad=None, pad_ms=200, min_speech_ms=250):
+        """
+        Keep only the speech regions found by voice activity detection.
+
+        Args:
+            vad (VoiceActivityDetector): Detector to use. Defaults to an energy VAD.
+            pad_ms (int): Padding kept around each speech region.
+            min_speech_ms (int): Regions shorter than this are dropped.
+
+        Returns:
+            tuple: (AudioBuffer with the speech regions back to back, list of (start, end) regions in seconds).
+        """
+        from vad import speech_segments
+
+        regions = speech_segments(self.samples, self.sample_rate, vad=vad, pad_ms=pad_ms, min_speech_ms=min_speech_ms)
+        parts = [self.samples[int(start * self.sample_rate):int(end * self.sample_rate)] for start, end in regions]
+        samples = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+        return AudioBuffer(samples, source=self.source), regions
+
+    def content_hash(self):
+        """
+        SHA-256 of the decoded samples, computed once. Used as the cache key of the audio stages.
+
+        Returns:
+            str: The hex digest.
+        """
+        if self._content_hash is None:
+            self._content_hash = content_hash(self.samples)
+        return self._content_hash
+
+    def as_tensor(self):
+        """
+        Return the samples as a torch tensor that shares memory with the NumPy buffer.
+
+        Returns:
+            torch.Tensor: A (1, samples) float32 tensor.
+        """
+        import torch
+
+        return torch.from_numpy(self.samples).unsqueeze(0)
+
+    def to_pyannote(self):
+        """
+        Return the audio in the in-memory input format accepted by PyAnnote pipelines.
+
+        Returns:
+            dict: {"waveform": tensor, "sample_rate": 16000}
+        """
+        return {"waveform": self.as_tensor(), "sample_rate": self.sample_rate}
+
+    def to_pcm16(self):
+        """
+        Convert the samples to 16-bit PCM.
+
+        Returns:
+            numpy.ndarray: int16 samples.
+        """
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def save_wav(self, path):
+        """
+        Archive the audio as a 16 kHz mono 16-bit WAV file.
+
+        Args:
+            path (str): Output file path.
+
+        Returns:
+            str: The path of the written file.
+        """
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)  # 16-bit audio
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.to_pcm16().tobytes())
+        return path
+
+
+def resample(samples, source_rate, target_rate=SAMPLE_RATE):
+    """
+    Resample a float32 waveform with a polyphase filter.
+
+    Args:
+        samples (numpy.ndarray): float32 samples.
+        source_rate (int): Sample rate of `samples`.
+        target_rate (int): Desired sample rate.
+
+    Returns:
+        numpy.ndarray: The resampled float32 samples.
+    """
+    if source_rate == target_rate or not len(samples):
+        return samples
+    from scipy.signal import resample_poly
+
+    divisor = gcd(int(source_rate), int(target_rate))
+    return resample_poly(samples, target_rate // divisor, source_rate // divisor).astype(np.float32)
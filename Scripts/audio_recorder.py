@@ -2,8 +2,9 @@
 Audio Recorder Module
 
 This module provides functionality to record audio, detect silence, apply automatic gain control (AGC),
-and save the recorded audio to a WAV file. It includes a class `AudioRecorder` and a main entry point
-for direct script execution.
+and save the recorded audio to a WAV file. Captured audio is written into preallocated capture buffers
+(see `capture_buffer`) rather than kept as one bytes object per chunk. It includes a class
+`AudioRecorder` and a main entry point for direct script execution.
 """
 
 import pyaudio
@@ -11,6 +12,8 @@ import numpy as np
 import wave
 import os
 from datetime import datetime
+from capture_buffer import BufferPool, CaptureBuffer
+from vad import make_vad
 
 
 class AudioRecorder:
@@ -19,13 +22,17 @@ class AudioRecorder:
 
     Attributes:
         output_folder (str): Directory to save recordings.
-        silence_threshold (int): RMS threshold to detect silence.
+        silence_threshold (int): RMS threshold to detect silence when no VAD is used.
         silence_duration (float): Duration of silence to trigger auto-stop.
         target_rms (int): Target RMS for AGC.
         format (int): Audio format (default: pyaudio.paInt16).
         channels (int): Number of audio channels (default: 1).
         rate (int): Sampling rate (default: 44100 Hz).
         chunk (int): Buffer size for audio frames (default: 1024).
+        vad (VoiceActivityDetector): Voice activity detector deciding speech vs silence, or None to
+                                     compare each chunk's RMS with `silence_threshold`.
+        pool (BufferPool): Pool of preallocated capture arrays shared by the recordings.
+        capture (CaptureBuffer): Audio of the last `start_recording` call.
     """
 
     def __init__(
@@ -37,20 +44,23 @@ class AudioRecorder:
         format=pyaudio.paInt16,
         channels=1,
         rate=44100,
-        chunk=1024
+        chunk=1024,
+        vad="energy"
     ):
         """
         Initializes the AudioRecorder instance with default or user-provided settings.
 
         Args:
             output_folder (str): Directory to save recordings.
-            silence_threshold (int): RMS threshold to detect silence.
+            silence_threshold (int): RMS threshold to detect silence when no VAD is used.
             silence_duration (float): Duration of silence to trigger auto-stop.
             target_rms (int): Target RMS for AGC.
             format (int): Audio format.
             channels (int): Number of audio channels.
             rate (int): Sampling rate.
             chunk (int): Buffer size for audio frames.
+            vad (str or VoiceActivityDetector): "energy" (adaptive noise floor), "silero" (neural),
+                                                a detector instance, or None for the fixed RMS threshold.
         """
         self.output_folder = output_folder
         self.silence_threshold = silence_threshold
@@ -60,7 +70,9 @@ class AudioRecorder:
         self.channels = channels
         self.rate = rate
         self.chunk = chunk
-        self.frames = []
+        self.vad = make_vad(vad) if vad else None
+        self.pool = BufferPool(int(rate * 60), channels)
+        self.capture = None
         self.current_gain = 1.0
         self.is_recording = False
         self.stream = None
@@ -69,6 +81,27 @@ class AudioRecorder:
         # Ensure the output folder exists
         os.makedirs(self.output_folder, exist_ok=True)
 
+    def is_silence(self, audio_data, raw_rms):
+        """
+        Decide whether an audio chunk is silence.
+
+        Args:
+            audio_data (numpy.ndarray): Interleaved int16 samples of the chunk.
+            raw_rms (float): RMS of the chunk.
+
+        Returns:
+            bool: True if the chunk contains no speech.
+        """
+        if self.vad is None:
+            return raw_rms < self.silence_threshold
+        if hasattr(self.vad, "is_speech_rms"):
+            # The energy VAD only needs the level, which is already known
+            return not self.vad.is_speech_rms(raw_rms, len(audio_data) // self.channels, self.rate)
+        if self.channels > 1:
+            audio_data = audio_data[:len(audio_data) - len(audio_data) % self.channels]
+            audio_data = audio_data.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        return not self.vad.is_speech(audio_data, self.rate)
+
     def start_recording(self, auto_stop=True):
         """
         Starts recording audio. Optionally stops after a duration of silence.
@@ -84,13 +117,17 @@ class AudioRecorder:
             input=True,
             frames_per_buffer=self.chunk
         )
-        self.frames = []
+        if self.capture is None:
+            self.capture = CaptureBuffer(self.rate, self.channels, self.chunk, pool=self.pool)
+        self.capture.clear()
         self.is_recording = True
         print(f"Recording started (Auto-stop: {auto_stop})...")
         print(f"Press Ctrl+C to stop manually.\n")
 
         silence_counter = 0
         silence_chunks = int(self.silence_duration * self.rate / self.chunk)
+        if self.vad is not None:
+            self.vad.reset()
 
         try:
             while self.is_recording:
@@ -99,9 +136,9 @@ class AudioRecorder:
                 audio_data = np.frombuffer(raw_data, dtype=np.int16)
 
                 # Calculate RMS for silence detection
-                raw_rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2)) if len(audio_data) > 0 else 0
+                raw_rms = self.capture.rms(audio_data)
                 if auto_stop:
-                    if raw_rms < self.silence_threshold:
+                    if self.is_silence(audio_data, raw_rms):
                         silence_counter += 1
                     else:
                         silence_counter = 0
@@ -112,12 +149,11 @@ class AudioRecorder:
                         self.stop_recording()
                         break
 
-                # Apply Automatic Gain Control (AGC)
+                # Apply Automatic Gain Control (AGC) to the chunk in place
                 if raw_rms > 0:
                     desired_gain = self.target_rms / raw_rms
                     self.current_gain = 0.2 * self.current_gain + 0.8 * desired_gain
-                adjusted_data = np.clip(audio_data * self.current_gain, -32768, 32767).astype(np.int16)
-                self.frames.append(adjusted_data.tobytes())
+                self.capture.apply_gain(self.capture.append(audio_data), self.current_gain)
 
         except KeyboardInterrupt:
             # Handle manual stop
@@ -147,7 +183,7 @@ class AudioRecorder:
         Returns:
             str: Path to the saved file, or None if no audio was recorded.
         """
-        if not self.frames:
+        if self.capture is None or not len(self.capture):
             print("No audio to save.")
             return None
 
@@ -161,7 +197,7 @@ class AudioRecorder:
             wf.setnchannels(self.channels)
             wf.setsampwidth(2)  # 16-bit audio
             wf.setframerate(self.rate)
-            wf.writeframes(b''.join(self.frames))
+            wf.writeframes(memoryview(self.capture.samples()).cast("B"))
 
         print(f"Saved to: {os.path.abspath(filepath)}")
         return filepath
@@ -178,12 +214,16 @@ class AudioRecorder:
 
     # Listen for continuous audio input and process conversations
 
-    def listen_continuously(self, on_conversation_end):
+    def listen_continuously(self, on_conversation_end, on_conversation_start=None, on_audio=None):
         """
         Continuously listen for audio and process conversations when silence is detected.
 
         Args:
-            on_conversation_end (function): Callback function to process audio after a conversation ends.
+            on_conversation_end (function): Callback function to process audio after a conversation ends. It
+                                            receives a `CaptureSegment` and must `release` it when done.
+            on_conversation_start (function): Optional callback called when sound starts a new conversation.
+            on_audio (function): Optional callback called with each raw audio chunk of the conversation while
+                                 it is being recorded (e.g. to transcribe it as it goes).
         """
         self.audio = pyaudio.PyAudio()
         self.stream = self.audio.open(
@@ -197,8 +237,10 @@ class AudioRecorder:
 
         silence_counter = 0
         silence_chunks = int(self.silence_duration * self.rate / self.chunk)
-        conversation_frames = []
+        conversation = CaptureBuffer(self.rate, self.channels, self.chunk, pool=self.pool)
         recording = False  # Flag to indicate if we are currently recording
+        if self.vad is not None:
+            self.vad.reset()
 
         try:
             while True:
@@ -207,28 +249,32 @@ class AudioRecorder:
                 audio_data = np.frombuffer(raw_data, dtype=np.int16)
 
                 # Calculate RMS for silence detection
-                raw_rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2)) if len(audio_data) > 0 else 0
+                raw_rms = conversation.rms(audio_data)
 
-                # Check if the audio level is below the silence threshold
-                if raw_rms < self.silence_threshold:
+                # Check if the chunk contains speech
+                silent = self.is_silence(audio_data, raw_rms)
+                if silent:
                     silence_counter += 1
                 else:
                     silence_counter = 0
 
-                # Start recording only when sound is detected
-                if raw_rms >= self.silence_threshold and not recording:
+                # Start recording only when speech is detected
+                if not silent and not recording:
                     print("Beginning to record...")
                     recording = True
+                    if on_conversation_start:
+                        on_conversation_start()
 
                 # Add audio data to the current conversation if recording
                 if recording:
-                    conversation_frames.append(raw_data)
+                    conversation.append(audio_data)
+                    if on_audio:
+                        on_audio(raw_data)
 
                 # If silence duration is exceeded, process the conversation
                 if silence_counter >= silence_chunks and recording:
                     print("Silence detected. Processing conversation...")
-                    on_conversation_end(conversation_frames)
-                    conversation_frames = []
+                    on_conversation_end(conversation.take())
                     silence_counter = 0  # Reset silence counter
                     recording = False  # Reset recording flag
 
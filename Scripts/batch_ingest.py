@@ -0,0 +1,219 @@
+"""
+Batch Ingest Module
+
+This module provides the building blocks of the offline batch mode: finding the recordings to
+process (a directory, a glob pattern or a JSONL manifest), a JSONL checkpoint that lets an
+interrupted backfill resume where it left off, and the throughput report written at the end.
+The `BatchCheckpoint` class is the main component of this module.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".webm")
+
+
+def recording_id(path):
+    """
+    Build a file-name-safe identifier for a recording.
+
+    The file stem keeps the outputs recognizable; a short hash of the full path keeps recordings
+    with the same name in different folders apart.
+
+    Args:
+        path (str): Path to the recording.
+
+    Returns:
+        str: The identifier, e.g. "call_0412_3f9a1c2b".
+    """
+    stem = re.sub(r"[^\w-]+", "_", os.path.splitext(os.path.basename(path))[0]).strip("_") or "recording"
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+
+def find_recordings(source):
+    """
+    List the recordings to process.
+
+    Args:
+        source (str): A directory (searched recursively for audio files), a glob pattern, or a
+                      JSONL manifest with one {"path": ..., "id": ...} object per line. Relative
+                      manifest paths are resolved against the manifest's folder; "id" is optional.
+
+    Returns:
+        list: A list of {"path", "id"} dictionaries, in a stable order.
+    """
+    if source.endswith(".jsonl") and os.path.isfile(source):
+        base = os.path.dirname(os.path.abspath(source))
+        recordings = []
+        with open(source, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping manifest line {number}: {e}")
+                    continue
+                path = entry.get("path") or entry.get("audio")
+                if not path:
+                    print(f"Skipping manifest line {number}: no path")
+                    continue
+                path = os.path.normpath(os.path.join(base, path))
+                recordings.append({"path": path, "id": entry.get("id") or recording_id(path)})
+        return recordings
+
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(AUDIO_EXTENSIONS))
+    else:
+        paths = [path for path in glob.glob(source, recursive=True) if os.path.isfile(path)]
+
+    return [{"path": path, "id": recording_id(path)} for path in sorted(paths)]
+
+
+class BatchCheckpoint:
+    """
+    An append-only JSONL log of finished recordings.
+
+    Every finished recording is appended and flushed to disk immediately, so after a crash the
+    next run skips everything that completed, including recordings that turned out to have no
+    speech. A recording is only skipped if its size is unchanged; failed recordings are retried.
+
+    Attributes:
+        path (str): Path to the checkpoint file.
+        entries (dict): Latest checkpoint entry per absolute recording path.
+    """
+
+    def __init__(self, path):
+        """
+        Open a checkpoint file, loading the entries of previous runs if it exists.
+
+        Args:
+            path (str): Path to the checkpoint file.
+        """
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by a crash
+                    self.entries[entry["path"]] = entry
+            print(f"Loaded {len(self.entries)} checkpoint entries from {path}")
+
+    def is_done(self, path):
+        """
+        Check whether a recording was already processed (successfully or found empty).
+
+        Args:
+            path (str): Path to the recording.
+
+        Returns:
+            bool: True if the recording can be skipped.
+        """
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry["status"] not in ("done", "empty"):
+            return False
+        try:
+            return os.path.getsize(path) == entry.get("size")
+        except OSError:
+            return False
+
+    def record(self, path, status, **details):
+        """
+        Append the outcome of a recording to the checkpoint.
+
+        Args:
+            path (str): Path to the recording.
+            status (str): "done", "empty" or "failed".
+            **details: Extra fields to store (job id, duration, processing time, error).
+        """
+        path = os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        entry = dict(path=path, status=status, size=size, finished_at=datetime.now().isoformat(), **details)
+
+        with self._lock:
+            self.entries[path] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def throughput_report(results, wall_seconds, skipped=0, workers=1):
+    """
+    Summarize a batch run.
+
+    Args:
+        results (list): One dictionary per processed recording with "status", "duration" (audio
+                        seconds) and "seconds" (processing time).
+        wall_seconds (float): Wall time of the whole run.
+        skipped (int): Number of recordings skipped thanks to the checkpoint.
+        workers (int): Number of parallel workers used.
+
+    Returns:
+        dict: Counts, audio hours processed, recordings per hour, real-time factor and per-recording
+              latency percentiles.
+    """
+    counts = {"done": 0, "empty": 0, "failed": 0}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    audio_seconds = sum(result.get("duration") or 0.0 for result in results)
+    times = sorted(result["seconds"] for result in results)
+
+    def percentile(fraction):
+        return times[min(len(times) - 1, int(len(times) * fraction))] if times else 0.0
+
+    wall_seconds = max(wall_seconds, 1e-9)
+    return {
+        "workers": workers,
+        "recordings": len(results) + skipped,
+        "processed": len(results),
+        "skipped": skipped,
+        **counts,
+        "wall_seconds": round(wall_seconds, 2),
+        "audio_hours": round(audio_seconds / 3600.0, 3),
+        "recordings_per_hour": round(3600.0 * len(results) / wall_seconds, 2),
+        "realtime_factor": round(audio_seconds / wall_seconds, 2),  # Audio seconds processed per wall second
+        "seconds_mean": round(sum(times) / len(times), 2) if times else 0.0,
+        "seconds_p50": round(percentile(0.5), 2),
+        "seconds_p95": round(percentile(0.95), 2),
+    }
+
+
+def write_report(report, path):
+    """
+    Write a throughput report as JSON and print it.
+
+    Args:
+        report (dict): The report from `throughput_report`.
+        path (str): Output file path.
+
+    Returns:
+        str: The path of the written report.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nBatch report saved to {path}")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+    return path
+
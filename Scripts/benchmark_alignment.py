@@ -0,0 +1,133 @@
+"""
+Speaker Alignment Benchmark
+
+This script compares the original segment-by-turn scan used to align diarization with transcription
+against the sorted interval index in `speaker_alignment`, on synthetic hour-long calls with thousands
+of speaker turns. It reports the run time of both approaches and how many segments each one labels
+with the speaker that actually spoke most of the segment.
+"""
+
+import argparse
+import random
+import time
+
+from speaker_alignment import align_segments, format_utterances
+
+
+class SyntheticTurn:
+    """A stand-in for `pyannote.core.Segment`."""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class SyntheticDiarization:
+    """A stand-in for `pyannote.core.Annotation` that only supports `itertracks`."""
+
+    def __init__(self, turns):
+        self.turns = turns
+
+    def itertracks(self, yield_label=False):
+        for start, end, label in self.turns:
+            yield SyntheticTurn(start, end), None, label
+
+
+def generate_call(duration=3600.0, speakers=3, mean_turn=1.5, mean_segment=4.0, seed=0):
+    """
+    Generate diarization turns and Whisper-like segments for a synthetic call.
+
+    Segment boundaries are placed independently of the turn boundaries (as Whisper does), so many
+    segments straddle a speaker change.
+
+    Args:
+        duration (float): Call length in seconds.
+        speakers (int): Number of speakers.
+        mean_turn (float): Mean turn length in seconds.
+        mean_segment (float): Mean segment length in seconds.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: (turns, segments, expected) where `expected` is the majority speaker of each segment.
+    """
+    rng = random.Random(seed)
+    turns, time_cursor, speaker = [], 0.0, 0
+    while time_cursor < duration:
+        length = rng.expovariate(1.0 / mean_turn) + 0.2
+        turns.append((time_cursor, min(duration, time_cursor + length), f"SPEAKER_{speaker:02d}"))
+        time_cursor += length + rng.uniform(0.0, 0.3)
+        speaker = (speaker + rng.randint(1, speakers - 1)) % speakers
+
+    segments, time_cursor = [], 0.0
+    while time_cursor < duration:
+        length = rng.uniform(0.5, 2 * mean_segment)
+        segments.append({"start": time_cursor, "end": min(duration, time_cursor + length), "text": " word" * 8})
+        time_cursor += length
+
+    expected = []
+    for segment in segments:
+        overlaps = {}
+        for start, end, label in turns:
+            overlap = min(segment["end"], end) - max(segment["start"], start)
+            if overlap > 0:
+                overlaps[label] = overlaps.get(label, 0.0) + overlap
+        expected.append(max(overlaps, key=overlaps.get) if overlaps else None)
+    return turns, segments, expected
+
+
+def legacy_alignment(diarization_result, transcription_segments):
+    """
+    The original alignment: rescan all turns per segment and accept only a fully containing turn.
+    """
+    transcript_with_speakers = ""
+    labels = []
+    for segment in transcription_segments:
+        speaker = "Speaker"
+        for turn, _, speaker_label in diarization_result.itertracks(yield_label=True):
+            if turn.start <= segment["start"] and turn.end >= segment["end"]:
+                speaker = speaker_label
+                break
+        labels.append(speaker)
+        transcript_with_speakers += f"{speaker}: {segment['text']}\n"
+    return transcript_with_speakers, labels
+
+
+def accuracy(labels, expected):
+    scored = [(label, truth) for label, truth in zip(labels, expected) if truth is not None]
+    return sum(label == truth for label, truth in scored) / max(1, len(scored))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speaker alignment on synthetic calls.")
+    parser.add_argument("--duration", type=float, default=3600.0, help="Call length in seconds.")
+    parser.add_argument("--speakers", type=int, default=3, help="Number of speakers.")
+    parser.add_argument("--mean-turn", type=float, default=1.5, help="Mean turn length in seconds.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per approach.")
+    args = parser.parse_args()
+
+    turns, segments, expected = generate_call(args.duration, args.speakers, args.mean_turn)
+    diarization = SyntheticDiarization(turns)
+    print(f"Synthetic call: {args.duration:.0f}s, {len(turns)} turns, {len(segments)} segments")
+
+    legacy_times, legacy_labels = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        _, legacy_labels = legacy_alignment(diarization, segments)
+        legacy_times.append(time.perf_counter() - start)
+
+    indexed_times, utterances = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        utterances = align_segments(turns, segments)
+        format_utterances(utterances)
+        indexed_times.append(time.perf_counter() - start)
+
+    print(f"Legacy scan:    best {min(legacy_times) * 1000:9.1f} ms, "
+          f"accuracy {accuracy(legacy_labels, expected):.1%}")
+    print(f"Interval index: best {min(indexed_times) * 1000:9.1f} ms, "
+          f"accuracy {accuracy([u[0] for u in utterances], expected):.1%}")
+    print(f"Speed-up: {min(legacy_times) / min(indexed_times):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Capture Buffer Module
+
+This module provides preallocated storage for captured audio. Chunks are copied straight into a
+growable int16 NumPy array instead of being kept as one `bytes` object each, RMS and automatic gain
+control run in place with a reusable float32 scratch array, and finished segments are handed to
+consumers as zero-copy views. Backing arrays come from a small pool and return to it when a
+consumer releases its segment, so a long shift reuses the same few arrays instead of allocating
+per chunk. The `CaptureBuffer` class is the main component of this module.
+"""
+
+import threading
+
+import numpy as np
+
+
+class BufferPool:
+    """
+    A pool of reusable int16 arrays.
+
+    Only arrays of the default capacity are kept: the larger ones a long conversation grows into are
+    left to the garbage collector on release, so one long call does not pin its whole doubling chain.
+
+    Attributes:
+        frames (int): Default capacity of new arrays, in frames.
+        channels (int): Interleaved channels per frame.
+        max_pooled (int): Maximum number of idle arrays kept for reuse.
+        allocated (int): Number of arrays allocated so far.
+        reused (int): Number of times an idle array was reused.
+    """
+
+    def __init__(self, frames, channels=1, max_pooled=8):
+        self.frames = frames
+        self.channels = channels
+        self.max_pooled = max_pooled
+        self.allocated = 0
+        self.reused = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self, min_frames=0):
+        """
+        Get an array with room for at least `min_frames` frames.
+
+        Args:
+            min_frames (int): Minimum capacity in frames.
+
+        Returns:
+            numpy.ndarray: A 1-D int16 array (contents undefined).
+        """
+        needed = max(min_frames, self.frames) * self.channels
+        with self._lock:
+            for i, array in enumerate(self._idle):
+                if len(array) >= needed:
+                    self.reused += 1
+                    return self._idle.pop(i)
+            self.allocated += 1
+        return np.empty(needed, dtype=np.int16)
+
+    def release(self, array):
+        """
+        Return an array to the pool. Arrays larger than the default capacity are dropped.
+
+        Args:
+            array (numpy.ndarray): An array obtained from `acquire`.
+        """
+        if len(array) > self.frames * self.channels:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_pooled:
+                self._idle.append(array)
+
+
+class CaptureSegment:
+    """
+    A finished piece of captured audio, viewed without copying.
+
+    Call `release` once the audio has been consumed so the backing array can be reused.
+
+    Attributes:
+        rate (int): Sample rate.
+        channels (int): Interleaved channels.
+        source_id (str): Identifier of the capture source, if any.
+    """
+
+    def __init__(self, array, length, rate, channels=1, pool=None, source_id=None):
+        self._array = array
+        self._length = length
+        self._pool = pool
+        self.rate = rate
+        self.channels = channels
+        self.source_id = source_id
+
+    @property
+    def samples(self):
+        """
+        Interleaved int16 samples (a view into the backing array).
+        """
+        if self._array is None:
+            raise ValueError("Capture segment was released")
+        return self._array[:self._length]
+
+    @property
+    def view(self):
+        """
+        The samples as a byte memoryview, e.g. for `wave.writeframes`.
+        """
+        return memoryview(self.samples).cast("B")
+
+    @property
+    def duration(self):
+        """
+        Length of the segment in seconds.
+        """
+        return self._length / self.channels / self.rate
+
+    def __len__(self):
+        return self._length // self.channels
+
+    def tobytes(self):
+        """
+        Copy the samples into a `bytes` object (for pickling to another process).
+        """
+        return self.samples.tobytes()
+
+    def release(self):
+        """
+        Give the backing array back to its pool. The segment cannot be used afterwards.
+        """
+        if self._array is not None and self._pool is not None:
+            self._pool.release(self._array)
+        self._array = None
+
+
+class CaptureBuffer:
+    """
+    A growable, preallocated int16 buffer that captured chunks are written into.
+
+    Attributes:
+        rate (int): Sample rate.
+        channels (int): Interleaved channels.
+        pool (BufferPool): Pool the backing arrays come from.
+    """
+
+    def __init__(self, rate, channels=1, chunk=1024, initial_seconds=60, pool=None):
+        """
+        Initialize the buffer.
+
+        Args:
+            rate (int): Sample rate.
+            channels (int): Interleaved channels.
+            chunk (int): Expected chunk size in frames (sizes the scratch array).
+            initial_seconds (float): Initial capacity; the buffer doubles when it fills up.
+            pool (BufferPool): Pool to share with other buffers. A new one is created if None.
+        """
+        self.rate = rate
+        self.channels = channels
+        self.pool = pool or BufferPool(int(rate * initial_seconds), channels)
+        self._array = self.pool.acquire()
+        self._length = 0
+        self._scratch = np.empty(chunk * channels, dtype=np.float32)
+
+    def __len__(self):
+        return self._length // self.channels
+
+    @property
+    def duration(self):
+        """
+        Length of the buffered audio in seconds.
+        """
+        return self._length / self.channels / self.rate
+
+    def append(self, data):
+        """
+        Copy a chunk into the buffer, growing it if needed.
+
+        Args:
+            data (bytes or numpy.ndarray): Interleaved 16-bit PCM.
+
+        Returns:
+            numpy.ndarray: A view of the chunk inside the buffer, which can be modified in place.
+        """
+        chunk = np.frombuffer(data, dtype=np.int16) if not isinstance(data, np.ndarray) else data
+        end = self._length + len(chunk)
+        if end > len(self._array):
+            # Double the capacity so growth is amortized
+            grown = self.pool.acquire(max(end, 2 * len(self._array)) // self.channels + 1)
+            grown[:self._length] = self._array[:self._length]
+            self.pool.release(self._array)
+            self._array = grown
+        view = self._array[self._length:end]
+        view[:] = chunk
+        self._length = end
+        return view
+
+    def _as_float(self, view):
+        if len(view) > len(self._scratch):
+            self._scratch = np.empty(len(view), dtype=np.float32)
+        scratch = self._scratch[:len(view)]
+        np.copyto(scratch, view, casting="unsafe")
+        return scratch
+
+    def rms(self, view):
+        """
+        RMS of a chunk, computed in the scratch array.
+
+        Args:
+            view (numpy.ndarray): int16 samples (e.g. returned by `append`).
+
+        Returns:
+            float: The RMS in int16 units.
+        """
+        if not len(view):
+            return 0.0
+        scratch = self._as_float(view)
+        return float(np.sqrt(np.dot(scratch, scratch) / len(scratch)))
+
+    def apply_gain(self, view, gain):
+        """
+        Multiply a chunk by a gain in place, clipping to the int16 range.
+
+        Args:
+            view (numpy.ndarray): int16 samples inside the buffer.
+            gain (float): Linear gain.
+        """
+        scratch = self._as_float(view)
+        np.multiply(scratch, gain, out=scratch)
+        np.clip(scratch, -32768, 32767, out=scratch)
+        np.copyto(view, scratch, casting="unsafe")
+
+    def samples(self):
+        """
+        The buffered samples as a view (valid until the next `append`, `take` or `clear`).
+        """
+        return self._array[:self._length]
+
+    def take(self, source_id=None):
+        """
+        Hand the buffered audio off as a segment and continue in a fresh array from the pool.
+
+        Args:
+            source_id (str): Identifier of the capture source to tag the segment with.
+
+        Returns:
+            CaptureSegment: The buffered audio. Call `release` on it when done.
+        """
+        segment = CaptureSegment(self._array, self._length, self.rate, self.channels, self.pool, source_id)
+        self._array = self.pool.acquire()
+        self._length = 0
+        return segment
+
+    def clear(self):
+        """
+        Drop the buffered audio, keeping the array.
+        """
+        self._length = 0
@@ -0,0 +1,436 @@
+"""
+Capture Engine Module
+
+This module provides non-blocking continuous capture. PortAudio delivers audio through a stream
+callback that only copies each chunk into a lock-free single-producer/single-consumer ring buffer.
+A segmentation thread drains the ring, runs silence detection and cuts conversations, and a separate
+dispatch thread runs the (possibly slow) conversation callbacks, so downstream processing can never
+stall capture. Overflow and drop counters show whether any audio was lost and where. A
+`WavInputStream` replays a WAV file through the same callback interface for tests and offline runs.
+The `CaptureEngine` class is the main component of this module.
+"""
+
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+import pyaudio
+
+from capture_buffer import BufferPool, CaptureBuffer
+
+_STOP = object()  # Sentinel that tells the dispatch thread to exit
+
+
+class SampleRing:
+    """
+    A lock-free single-producer/single-consumer ring of int16 samples.
+
+    The producer only advances the write counter and the consumer only advances the read counter,
+    each after copying the samples, so neither side ever takes a lock (assigning an int is atomic).
+    When the ring is full the producer drops the newest audio and counts it instead of blocking.
+
+    Attributes:
+        capacity (int): Size of the ring in samples.
+        channels (int): Interleaved channels per frame.
+        dropped (int): Samples dropped because the ring was full.
+        high_water (int): Largest number of samples waiting in the ring at once.
+    """
+
+    def __init__(self, frames, channels=1):
+        self.channels = channels
+        self._data = np.zeros(frames * channels, dtype=np.int16)
+        self.capacity = len(self._data)
+        self._written = 0  # Total samples written; only the producer changes it
+        self._read = 0     # Total samples read; only the consumer changes it
+        self.dropped = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return self._written - self._read
+
+    def write(self, data):
+        """
+        Copy samples into the ring (producer side).
+
+        Args:
+            data (bytes or numpy.ndarray): Interleaved 16-bit PCM.
+
+        Returns:
+            int: Number of samples written; the rest were dropped.
+        """
+        samples = np.frombuffer(data, dtype=np.int16) if not isinstance(data, np.ndarray) else data
+        free = self.capacity - (self._written - self._read)
+        if len(samples) > free:
+            free -= free % self.channels  # Keep whole frames
+            self.dropped += len(samples) - free
+            samples = samples[:free]
+
+        start = self._written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self._written += len(samples)  # Publish only after the samples are in place
+        self.high_water = max(self.high_water, self._written - self._read)
+        return len(samples)
+
+    def read_into(self, out):
+        """
+        Move up to `len(out)` samples out of the ring (consumer side).
+
+        Args:
+            out (numpy.ndarray): int16 array to copy the samples into.
+
+        Returns:
+            int: Number of samples copied.
+        """
+        count = min(len(out), self._written - self._read)
+        start = self._read % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:count] = self._data[:count - first]
+        self._read += count
+        return count
+
+
+class WavInputStream:
+    """
+    A stand-in for a PyAudio callback input stream that plays a WAV file into the callback.
+
+    Unlike a device, a file can wait for its consumers: at full speed (`speed=None`) each chunk is
+    held back until every ring in `rings` has room for it, so no audio is dropped.
+
+    Attributes:
+        path (str): The WAV file.
+        chunk (int): Frames per callback.
+        speed (float): Playback speed relative to real time, or None to feed as fast as the rings drain.
+        rings (list): `SampleRing`s the callback writes into; at full speed the file waits for room in them.
+    """
+
+    def __init__(self, path, callback, chunk=1024, speed=1.0, rings=None):
+        """
+        Open the WAV file.
+
+        Args:
+            path (str): 16-bit PCM WAV file.
+            callback (callable): PyAudio-style callback `callback(in_data, frame_count, time_info, status)`.
+            chunk (int): Frames per callback.
+            speed (float): Playback speed relative to real time, or None to feed as fast as the rings drain.
+            rings (list): Rings to wait for at full speed; can be set after opening.
+        """
+        self.path = path
+        self.chunk = chunk
+        self.speed = speed
+        self.rings = rings or []
+        self._callback = callback
+        self._wav = wave.open(path, "rb")
+        if self._wav.getsampwidth() != 2:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        self.rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self._active = False
+        self._thread = None
+
+    def start_stream(self):
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name="wav-input", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        started = time.perf_counter()
+        played = 0
+        while self._active:
+            data = self._wav.readframes(self.chunk)
+            if not data:
+                break
+            frames = len(data) // (2 * self.channels)
+            played += frames
+            if not self.speed:
+                self._wait_for_space(frames)
+            if self._callback(data, self.chunk, {}, 0)[1] != pyaudio.paContinue:
+                break
+            if self.speed:
+                delay = started + played / self.rate / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self._active = False
+
+    def _wait_for_space(self, frames):
+        while self._active and any(ring.capacity - len(ring) < frames * ring.channels for ring in self.rings):
+            time.sleep(0.001)
+
+    def is_active(self):
+        return self._active
+
+    def stop_stream(self):
+        self._active = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        self.stop_stream()
+        self._wav.close()
+
+
+class CaptureEngine:
+    """
+    Callback-driven continuous capture with segmentation and dispatch off the audio thread.
+
+    Threads:
+        PortAudio callback  Copies each chunk into the ring; never blocks.
+        capture-segmenter   Drains the ring, detects silence, cuts conversations into capture buffers.
+        capture-dispatch    Runs the start/audio/end callbacks in order. Its queue is unbounded, so a
+                            slow callback only delays processing, never capture.
+
+    Attributes:
+        recorder (AudioRecorder): Recorder whose format, silence settings and VAD are used.
+        source_id (str): Identifier the conversations of this engine are tagged with.
+        gain (float): Input gain applied to every chunk before silence detection.
+        ring (SampleRing): Ring between the audio callback and the segmenter.
+        input_overflows (int): Callbacks in which PortAudio reported lost input (the segmenter is not
+                               involved; this means the callback itself ran late).
+        conversations (int): Conversations cut so far.
+    """
+
+    def __init__(self, recorder, on_conversation_end, on_conversation_start=None, on_audio=None, ring_seconds=10.0,
+                 input_wav=None, speed=1.0, source_id=None, gain=1.0, device_index=None, external_input=False,
+                 audio=None):
+        """
+        Initialize the capture engine.
+
+        Args:
+            recorder (AudioRecorder): Recorder whose format, silence settings and VAD are used.
+            on_conversation_end (function): Called with a `CaptureSegment` when a conversation ends; it
+                                            must `release` the segment when done.
+            on_conversation_start (function): Optional callback called when sound starts a new conversation.
+            on_audio (function): Optional callback called with each raw chunk of the conversation.
+            ring_seconds (float): Audio the ring can hold while the segmenter catches up.
+            input_wav (str): Capture from this WAV file through `WavInputStream` instead of the microphone.
+                             The recorder is switched to the file's sample rate and channels.
+            speed (float): Playback speed of `input_wav` relative to real time, or None for as fast as possible.
+            source_id (str): Identifier the conversations are tagged with (`CaptureSegment.source_id`).
+            gain (float): Input gain applied to every chunk, e.g. to level microphones of different sensitivity.
+            device_index (int): PyAudio input device; None for the default device.
+            external_input (bool): Do not open a stream; audio is pushed with `feed` (e.g. one channel of
+                                   a multichannel interface).
+            audio (pyaudio.PyAudio): PyAudio instance to open the stream with, shared between engines.
+        """
+        self.recorder = recorder
+        self.on_conversation_end = on_conversation_end
+        self.on_conversation_start = on_conversation_start
+        self.on_audio = on_audio
+        self.input_wav = input_wav
+        self.speed = speed
+        self.source_id = source_id
+        self.gain = gain
+        self.device_index = device_index
+        self.external_input = external_input
+        self.rate = recorder.rate
+        self.channels = recorder.channels
+        self.chunk = recorder.chunk
+
+        self.stream = None
+        self.audio = audio
+        self._owns_audio = audio is None
+        if input_wav is not None:
+            self.stream = WavInputStream(input_wav, self._on_input, chunk=self.chunk, speed=speed)
+            if (self.stream.rate, self.stream.channels) != (self.rate, self.channels):
+                # Segments are decoded with the recorder's format, so it has to follow the file
+                print(f"Capturing {input_wav} at {self.stream.rate} Hz, {self.stream.channels} channel(s).")
+                self.rate = recorder.rate = self.stream.rate
+                if self.stream.channels != self.channels:
+                    self.channels = recorder.channels = self.stream.channels
+                    recorder.pool = BufferPool(int(self.rate * 60), self.channels)
+
+        self.ring = SampleRing(int(ring_seconds * self.rate), self.channels)
+        if self.stream is not None:
+            self.stream.rings = [self.ring]
+        self.input_overflows = 0
+        self.callbacks = 0
+        self.conversations = 0
+        self._data_ready = threading.Event()
+        self._stopping = threading.Event()
+        self._events = queue.Queue()
+        self._flush = True
+        self._segmenter = None
+        self._dispatcher = None
+
+    def feed(self, in_data, status=0):
+        """
+        Push captured audio into the ring. Safe to call from an audio callback.
+
+        Args:
+            in_data (bytes or numpy.ndarray): Interleaved 16-bit PCM in the engine's format.
+            status (int): PortAudio status flags of the callback that delivered it.
+        """
+        self.callbacks += 1
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        self._data_ready.set()
+
+    def _on_input(self, in_data, frame_count, time_info, status):
+        # Runs on the PortAudio thread: copy and return, nothing else
+        self.feed(in_data, status)
+        return None, pyaudio.paContinue
+
+    def start(self):
+        """
+        Start the segmentation and dispatch threads and open the input stream.
+        """
+        if self.recorder.vad is not None:
+            self.recorder.vad.reset()
+        self._stopping.clear()
+        self._segmenter = threading.Thread(target=self._segment, name="capture-segmenter", daemon=True)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="capture-dispatch", daemon=True)
+        self._segmenter.start()
+        self._dispatcher.start()
+
+        if self.external_input:
+            return
+        if self.stream is None:
+            if self.audio is None:
+                self.audio = pyaudio.PyAudio()
+            self.stream = self.audio.open(
+                format=self.recorder.format,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.chunk,
+                stream_callback=self._on_input,
+                start=False
+            )
+        self.stream.start_stream()
+
+    def stop(self, flush=True):
+        """
+        Close the input stream, process the audio left in the ring and stop the threads.
+
+        Args:
+            flush (bool): Hand the conversation in progress to `on_conversation_end` instead of dropping it.
+        """
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+        if self.audio is not None and self._owns_audio:
+            self.audio.terminate()
+        self._flush = flush
+        self._stopping.set()
+        self._data_ready.set()
+        if self._segmenter is not None:
+            self._segmenter.join()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+
+    def run(self):
+        """
+        Capture until Ctrl+C or the end of the input stream, then stop.
+        """
+        print("Listening continuously (callback capture)... Press Ctrl+C to stop.")
+        self.start()
+        try:
+            while self.stream.is_active():
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            print("Stopping continuous listening...")
+        finally:
+            self.stop(flush=True)
+            self.print_stats()
+
+    def _segment(self):
+        samples = self.chunk * self.channels
+        chunk = np.empty(samples, dtype=np.int16)
+        silence_chunks = int(self.recorder.silence_duration * self.rate / self.chunk)
+        silence_counter = 0
+        conversation = CaptureBuffer(self.rate, self.channels, self.chunk, pool=self.recorder.pool)
+        recording = False
+
+        while True:
+            self._data_ready.clear()
+            if len(self.ring) < samples:
+                if not self._stopping.is_set():
+                    self._data_ready.wait(0.1)
+                    continue
+                if not len(self.ring):
+                    break
+            audio_data = chunk[:self.ring.read_into(chunk)]
+            if self.gain != 1.0:
+                conversation.apply_gain(audio_data, self.gain)
+
+            raw_rms = conversation.rms(audio_data)
+            silent = self.recorder.is_silence(audio_data, raw_rms)
+            silence_counter = silence_counter + 1 if silent else 0
+
+            if not silent and not recording:
+                print("Beginning to record...")
+                recording = True
+                self._events.put(("start", None))
+
+            if recording:
+                view = conversation.append(audio_data)
+                if self.on_audio:
+                    self._events.put(("audio", view.tobytes()))  # The view is only valid until the buffer grows
+
+            if silence_counter >= silence_chunks and recording:
+                print("Silence detected. Processing conversation...")
+                self._end_conversation(conversation)
+                silence_counter = 0
+                recording = False
+
+        if recording and self._flush:
+            self._end_conversation(conversation)
+        self._events.put(_STOP)
+
+    def _end_conversation(self, conversation):
+        self.conversations += 1
+        self._events.put(("end", conversation.take(source_id=self.source_id)))
+
+    def _dispatch(self):
+        while True:
+            event = self._events.get()
+            if event is _STOP:
+                return
+            kind, data = event
+            try:
+                if kind == "start" and self.on_conversation_start:
+                    self.on_conversation_start()
+                elif kind == "audio":
+                    self.on_audio(data)
+                elif kind == "end":
+                    self.on_conversation_end(data)
+            except Exception as e:
+                print(f"Capture callback '{kind}' failed: {e}")
+
+    def stats(self):
+        """
+        Return capture counters.
+
+        Returns:
+            dict: Callbacks received, PortAudio input overflows, frames dropped because the ring was
+                  full, ring fill (current and high-water, in seconds), conversations cut and events
+                  waiting for the dispatch thread.
+        """
+        frame_seconds = 1.0 / (self.rate * self.channels)
+        return {
+            "source_id": self.source_id,
+            "callbacks": self.callbacks,
+            "input_overflows": self.input_overflows,
+            "ring_dropped_frames": self.ring.dropped // self.channels,
+            "ring_seconds": len(self.ring) * frame_seconds,
+            "ring_high_water_seconds": self.ring.high_water * frame_seconds,
+            "ring_capacity_seconds": self.ring.capacity * frame_seconds,
+            "conversations": self.conversations,
+            "dispatch_backlog": self._events.qsize(),
+        }
+
+    def print_stats(self):
+        """
+        Print a one-line summary of the capture counters.
+        """
+        s = self.stats()
+        print(f"[capture{' ' + self.source_id if self.source_id else ''}] callbacks={s['callbacks']} overflows={s['input_overflows']} "
+              f"dropped_frames={s['ring_dropped_frames']} ring_high_water={s['ring_high_water_seconds']:.2f}s/"
+              f"{s['ring_capacity_seconds']:.0f}s conversations={s['conversations']} "
+              f"dispatch_backlog={s['dispatch_backlog']}")
@@ -7,10 +7,13 @@ multiple components to process customer interactions and generate insights.
 """
 
 from datetime import datetime
+import argparse
 import os
-from dotenv import load_dotenv
-import wave
 import threading
+import time
+import uuid
+from functools import partial
+from dotenv import load_dotenv
 
 
 # Import pipeline components
@@ -20,6 +23,18 @@ from sentiment_analyzer import SentimentAnalyzer
 from transcriber import Transcriber
 from summarizer import ConversationSummarizer
 from api_uploader import get_token, post_conversation
+from model_registry import get_registry
+from audio_buffer import AudioBuffer
+from job_scheduler import JobScheduler
+from staged_executor import Stage, StagedExecutor
+from result_cache import ResultCache, content_hash
+from sentiment_analyzer import SCORE_COLUMNS, SentimentTimeline
+from transcript_format import parse_utterances
+from daily_digest import DailyDigest
+from streaming_transcriber import StreamingTranscriber
+from capture_engine import CaptureEngine
+from multi_capture import MultiCapture
+from batch_ingest import BatchCheckpoint, find_recordings, throughput_report, write_report
 
 load_dotenv()
 EMAIL = os.getenv("EMAIL")
@@ -33,41 +48,123 @@ class CustomerAuditPipeline:
 
     Attributes:
         audio_recorder (AudioRecorder): Component for recording audio.
+        registry (ModelRegistry): Shared registry every component loads its models from.
         transcriber (Transcriber): Component for transcribing audio.
+        emotion_classifier (EmotionClassifier): Component for classifying emotions, shared by all conversations.
+        sentiment_analyzer (SentimentAnalyzer): Component for analyzing sentiment, shared by all conversations.
         output_dir (str): Directory to save transcription files.
         summary_dir (str): Directory to save summary files.
+        digest (DailyDigest): Incremental hour/day/week rollup of the saved summaries.
+        archive_audio (bool): Also write each continuous-mode conversation to a WAV file in the recordings folder.
+        scheduler (JobScheduler): Worker pool that processes conversations in continuous mode.
+        executor (StagedExecutor): Per-stage worker pools used instead of `scheduler` in staged mode.
+        cache (ResultCache): Content-addressed cache of stage results, so unchanged stages are not rerun.
     """
 
-    def __init__(self):
+    def __init__(self, archive_audio=False, workers=2, worker_mode="thread", max_queue=4,
+                 execution="scheduler", stage_workers=None, upload=False, cache_dir="cache", cache_size_mb=2048,
+                 summary_policy="auto", summary_latency_budget=None, vad="energy", trim_silence=True):
         """
         Initialize the pipeline components and directories.
+
+        Args:
+            archive_audio (bool): Keep a WAV copy of each conversation captured in continuous mode.
+            workers (int): Number of conversations processed concurrently in continuous mode.
+            worker_mode (str): "thread" shares this process's models between workers; "process" gives
+                               each worker process its own models.
+            max_queue (int): Maximum number of conversations waiting for a worker (or for each stage).
+            execution (str): "scheduler" processes each conversation start to finish on one worker;
+                             "staged" runs every stage on its own workers so conversations overlap.
+            stage_workers (dict): Worker count per stage name in staged mode (default 1 each).
+            upload (bool): Push each conversation processed in continuous or batch mode to the backend.
+            cache_dir (str): Directory of the result cache shared by all stages, or None to disable caching.
+            cache_size_mb (int): Size budget of the result cache; least recently used results are evicted.
+            summary_policy (str): "auto", "abstractive" or "extractive" (see `ConversationSummarizer.choose_method`).
+                                  In auto mode a full queue also switches to the extractive summary.
+            summary_latency_budget (float): Seconds an abstractive summary may take in auto mode.
+            vad (str): Voice activity detector used during capture: "energy", "silero" or None (fixed RMS threshold).
+            trim_silence (bool): Pass only the speech regions of each conversation to Whisper and PyAnnote.
         """
-        self.audio_recorder = AudioRecorder(output_folder="recordings")
-        self.transcriber = Transcriber(model_name="base")
+        self.audio_recorder = AudioRecorder(output_folder="recordings", vad=vad)
+        self.registry = get_registry()
+        self.cache_dir = cache_dir
+        self.cache_size_mb = cache_size_mb
+        self.cache = ResultCache(cache_dir, max_bytes=cache_size_mb * 2**20) if cache_dir else None
+        self._transcriber = None
+        self._emotion_classifier = None
+        self._sentiment_analyzer = None
+        self._components_lock = threading.RLock()  # Worker threads may create the lazy components together
         self.output_dir = "transcripts"  # Directory to save transcriptions
         self.summary_dir = "summaries"  # Directory to save summaries
-        self.processing_threads = []  # List to track active processing threads
-
-
-    def save_summary(self, summary):
+        self.digest = DailyDigest(os.path.join(self.summary_dir, "digests"), reduce=self._reduce_summaries)
+        self.archive_audio = archive_audio
+        self.workers = workers
+        self.worker_mode = worker_mode
+        self.max_queue = max_queue
+        self.execution = execution
+        self.stage_workers = stage_workers or {}
+        self.upload = upload
+        self.summary_policy = summary_policy
+        self.trim_silence = trim_silence
+        self.vad = vad
+        self.summary_latency_budget = summary_latency_budget
+        self.summarizer = None  # Created on first use
+        self.scheduler = None  # Created on the first continuous-mode conversation
+        self.executor = None  # Created on the first continuous-mode conversation in staged mode
+
+        # Thread workers share this process's models, so load them up front. With process workers each
+        # worker process loads its own and this one only captures and queues, so they load on first use
+        if worker_mode != "process" or execution == "staged":
+            for component in ("transcriber", "emotion_classifier", "sentiment_analyzer"):
+                getattr(self, component)
+
+    @property
+    def transcriber(self):
+        with self._components_lock:
+            if self._transcriber is None:
+                self._transcriber = Transcriber(model_name="base", registry=self.registry, cache=self.cache)
+            return self._transcriber
+
+    @property
+    def emotion_classifier(self):
+        with self._components_lock:
+            if self._emotion_classifier is None:
+                self._emotion_classifier = EmotionClassifier(registry=self.registry)
+            return self._emotion_classifier
+
+    @property
+    def sentiment_analyzer(self):
+        with self._components_lock:
+            if self._sentiment_analyzer is None:
+                self._sentiment_analyzer = SentimentAnalyzer(registry=self.registry)
+            return self._sentiment_analyzer
+
+
+    def save_summary(self, summary, name=None, sentiment_scores=None, emotion_results=None):
         """
-        Save the generated summary to a text file in the summaries folder.
+        Save the generated summary to a text file in the summaries folder and fold it into the daily digest.
 
         Args:
             summary (str): The summary text to save.
+            name (str): Optional suffix for the file name (e.g. a job id) to keep concurrent summaries apart.
+            sentiment_scores (dict): Sentiment scores of the conversation, for the daily aggregates.
+            emotion_results (list): Emotion results of the conversation, for the daily aggregates.
         """
         # Ensure the summaries directory exists
         os.makedirs(self.summary_dir, exist_ok=True)
 
         # Generate a unique filename based on the current timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        summary_file = os.path.join(self.summary_dir, f"summary_{timestamp}.txt")
+        suffix = f"_{name}" if name else ""
+        summary_file = os.path.join(self.summary_dir, f"summary_{timestamp}{suffix}.txt")
 
         # Save the summary to the file
         with open(summary_file, "w", encoding="utf-8") as f:
             f.write(summary)
 
         print(f"Summary saved to {summary_file}")
+        self.digest.add(summary, conversation_id=name, sentiment_scores=sentiment_scores,
+                        emotion_results=emotion_results)
 
     def run_pipeline(self):
         """
@@ -92,6 +189,7 @@ class CustomerAuditPipeline:
         # Check if the transcription is empty (ignoring separator and timestamp)
         with open(transcription_file, "r", encoding="utf-8") as f:
             transcription_lines = f.readlines()
+        transcript_text = "".join(transcription_lines)
         transcription_content = "".join(transcription_lines[:-2]).strip()  # Ignore the last two lines (separator and timestamp)
         if not transcription_content:
             print("Transcription is empty. Discarding this conversation.")
@@ -100,16 +198,14 @@ class CustomerAuditPipeline:
 
         # Step 3: Classify emotions
         print("\nStep 3: Classifying emotions...")
-        emotion_classifier = EmotionClassifier(transcription_file)
-        emotion_results = emotion_classifier.classify_emotions()
+        emotion_results = self.classify_emotions(transcript_text)
         if not emotion_results:
             print("Emotion classification failed. Exiting pipeline.")
             return
 
         # Step 4: Analyze sentiment
         print("\nStep 4: Analyzing sentiment...")
-        sentiment_analyzer = SentimentAnalyzer(transcription_file)
-        sentiment_scores = sentiment_analyzer.analyze_sentiment()
+        sentiment_scores, sentiment_timeline = self.analyze_sentiment(transcript_text)
         if not sentiment_scores:
             print("Sentiment analysis failed. Exiting pipeline.")
             return
@@ -122,14 +218,13 @@ class CustomerAuditPipeline:
 
         # Step 5: Summarize conversation
         print("\nStep 5: Summarizing conversation...")
-        summarizer = ConversationSummarizer()
-        summary = summarizer.summarize_conversation(transcription_file, None, input_type="transcription")
+        summary = self.summarize(transcription_file, transcript_text)
         if not summary:
             print("Summarization failed. Exiting pipeline.")
             return
 
         # Save the summary to a text file
-        self.save_summary(summary)
+        self.save_summary(summary, sentiment_scores=sentiment_scores, emotion_results=emotion_results)
 
         # Final Output
         print("\nPipeline completed successfully!")
@@ -140,15 +235,32 @@ class CustomerAuditPipeline:
 
         print("\nSentiment Scores:")
         print(sentiment_scores)
+        print("Per-speaker sentiment:", sentiment_timeline.speaker_means())
+        print("Sentiment trajectory:", sentiment_timeline.trajectory())
 
         print("\nSummary:")
         print(summary)
 
         print("\nStep 6: Pushing Conversation to Database (TESTING)")
         # Step 6: Pushing Conversation to Database (TESTING)
+        self.upload_conversation(transcript_text, sentiment_scores, emotion_results, summary)
+
+        self.registry.print_report()
+
+    def upload_conversation(self, transcript_text, sentiment_scores, emotion_results, summary):
+        """
+        Push a processed conversation to the backend API.
+
+        Args:
+            transcript_text (str): The speaker-labeled transcript.
+            sentiment_scores (dict): VADER sentiment scores.
+            emotion_results (list): Emotion classification results.
+            summary (str): The conversation summary.
+
+        Returns:
+            dict: The created conversation, or None if the upload failed.
+        """
         token = get_token(EMAIL, PASSWORD)
-        with open(transcription_file, "r", encoding="utf-8") as f:
-            transcript_text = f.read()
 
         # Extract top 5 emotion scores
         emotion_scores = {
@@ -159,7 +271,7 @@ class CustomerAuditPipeline:
                 reverse=True
             )[:5]  # Take the top 5 emotions
         }
-        
+
         # Extract the highest sentiment (ignoring compound) and reword it
         sentiment_mapping = {"neg": "negative", "neu": "neutral", "pos": "positive"}
         sentiment_label = max(
@@ -168,95 +280,667 @@ class CustomerAuditPipeline:
         )
         sentiment_label = sentiment_mapping[sentiment_label]  # Map to full name
 
-
         # Post to API
         print("Uploading to backend...")
         try:
             convo = post_conversation(token, transcript_text, sentiment_label, emotion_scores, summary)
             print("Uploaded conversation ID:", convo["id"])
+            return convo
         except Exception as e:
             print("Upload failed:", str(e))
-        
+            return None
+
+    def _cached(self, stage, transcript_text, model, params, compute):
+        # Text stages are keyed on the transcript content, so they are reused for any audio with the same transcript.
+        # The key is built from the parsed utterances, leaving out the timestamp trailer, which differs every
+        # time a transcript is written again.
+        if self.cache is None:
+            return compute()
+        content = "\n".join(f"{speaker}: {text}" for speaker, text in parse_utterances(transcript_text))
+        return self.cache.cached(stage, ResultCache.key(content_hash(content), model, params), compute)
+
+    def classify_emotions(self, transcript_text):
+        """
+        Classify the emotions of a transcript, reusing cached results.
+
+        Args:
+            transcript_text (str): The speaker-labeled transcript.
+
+        Returns:
+            list: Emotion classification results (see `EmotionClassifier.classify_batch`).
+        """
+        return self._cached(
+            "emotion", transcript_text, self.emotion_classifier.model_name, {"aggregate": "mean"},
+            lambda: self.emotion_classifier.classify_batch(transcript_text),
+        )
+
+    def analyze_sentiment(self, transcript_text):
+        """
+        Score the sentiment of a transcript and of each utterance, reusing cached results.
+
+        Args:
+            transcript_text (str): The speaker-labeled transcript.
+
+        Returns:
+            tuple: (sentiment_scores, sentiment_timeline) with the overall VADER scores and the
+                   per-utterance `SentimentTimeline`.
+        """
+        def compute():
+            timeline = self.sentiment_analyzer.analyze_timeline(transcript_text)
+            return {
+                "scores": self.sentiment_analyzer.score(transcript_text)[0],
+                "utterances": [dict(zip(SCORE_COLUMNS, row)) for row in timeline.scores.tolist()],
+            }
+
+        result = self._cached("sentiment", transcript_text, "vader", None, compute)
+        return result["scores"], SentimentTimeline(parse_utterances(transcript_text), result["utterances"])
+
+    def summarize(self, transcription_file, transcript_text):
+        """
+        Summarize a transcript, reusing a cached summary of the same transcript.
+
+        The summarizer's policy picks the extractive or abstractive summary, taking the current queue
+        depth into account; the abstractive model is only loaded when it is needed.
+
+        Args:
+            transcription_file (str): Path to the transcription file.
+            transcript_text (str): Its content, used as the cache key.
+
+        Returns:
+            str: The summary, or None if summarization failed.
+        """
+        summarizer = self._get_summarizer()
+        method = summarizer.choose_method(transcript_text, queue_depth=self._queue_depth())
+        if method == "extractive":
+            model, params = "textrank", {"ratio": summarizer.extractive.ratio, "max_units": summarizer.extractive.max_units}
+        else:
+            model, params = summarizer.model_name, {
+                "map_reduce_tokens": summarizer.map_reduce_tokens,
+                "chunk_tokens": summarizer.chunk_tokens,
+            }
+        return self._cached(
+            "summary", transcript_text, model, params,
+            lambda: summarizer.summarize_conversation(
+                transcription_file, None, input_type="transcription", method=method
+            ),
+        )
+
+    def _queue_depth(self):
+        # Conversations waiting in continuous mode; None when nothing is queued through a scheduler
+        if self.executor is not None:
+            return self.executor.metrics()["summarize"]["queue_depth"]
+        if self.scheduler is not None:
+            return self.scheduler.metrics()["queue_depth"]
+        return None
+
+    # Per-conversation stages. Each stage takes the job dictionary, adds its results and returns it,
+    # or returns None to stop processing the conversation. `process_audio` runs them back to back;
+    # the staged executor runs each one on its own workers so consecutive conversations overlap.
+
+    def _stage_decode(self, payload):
+        audio_frames, rate, channels, segments, source_id = payload
+        job = self._new_job(AudioBuffer.from_frames(audio_frames, rate, channels), segments=segments,
+                            source_id=source_id)
+        return job if self._has_speech(job) else None
+
+    def _stage_diarize(self, job):
+        print(f"\n[{job['id']}] Diarizing conversation...")
+        job["turns"] = self.transcriber.diarize(job["audio"].samples, audio_hash=self._audio_hash(job["audio"]))
+        return job
+
+    def _stage_transcribe(self, job):
+        print(f"\n[{job['id']}] Transcribing conversation...")
+        if "segments" in job:
+            # Transcribed while it was captured; only diarization and alignment are left
+            segments = _finish_streaming(job["segments"], job["audio"].samples)
+            turns = job["turns"] if "turns" in job else self.transcriber.diarize(job["audio"].samples)
+            transcription_file = self.transcriber.write_transcript(turns, segments, self.output_dir,
+                                                                   name=job["id"])
+        elif "turns" in job:
+            audio_hash = self._audio_hash(job["audio"])
+            transcription_file = self.transcriber.cached_transcript(audio_hash, self.output_dir)
+            if transcription_file is None:
+                segments = self.transcriber.transcribe(job["audio"].samples, audio_hash=audio_hash)
+                transcription_file = self.transcriber.write_transcript(
+                    job["turns"], segments, self.output_dir, name=job["id"], audio_hash=audio_hash
+                )
+        else:
+            transcription_file = self.transcriber.transcribe_audio(job["audio"], self.output_dir, name=job["id"])
+        if not transcription_file:
+            print("Transcription failed.")
+            return None
+        job["audio"] = None  # Release the audio before the slower stages
+
+        # Check if the transcription is empty (ignoring separator and timestamp)
+        with open(transcription_file, "r", encoding="utf-8") as f:
+            transcription_lines = f.readlines()
+        transcription_content = "".join(transcription_lines[:-2]).strip()  # Ignore the last two lines (separator and timestamp)
+        if not transcription_content:
+            print("Transcription is empty. Discarding this conversation.")
+            os.remove(transcription_file)  # Delete the empty transcription file
+            return None
+
+        job["transcription_file"] = transcription_file
+        job["transcript_text"] = "".join(transcription_lines)
+        return job
+
+    def _stage_analyze(self, job):
+        transcript_text = job["transcript_text"]
+
+        # Classify emotions
+        print(f"\n[{job['id']}] Classifying emotions...")
+        job["emotion_results"] = self.classify_emotions(transcript_text)
+
+        # Analyze sentiment
+        print(f"\n[{job['id']}] Analyzing sentiment...")
+        job["sentiment_scores"], job["sentiment_timeline"] = self.analyze_sentiment(transcript_text)
+        return job
+
+    def _stage_summarize(self, job):
+        print(f"\n[{job['id']}] Summarizing conversation...")
+        job["summary"] = self.summarize(job["transcription_file"], job["transcript_text"])
+        if not job["summary"]:
+            print("Summarization failed.")
+            return None
+
+        # Save the summary
+        self.save_summary(job["summary"], name=job["id"], sentiment_scores=job["sentiment_scores"],
+                          emotion_results=job["emotion_results"])
+        self._print_results(job)
+        return job
+
+    def _stage_upload(self, job):
+        if self.upload:
+            job["upload"] = self.upload_conversation(
+                job["transcript_text"], job["sentiment_scores"], job["emotion_results"], job["summary"]
+            )
+        return job
+
+    def _audio_hash(self, audio):
+        return audio.content_hash() if self.cache is not None else None
+
+    def _reduce_summaries(self, summaries):
+        return self._get_summarizer().reduce_summaries(summaries)
+
+    def daily_report(self, day=None):
+        """
+        Return the digest and sentiment/emotion aggregates of a day, summarizing only new conversations.
+
+        Args:
+            day (str): The day, e.g. "20250723". Defaults to today.
 
-     
-    def process_conversation(self, audio_frames):
+        Returns:
+            dict: {"day", "summary", "aggregates"}
+        """
+        day = day or datetime.now().strftime("%Y%m%d")
+        return {"day": day, "summary": self.digest.day_summary(day), "aggregates": self.digest.aggregates(day)}
+
+    def _get_summarizer(self):
+        with self._components_lock:
+            if self.summarizer is None:
+                self.summarizer = ConversationSummarizer(
+                    transcriber=self.transcriber,
+                    registry=self.registry,
+                    cache=self.cache,
+                    policy=self.summary_policy,
+                    latency_budget=self.summary_latency_budget,
+                    max_queue_depth=self.max_queue,
+                )
+            return self.summarizer
+
+    def _print_results(self, job):
+        print(f"\n[{job['id']}] Emotion Results:")
+        for result_list in job["emotion_results"]:
+            for result in result_list:
+                print(f"Label: {result['label']}, Score: {result['score']}")
+
+        print("\nSentiment Scores:")
+        print(job["sentiment_scores"])
+        print("Per-speaker sentiment:", job["sentiment_timeline"].speaker_means())
+        print("Sentiment trajectory:", job["sentiment_timeline"].trajectory())
+
+        print("\nSummary:")
+        print(job["summary"])
+
+    def _new_job(self, audio, job_id=None, segments=None, source_id=None):
+        job_id = job_id or uuid.uuid4().hex[:12]
+        if source_id:
+            job_id = f"{source_id}_{job_id}"  # Summary and transcript files show which counter it came from
+        if self.archive_audio:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            audio.save_wav(os.path.join(self.audio_recorder.output_folder, f"conversation_{timestamp}_{job_id}.wav"))
+        job = {"id": job_id, "audio": audio, "duration": audio.duration, "source_id": source_id}
+        if segments is not None:
+            job["segments"] = segments  # Timed on the untrimmed audio, so the audio is kept as is
+        elif self.trim_silence:
+            job["audio"], regions = audio.speech_only()
+            print(f"[{job_id}] Speech: {job['audio'].duration:.1f}s of {audio.duration:.1f}s in {len(regions)} regions")
+        return job
+
+    def _has_speech(self, job):
+        if job["audio"].duration > 0:
+            return True
+        print(f"[{job['id']}] No speech detected. Discarding this conversation.")
+        return False
+
+    def process_audio(self, audio, job_id=None, segments=None, source_id=None):
         """
         Process a single conversation: Transcribe, classify emotions, analyze sentiment, and summarize.
 
         Args:
-            audio_frames (list): List of audio frames for the conversation.
+            audio (AudioBuffer): The decoded conversation audio.
+            job_id (str): Identifier used to name this conversation's files.
+            segments (list): Whisper segments already transcribed during capture, if any.
+            source_id (str): Capture source (e.g. counter) the conversation was recorded at.
+
+        Returns:
+            dict: The job with the results of every stage, or None if processing stopped early.
         """
-        def process_task():
-            # Save the audio frames to a temporary file
-            temp_audio_file = os.path.join(self.audio_recorder.output_folder, "temp_conversation.wav")
-            with wave.open(temp_audio_file, 'wb') as wf:
-                wf.setnchannels(self.audio_recorder.channels)
-                wf.setsampwidth(2)  # 16-bit audio
-                wf.setframerate(self.audio_recorder.rate)
-                wf.writeframes(b''.join(audio_frames))
-
-            # Transcribe the audio
-            print("\nTranscribing conversation...")
-            transcription_file = self.transcriber.transcribe_audio(temp_audio_file, self.output_dir)
-            if not transcription_file:
-                print("Transcription failed.")
-                return
-            
-            # Check if the transcription is empty (ignoring separator and timestamp)
-            with open(transcription_file, "r", encoding="utf-8") as f:
-                transcription_lines = f.readlines()
-            transcription_content = "".join(transcription_lines[:-2]).strip()  # Ignore the last two lines (separator and timestamp)
-            if not transcription_content:
-                print("Transcription is empty. Discarding this conversation.")
-                os.remove(transcription_file)  # Delete the empty transcription file
-                return
-
-
-            # Classify emotions
-            print("\nClassifying emotions...")
-            emotion_classifier = EmotionClassifier(transcription_file)
-            emotion_results = emotion_classifier.classify_emotions()
-
-            # Analyze sentiment
-            print("\nAnalyzing sentiment...")
-            sentiment_analyzer = SentimentAnalyzer(transcription_file)
-            sentiment_scores = sentiment_analyzer.analyze_sentiment()
-
-            # Summarize conversation
-            print("\nSummarizing conversation...")
-            summarizer = ConversationSummarizer()
-            summary = summarizer.summarize_conversation(transcription_file, None, input_type="transcription")
-
-            # Save the summary
-            self.save_summary(summary)
-
-            # Print results
-            print("\nEmotion Results:")
-            for result_list in emotion_results:
-                for result in result_list:
-                    print(f"Label: {result['label']}, Score: {result['score']}")
-
-            print("\nSentiment Scores:")
-            print(sentiment_scores)
-
-            print("\nSummary:")
-            print(summary)
-
-        # Start a new thread for processing the conversation
-        processing_thread = threading.Thread(target=process_task)
-        processing_thread.start()
-        self.processing_threads.append(processing_thread)
-        
-    def run_continuous_pipeline(self):
+        job = self._new_job(audio, job_id, segments=segments, source_id=source_id)
+        if not self._has_speech(job):
+            return None
+        for stage in (self._stage_transcribe, self._stage_analyze, self._stage_summarize, self._stage_upload):
+            job = stage(job)
+            if job is None:
+                return None
+
+        self.registry.print_report()
+        if self.cache is not None:
+            self.cache.print_stats()
+        return job
+
+    def _process_job(self, payload, job_id=None):
+        audio_frames, rate, channels, segments, source_id = payload
+        return self.process_audio(AudioBuffer.from_frames(audio_frames, rate, channels), job_id=job_id,
+                                  segments=segments, source_id=source_id)
+
+    def _get_scheduler(self):
+        # Several capture dispatch threads may queue the first conversations at once; a second
+        # scheduler created by a race would never be drained by shutdown
+        with self._components_lock:
+            if self.scheduler is None:
+                if self.worker_mode == "process":
+                    handler = partial(_process_job_in_worker, archive_audio=self.archive_audio)
+                else:
+                    handler = self._process_job
+                self.scheduler = JobScheduler(
+                    handler, workers=self.workers, max_queue=self.max_queue, mode=self.worker_mode, name="conversations"
+                )
+            return self.scheduler
+
+    def _get_executor(self):
+        with self._components_lock:
+            if self.executor is None:
+                stages = [
+                    ("decode", self._stage_decode),
+                    ("diarize", self._stage_diarize),
+                    ("transcribe", self._stage_transcribe),
+                    ("analyze", self._stage_analyze),
+                    ("summarize", self._stage_summarize),
+                    ("upload", self._stage_upload),
+                ]
+                self.executor = StagedExecutor([
+                    Stage(name, handler, workers=self.stage_workers.get(name, 1), queue_size=self.max_queue)
+                    for name, handler in stages
+                ], name="conversations")
+            return self.executor
+
+    def process_conversation(self, audio_frames, segments=None, source_id=None):
+        """
+        Queue a conversation for processing.
+
+        With `execution="scheduler"` one worker runs every stage of the conversation. With
+        `execution="staged"` each stage has its own workers and queue, so consecutive conversations
+        overlap. Either way this blocks while the first queue is full, so a burst of conversations
+        slows capture down instead of spawning unbounded threads.
+
+        Args:
+            audio_frames (CaptureSegment or list): The captured audio of the conversation. A capture
+                                                   segment is released once it has been decoded.
+            segments (list or StreamingTranscriber): Whisper segments already transcribed during capture
+                                                     (streaming mode). A streaming transcriber is finished
+                                                     in the transcribe stage, off the capture thread.
+            source_id (str): Capture source of the conversation. Defaults to the segment's `source_id`.
+
+        Returns:
+            bool: True if the conversation was queued.
+        """
+        # A capture segment carries its own format, which differs from the recorder's for other sources
+        rate = getattr(audio_frames, "rate", self.audio_recorder.rate)
+        channels = getattr(audio_frames, "channels", self.audio_recorder.channels)
+        source_id = source_id or getattr(audio_frames, "source_id", None)
+        if self.execution != "staged" and self.worker_mode == "process" and hasattr(audio_frames, "release"):
+            # Worker processes cannot see the capture pool; send them a copy and reuse the array here
+            captured, audio_frames = audio_frames, audio_frames.tobytes()
+            captured.release()
+        if self.execution != "staged" and self.worker_mode == "process":
+            # Nor can they receive the transcription thread; wait for its last window here (the
+            # continuous pipeline then captures through the callback engine, so this is off the capture thread).
+            # A conversation with failed windows is sent without segments and transcribed in full by the worker
+            segments = _finish_streaming(segments)
+        payload = (audio_frames, rate, channels, segments, source_id)
+        if self.execution == "staged":
+            executor = self._get_executor()
+            queued = executor.submit(payload)
+            executor.print_metrics()
+            return queued
+
+        scheduler = self._get_scheduler()
+        job = scheduler.submit(payload)
+        if job is not None:
+            print(f"Queued conversation {job.id}.")
+        scheduler.print_metrics()
+        return job is not None
+
+    def shutdown(self, drain=True):
+        """
+        Stop the worker pool or staged executor, optionally finishing queued conversations first.
+
+        Args:
+            drain (bool): Process every queued conversation before stopping.
+        """
+        if self.scheduler is not None:
+            self.scheduler.shutdown(drain=drain)
+            self.scheduler.print_metrics()
+            self.scheduler = None
+        if self.executor is not None:
+            self.executor.shutdown(drain=drain)
+            self.executor.print_metrics()
+            self.executor = None
+
+    def process_recording(self, recording, job_id=None):
+        """
+        Decode and process one stored recording (used by batch mode).
+
+        Args:
+            recording (dict): A {"path", "id"} dictionary from `find_recordings`.
+            job_id (str): Unused; the recording id names the output files.
+
+        Returns:
+            dict: {"status", "id", "duration", "seconds"}, where status is "done" or "empty".
+        """
+        started = time.perf_counter()
+        print(f"\n[{recording['id']}] Processing {recording['path']}")
+        audio = AudioBuffer.from_file(recording["path"])
+        job = self.process_audio(audio, job_id=recording["id"])
+        return {
+            "status": "done" if job is not None else "empty",
+            "id": recording["id"],
+            "duration": audio.duration,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def process_batch(self, source, workers=None, worker_mode=None, checkpoint_path="batch_checkpoint.jsonl",
+                      report_path=None):
+        """
+        Process stored recordings in parallel, resuming from a checkpoint, and write a throughput report.
+
+        Args:
+            source (str): A directory, glob pattern or JSONL manifest of recordings (see `find_recordings`).
+            workers (int): Number of recordings processed concurrently. Defaults to `self.workers`.
+            worker_mode (str): "thread" or "process". Defaults to `self.worker_mode`.
+            checkpoint_path (str): JSONL file recording finished recordings; completed ones are skipped.
+            report_path (str): Where to write the JSON throughput report. Defaults to a timestamped
+                               file in the summaries folder.
+
+        Returns:
+            dict: The throughput report.
+        """
+        workers = workers or self.workers
+        worker_mode = worker_mode or self.worker_mode
+        recordings = find_recordings(source)
+        checkpoint = BatchCheckpoint(checkpoint_path)
+        pending = [recording for recording in recordings if not checkpoint.is_done(recording["path"])]
+        skipped = len(recordings) - len(pending)
+        print(f"Batch: {len(recordings)} recordings found, {skipped} already done, {len(pending)} to process "
+              f"with {workers} {worker_mode} workers.")
+
+        results = []
+        results_lock = threading.Lock()
+
+        def on_done(job):
+            result = job.result or {
+                "status": "failed",
+                "id": job.payload["id"],
+                "duration": None,
+                "seconds": job.finished_at - job.started_at,
+            }
+            details = {key: value for key, value in result.items() if key != "status"}
+            if job.error is not None:
+                details["error"] = str(job.error)
+            checkpoint.record(job.payload["path"], result["status"], **details)
+            with results_lock:
+                results.append(result)
+                print(f"Batch progress: {len(results)}/{len(pending)} ({result['status']}: {job.payload['path']})")
+
+        if worker_mode == "process":
+            handler = partial(
+                _process_recording_in_worker,
+                upload=self.upload,
+                cache_dir=self.cache_dir,
+                cache_size_mb=self.cache_size_mb,
+                summary_policy=self.summary_policy,
+                summary_latency_budget=self.summary_latency_budget,
+                trim_silence=self.trim_silence,
+            )
+        else:
+            handler = self.process_recording
+        scheduler = JobScheduler(
+            handler, workers=workers, max_queue=self.max_queue, mode=worker_mode, name="batch", on_done=on_done
+        )
+
+        started = time.perf_counter()
+        try:
+            for recording in pending:
+                scheduler.submit(recording)
+            scheduler.shutdown(drain=True)
+        except KeyboardInterrupt:
+            # Drop the queued recordings and wait only for the running ones; the checkpoint keeps what
+            # finished, so the next run resumes with the rest
+            print("Interrupted: cancelling queued recordings...")
+            scheduler.shutdown(drain=False)
+            raise
+        scheduler.print_metrics()
+
+        report = throughput_report(results, time.perf_counter() - started, skipped=skipped, workers=workers)
+        if self.cache is not None:
+            report["cache"] = self.cache.stats()  # This process only; worker processes keep their own counts
+        if report_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = os.path.join(self.summary_dir, f"batch_report_{timestamp}.json")
+        write_report(report, report_path)
+        return report
+
+    def run_continuous_pipeline(self, streaming=False, capture="blocking", input_wav=None):
         """
         Run the pipeline continuously, processing conversations on the fly.
+
+        Args:
+            streaming (bool): Transcribe each conversation in overlapping windows while it is being
+                              captured, so only the last window is left when it ends.
+            capture (str): "blocking" reads the microphone on this thread and processes each
+                           conversation inline; "callback" captures through PortAudio's callback
+                           API and segments and dispatches conversations on separate threads, so
+                           slow processing cannot make capture drop audio.
+            input_wav (str): Capture from this WAV file instead of the microphone (callback capture).
+        """
+        if streaming and capture == "blocking" and self.execution != "staged" and self.worker_mode == "process":
+            # Process workers need the finished segments before the job is queued, and finishing them on
+            # the blocking capture loop would stop reading the microphone while the last windows transcribe
+            print("Streaming with process workers: using callback capture.")
+            capture = "callback"
+        print(f"Starting continuous pipeline{' (streaming transcription)' if streaming else ''}...")
+        try:
+            if streaming:
+                self._listen_streaming(capture, input_wav)
+            else:
+                self._listen(self.process_conversation, capture=capture, input_wav=input_wav)
+        finally:
+            self.shutdown(drain=True)
+
+    def _listen(self, on_end, on_start=None, on_audio=None, capture="blocking", input_wav=None):
+        if capture == "callback" or input_wav is not None:
+            CaptureEngine(self.audio_recorder, on_end, on_conversation_start=on_start, on_audio=on_audio,
+                          input_wav=input_wav).run()
+        else:
+            self.audio_recorder.listen_continuously(on_end, on_conversation_start=on_start, on_audio=on_audio)
+
+    def _listen_streaming(self, capture="blocking", input_wav=None):
+        recorder = self.audio_recorder
+        current = {"streamer": None}
+
+        def on_partial(segments, text):
+            print(f"[partial] {text[-200:]}")
+
+        def on_start():
+            streamer = StreamingTranscriber(self.transcriber, recorder.rate, recorder.channels, on_partial=on_partial)
+            streamer.start()
+            current["streamer"] = streamer
+
+        def on_audio(raw_data):
+            current["streamer"].feed(raw_data)
+
+        def on_end(audio_frames):
+            # The streamer goes with the job and is finished in the transcribe stage: waiting for its
+            # last windows here would stall the blocking capture loop and drop the next conversation's start
+            streamer, current["streamer"] = current["streamer"], None
+            self.process_conversation(audio_frames, segments=streamer)
+
+        self._listen(on_end, on_start=on_start, on_audio=on_audio, capture=capture, input_wav=input_wav)
+
+    def run_multi_source_pipeline(self, sources, interface=None, streaming=False):
+        """
+        Capture several counters at once and process all their conversations in this pipeline.
+
+        Each source is segmented on its own (own VAD state, gain and silence timing) and its
+        conversations are tagged with its ID, while the models and worker pool are shared.
+
+        Args:
+            sources (list): `CaptureSource` objects or specifications such as "counter1=2" (device 2),
+                            "counter2=ch:1" (channel 1 of `interface`) or "counter3=counter3.wav".
+            interface (int or str): Device index or WAV file of the multichannel interface of channel sources.
+            streaming (bool): Transcribe each source's conversations while they are being captured.
         """
-        print("Starting continuous pipeline...")
-        self.audio_recorder.listen_continuously(self.process_conversation)
+        recorder = self.audio_recorder
+        streamers = {}
+
+        def on_start(source_id):
+            engine = capture.engines[source_id]
+            streamer = StreamingTranscriber(
+                self.transcriber, engine.rate, engine.channels,
+                on_partial=lambda segments, text: print(f"[partial {source_id}] {text[-200:]}")
+            )
+            streamer.start()
+            streamers[source_id] = streamer
+
+        def on_audio(source_id, raw_data):
+            streamers[source_id].feed(raw_data)
+
+        def on_end(segment):
+            self.process_conversation(segment, segments=streamers.pop(segment.source_id, None))
+
+        capture = MultiCapture(
+            sources, on_end,
+            on_conversation_start=on_start if streaming else None,
+            on_audio=on_audio if streaming else None,
+            interface=interface,
+            vad=self.vad,
+            rate=recorder.rate,
+            chunk=recorder.chunk,
+            silence_duration=recorder.silence_duration,
+            output_folder=recorder.output_folder,
+        )
+        print(f"Starting multi-source pipeline{' (streaming transcription)' if streaming else ''}...")
+        try:
+            capture.run()
+        finally:
+            self.shutdown(drain=True)
+
+
+def _finish_streaming(segments, samples=None):
+    # A conversation transcribed while captured carries its StreamingTranscriber until the segments are needed
+    if not isinstance(segments, StreamingTranscriber):
+        return segments
+    streamer, segments = segments, segments.finish()
+    if streamer.gaps:
+        if samples is None:
+            return None  # Transcribed from scratch with the rest of the conversation instead
+        segments = streamer.fill_gaps(samples)
+    return segments
+
+
+# Pipeline used by worker processes when worker_mode="process"
+_worker_pipeline = None
+
+
+def _get_worker_pipeline(**kwargs):
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = CustomerAuditPipeline(**kwargs)
+    return _worker_pipeline
+
+
+def _process_job_in_worker(payload, job_id=None, archive_audio=False):
+    _get_worker_pipeline(archive_audio=archive_audio)._process_job(payload, job_id=job_id)
+
+
+def _process_recording_in_worker(recording, job_id=None, **options):
+    return _get_worker_pipeline(**options).process_recording(recording, job_id=job_id)
 
 
 # Run the pipeline
 if __name__ == "__main__":
-    pipeline = CustomerAuditPipeline()
-    pipeline.run_pipeline() # For purpose of single run, of the pipeline
-    # pipeline.run_continuous_pipeline() # For continuous processing of conversations
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Customer audit pipeline")
+    parser.add_argument("mode", nargs="?", default="single", choices=["single", "continuous", "batch"],
+                        help="single: record one conversation; continuous: listen and process conversations "
+                             "on the fly; batch: process stored recordings")
+    parser.add_argument("source", nargs="?", help="Batch mode: directory, glob pattern or JSONL manifest of recordings; "
+                                                  "continuous mode: WAV file to capture from instead of the microphone")
+    parser.add_argument("--workers", type=int, default=2, help="Conversations processed concurrently")
+    parser.add_argument("--worker-mode", default="thread", choices=["thread", "process"])
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl", help="Batch mode: resume checkpoint file")
+    parser.add_argument("--report", default=None, help="Batch mode: throughput report path")
+    parser.add_argument("--upload", action="store_true", help="Push processed conversations to the backend")
+    parser.add_argument("--cache-dir", default="cache", help="Result cache directory")
+    parser.add_argument("--cache-size-mb", type=int, default=2048, help="Result cache size budget")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage")
+    parser.add_argument("--vad", default="energy", choices=["energy", "silero", "none"],
+                        help="Voice activity detection used to find speech during capture")
+    parser.add_argument("--no-trim", action="store_true", help="Keep silence in the audio passed to the models")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Continuous mode: transcribe conversations while they are being captured")
+    parser.add_argument("--capture", default="blocking", choices=["blocking", "callback"],
+                        help="Continuous mode: read the microphone inline, or through a callback and ring buffer "
+                             "with segmentation and processing on separate threads")
+    parser.add_argument("--source-input", dest="sources", action="append", default=[], metavar="ID=DEVICE",
+                        help="Continuous mode: capture several counters at once; repeat per source. DEVICE is a "
+                             "device index, ch:N (channel N of --interface) or a WAV file, optionally @GAIN")
+    parser.add_argument("--interface", default=None,
+                        help="Device index or WAV file of the multichannel interface used by ch:N sources")
+    parser.add_argument("--summary-policy", default="auto", choices=["auto", "abstractive", "extractive"])
+    parser.add_argument("--summary-latency-budget", type=float, default=None,
+                        help="Seconds an abstractive summary may take before falling back to extractive")
+    args = parser.parse_args()
+
+    pipeline = CustomerAuditPipeline(
+        workers=args.workers,
+        worker_mode=args.worker_mode,
+        upload=args.upload,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        summary_policy=args.summary_policy,
+        summary_latency_budget=args.summary_latency_budget,
+        vad=None if args.vad == "none" else args.vad,
+        trim_silence=not args.no_trim,
+    )
+    if args.mode == "batch":
+        if not args.source:
+            parser.error("batch mode needs a source directory, glob pattern or manifest")
+        pipeline.process_batch(args.source, checkpoint_path=args.checkpoint, report_path=args.report)
+    elif args.mode == "continuous" and args.sources:
+        interface = int(args.interface) if args.interface and args.interface.isdigit() else args.interface
+        pipeline.run_multi_source_pipeline(args.sources, interface=interface, streaming=args.streaming)
+    elif args.mode == "continuous":
+        pipeline.run_continuous_pipeline(streaming=args.streaming, capture=args.capture, input_wav=args.source) # For continuous processing of conversations
+    else:
+        pipeline.run_pipeline() # For purpose of single run, of the pipeline
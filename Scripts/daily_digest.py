@@ -0,0 +1,289 @@
+"""
+Daily Digest Module
+
+This module maintains incremental rollups of conversation summaries. Every saved summary is
+appended to a per-day log together with its sentiment and top emotions. Digests are reduced
+hierarchically (hour -> day -> week); each node is persisted with a hash of its inputs, so a report
+only summarizes what changed since the last one: new conversations are folded into their hour's
+digest, and the day and week digests are only regenerated when an hour or day below them changed.
+Structured daily aggregates of sentiment and emotion counts are kept alongside. The `DailyDigest`
+class is the main component of this module.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+SENTIMENT_LABELS = {"neg": "negative", "neu": "neutral", "pos": "positive"}
+SUMMARY_FILE = re.compile(r"summary_(\d{8})_(\d{6})(?:_(.+))?\.txt$")
+
+
+def _digest_hash(texts):
+    return hashlib.sha256("\x1e".join(texts).encode("utf-8")).hexdigest()
+
+
+class DailyDigest:
+    """
+    Persisted hour -> day -> week summary rollups with sentiment and emotion aggregates.
+
+    Files in `root`:
+        <day>.jsonl       Append-only log of conversations (one JSON object per summary).
+        <day>.state.json  Log offset already folded in, hour and day digests, daily aggregates.
+        week_<week>.json  Cached week digest and the hash of the day digests it was built from.
+
+    Attributes:
+        root (str): Directory of the digest files.
+        reduce (callable): Function that summarizes a list of summaries into one summary.
+    """
+
+    def __init__(self, root="summaries/digests", reduce=None):
+        """
+        Initialize the digest store.
+
+        Args:
+            root (str): Directory of the digest files.
+            reduce (callable): Function taking a list of summaries and returning one summary, e.g.
+                               `ConversationSummarizer.reduce_summaries`.
+        """
+        self.root = root
+        self.reduce = reduce
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _log_path(self, day):
+        return os.path.join(self.root, f"{day}.jsonl")
+
+    def _state_path(self, day):
+        return os.path.join(self.root, f"{day}.state.json")
+
+    def _load(self, path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, path, data):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+    def has_day(self, day):
+        """
+        Check whether any conversation was recorded for a day.
+
+        Args:
+            day (str): The day, e.g. "20250723".
+
+        Returns:
+            bool: True if the day has a conversation log.
+        """
+        return os.path.exists(self._log_path(day))
+
+    def add(self, summary, timestamp=None, conversation_id=None, sentiment_scores=None, emotion_results=None):
+        """
+        Fold a new conversation summary into its day's log.
+
+        This only appends one line; digests are brought up to date when a report is requested.
+
+        Args:
+            summary (str): The conversation summary.
+            timestamp (datetime): When the conversation ended. Defaults to now.
+            conversation_id (str): Optional identifier of the conversation.
+            sentiment_scores (dict): VADER scores (neg, neu, pos, compound) of the conversation.
+            emotion_results (list): Emotion classification results of the conversation.
+        """
+        timestamp = timestamp or datetime.now()
+        entry = {"id": conversation_id, "time": timestamp.strftime("%H%M%S"), "summary": summary}
+        if sentiment_scores:
+            entry["sentiment"] = {key: sentiment_scores[key] for key in ("neg", "neu", "pos", "compound")
+                                  if key in sentiment_scores}
+        if emotion_results:
+            top = sorted((e for result in emotion_results for e in result), key=lambda e: e["score"], reverse=True)[:5]
+            entry["emotions"] = {e["label"]: e["score"] for e in top}
+
+        # A single short append is atomic, so concurrent workers and processes can add safely
+        with open(self._log_path(timestamp.strftime("%Y%m%d")), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def import_summary_files(self, summaries_dir, day):
+        """
+        Backfill a day's log from the `summary_<day>_<time>[_<id>].txt` files written before digests existed.
+
+        Args:
+            summaries_dir (str): Directory containing the summary files.
+            day (str): The day to import, e.g. "20250723".
+
+        Returns:
+            int: Number of summaries imported.
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(summaries_dir, f"summary_{day}_*.txt"))):
+            match = SUMMARY_FILE.search(os.path.basename(path))
+            if not match:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                summary = f.read().strip()
+            if summary:
+                timestamp = datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+                self.add(summary, timestamp=timestamp, conversation_id=match.group(3))
+                imported += 1
+        return imported
+
+    def refresh(self, day):
+        """
+        Fold the conversations logged since the last refresh into the hour digests and aggregates.
+
+        Args:
+            day (str): The day, e.g. "20250723".
+
+        Returns:
+            dict: The day's state.
+        """
+        with self._lock:
+            state = self._load(self._state_path(day), {
+                "offset": 0,
+                "hours": {},
+                "day": {"digest": None, "source": None},
+                "aggregates": {
+                    "conversations": 0,
+                    "sentiment": {label: 0 for label in SENTIMENT_LABELS.values()},
+                    "compound_sum": 0.0,
+                    "emotion_counts": {},
+                    "emotion_scores": {},
+                },
+            })
+            if not os.path.exists(self._log_path(day)):
+                return state
+
+            new_by_hour = {}
+            offset = state["offset"]
+            with open(self._log_path(day), "rb") as f:
+                f.seek(offset)
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break  # End of file, or a line still being written
+                    state["offset"] = f.tell()
+                    entry = self._parse_entry(line)
+                    if entry is None:
+                        # A line torn by a crash mid-append; skip it rather than stop at it on every refresh
+                        print(f"Skipping unreadable {day} log entry at byte {state['offset'] - len(line)}")
+                        continue
+                    hour, summary = entry["time"][:2], entry["summary"]
+                    new_by_hour.setdefault(hour, []).append(summary)
+                    self._aggregate(state["aggregates"], entry)
+
+            for hour, summaries in sorted(new_by_hour.items()):
+                node = state["hours"].setdefault(hour, {"count": 0, "digest": None})
+                parts = ([node["digest"]] if node["digest"] else []) + summaries
+                print(f"Folding {len(summaries)} new conversations into the {day} {hour}:00 digest...")
+                node["digest"] = parts[0] if len(parts) == 1 else self.reduce(parts)
+                node["count"] += len(summaries)
+
+            if state["offset"] != offset:
+                self._save(self._state_path(day), state)
+            return state
+
+    def _parse_entry(self, line):
+        # A crash mid-append leaves a partial entry that the next append continues on the same line;
+        # the entry written after it is recovered from its opening '{"id": '
+        for start in (0, line.rfind(b'{"id": ')):
+            try:
+                entry = json.loads(line[max(start, 0):].decode("utf-8"))
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("time"), str) and "summary" in entry:
+                return entry
+        return None
+
+    def _aggregate(self, aggregates, entry):
+        aggregates["conversations"] += 1
+        sentiment = entry.get("sentiment")
+        if sentiment:
+            dominant = max((key for key in SENTIMENT_LABELS if key in sentiment), key=sentiment.get)
+            aggregates["sentiment"][SENTIMENT_LABELS[dominant]] += 1
+            aggregates["compound_sum"] += sentiment.get("compound", 0.0)
+        emotions = entry.get("emotions")
+        if emotions:
+            top_label = max(emotions, key=emotions.get)
+            aggregates["emotion_counts"][top_label] = aggregates["emotion_counts"].get(top_label, 0) + 1
+            for label, score in emotions.items():
+                aggregates["emotion_scores"][label] = aggregates["emotion_scores"].get(label, 0.0) + score
+
+    def day_summary(self, day):
+        """
+        Return the digest of a day, regenerating it only if an hour digest changed.
+
+        Args:
+            day (str): The day, e.g. "20250723".
+
+        Returns:
+            str: The day digest, or None if no conversation was recorded that day.
+        """
+        state = self.refresh(day)
+        hour_digests = [state["hours"][hour]["digest"] for hour in sorted(state["hours"])]
+        if not hour_digests:
+            return None
+
+        source = _digest_hash(hour_digests)
+        if state["day"]["source"] != source:
+            print(f"Reducing {len(hour_digests)} hour digests into the {day} digest...")
+            digest = hour_digests[0] if len(hour_digests) == 1 else self.reduce(hour_digests)
+            with self._lock:
+                state = self._load(self._state_path(day), state)
+                state["day"] = {"digest": digest, "source": source}
+                self._save(self._state_path(day), state)
+        return state["day"]["digest"]
+
+    def week_summary(self, day):
+        """
+        Return the digest of the ISO week containing a day, built from the (cached) day digests.
+
+        Args:
+            day (str): Any day of the week, e.g. "20250723".
+
+        Returns:
+            str: The week digest, or None if no conversation was recorded that week.
+        """
+        date = datetime.strptime(day, "%Y%m%d")
+        monday = date - timedelta(days=date.weekday())
+        days = [(monday + timedelta(days=i)).strftime("%Y%m%d") for i in range(7)]
+        day_digests = [digest for digest in (self.day_summary(d) for d in days if self.has_day(d)) if digest]
+        if not day_digests:
+            return None
+
+        year, week, _ = date.isocalendar()
+        path = os.path.join(self.root, f"week_{year}-W{week:02d}.json")
+        source = _digest_hash(day_digests)
+        node = self._load(path, {"digest": None, "source": None})
+        if node["source"] != source:
+            print(f"Reducing {len(day_digests)} day digests into the {year}-W{week:02d} digest...")
+            node = {"digest": day_digests[0] if len(day_digests) == 1 else self.reduce(day_digests), "source": source}
+            self._save(path, node)
+        return node["digest"]
+
+    def aggregates(self, day):
+        """
+        Return the structured sentiment and emotion aggregates of a day.
+
+        Args:
+            day (str): The day, e.g. "20250723".
+
+        Returns:
+            dict: Conversation count, dominant-sentiment counts, mean compound score, top-emotion
+                  counts and mean emotion scores.
+        """
+        aggregates = self.refresh(day)["aggregates"]
+        count = aggregates["conversations"]
+        return {
+            "conversations": count,
+            "sentiment": dict(aggregates["sentiment"]),
+            "compound_mean": aggregates["compound_sum"] / count if count else 0.0,
+            "emotion_counts": dict(sorted(aggregates["emotion_counts"].items(), key=lambda item: -item[1])),
+            "emotion_means": {label: total / count for label, total in aggregates["emotion_scores"].items()},
+        }
@@ -1,36 +1,167 @@
 """
 Emotion Classifier Module
 
-This module provides functionality to classify emotions in a transcript file using a pre-trained
+This module provides functionality to classify emotions in transcripts using a pre-trained
 transformer model. It includes the `EmotionClassifier` class and an example usage for testing.
 """
 
-from transformers import pipeline
-import os
+import numpy as np
+from model_registry import get_registry, load_hf_pipeline
+from transcript_format import read_transcript, as_text_list
 
 
 class EmotionClassifier:
     """
-    A class to classify emotions in a transcript file using a pre-trained transformer model.
+    A class to classify emotions in transcripts using a pre-trained transformer model.
+
+    The classifier is built once and can then classify any number of in-memory transcripts with
+    `classify`, or with `classify_batch` to cover whole transcripts in token-aware windows that are
+    run through the model in padded batches. Passing a `transcript_path` keeps the original
+    file-based `classify_emotions` API.
 
     Attributes:
-        transcript_path (str): Path to the transcript file.
+        transcript_path (str): Path to the transcript file, if one was given.
         classifier (transformers.pipeline): Pre-trained emotion classification pipeline.
+        model_name (str): Hugging Face model the classifier uses.
     """
 
-    def __init__(self, transcript_path):
+    model_name = "SamLowe/roberta-base-go_emotions"
+
+    def __init__(self, transcript_path=None, registry=None):
         """
-        Initialize the EmotionClassifier with the path to the transcript file.
+        Initialize the EmotionClassifier, optionally bound to a transcript file.
 
         Args:
-            transcript_path (str): Path to the transcript file.
+            transcript_path (str): Path to the transcript file used by `classify_emotions`.
+            registry (ModelRegistry): Registry to load the model from. Defaults to the process-wide registry.
         """
+        registry = registry or get_registry()
         self.transcript_path = transcript_path
-        self.classifier = pipeline(
-            task="text-classification",
-            model="SamLowe/roberta-base-go_emotions",
+        self.classifier = load_hf_pipeline(
+            "text-classification",
+            self.model_name,
+            registry=registry,
             top_k=None  # Return all emotion labels and their scores
         )
+        # The pipeline (and its fast tokenizer) is shared by worker threads and is not safe to call concurrently
+        self._lock = registry.usage_lock(self.classifier)
+
+    def classify(self, texts):
+        """
+        Classify emotions in one or more in-memory transcripts.
+
+        Args:
+            texts (str or iterable): A transcript or an iterable of transcripts.
+
+        Returns:
+            list: One list of emotion label/score dictionaries per transcript.
+        """
+        texts = as_text_list(texts)
+        if not texts:
+            return []
+
+        # Truncate long text if needed (BERT models have a token limit of 512)
+        chunks = [text[:1000] for text in texts]
+
+        # Run emotion classification using the pre-trained model
+        with self._lock:
+            return self.classifier(chunks)
+
+    def split_windows(self, text, max_tokens=512, stride=64):
+        """
+        Split a transcript into overlapping windows that fit within the model's token limit.
+
+        Args:
+            text (str): The transcript to split.
+            max_tokens (int): Maximum number of tokens per window, including special tokens.
+            stride (int): Number of tokens shared by consecutive windows.
+
+        Returns:
+            list: A list of (window_text, token_count) tuples covering the whole transcript.
+        """
+        tokenizer = self.classifier.tokenizer
+        with self._lock:
+            encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding["offset_mapping"]
+        if not offsets:
+            return [(text, 1)]
+
+        window_size = max_tokens - tokenizer.num_special_tokens_to_add()
+        step = max(1, window_size - stride)
+        windows = []
+        for start in range(0, len(offsets), step):
+            window_offsets = offsets[start:start + window_size]
+            windows.append((text[window_offsets[0][0]:window_offsets[-1][1]], len(window_offsets)))
+            if start + window_size >= len(offsets):
+                break
+        return windows
+
+    def classify_batch(self, texts, batch_size=16, aggregate="mean", max_tokens=512, stride=64):
+        """
+        Classify emotions over whole transcripts using batched, windowed inference.
+
+        Every transcript is split into token-aware windows, the windows of all transcripts are run
+        through the model together in padded batches (sorted by length so each batch holds windows of
+        similar size), and the window scores are aggregated back per transcript.
+
+        Args:
+            texts (str or iterable): A transcript or an iterable of transcripts.
+            batch_size (int): Number of windows per model call.
+            aggregate (str): How window scores are combined: "mean", "max" or "weighted"
+                             (mean weighted by the number of tokens in each window).
+            max_tokens (int): Maximum number of tokens per window (512 for RoBERTa).
+            stride (int): Number of tokens shared by consecutive windows.
+
+        Returns:
+            list: One list of emotion label/score dictionaries per transcript, sorted by score.
+        """
+        if aggregate not in ("mean", "max", "weighted"):
+            raise ValueError(f"Unknown aggregation mode: {aggregate}")
+
+        texts = as_text_list(texts)
+        if not texts:
+            return []
+
+        window_texts, owners, weights = [], [], []
+        for index, text in enumerate(texts):
+            for window_text, token_count in self.split_windows(text, max_tokens, stride):
+                window_texts.append(window_text)
+                owners.append(index)
+                weights.append(token_count)
+        owners = np.asarray(owners)
+        weights = np.asarray(weights, dtype=np.float32)
+
+        # Run the longest windows first so that each padded batch holds windows of similar length
+        order = np.argsort(-weights, kind="stable")
+        with self._lock:
+            outputs = self.classifier(
+                [window_texts[i] for i in order],
+                batch_size=batch_size,
+                truncation=True,
+                max_length=max_tokens
+            )
+
+        labels = sorted(result["label"] for result in outputs[0])
+        label_index = {label: i for i, label in enumerate(labels)}
+        scores = np.zeros((len(window_texts), len(labels)), dtype=np.float32)
+        for row, window_results in zip(order, outputs):
+            for result in window_results:
+                scores[row, label_index[result["label"]]] = result["score"]
+
+        # Aggregate window scores per transcript
+        if aggregate == "max":
+            totals = np.full((len(texts), len(labels)), -np.inf, dtype=np.float32)
+            np.maximum.at(totals, owners, scores)
+        else:
+            window_weights = weights if aggregate == "weighted" else np.ones_like(weights)
+            totals = np.zeros((len(texts), len(labels)), dtype=np.float32)
+            np.add.at(totals, owners, scores * window_weights[:, None])
+            totals /= np.bincount(owners, weights=window_weights, minlength=len(texts))[:, None]
+
+        return [
+            [{"label": labels[i], "score": float(row[i])} for i in np.argsort(-row)]
+            for row in totals
+        ]
 
     def classify_emotions(self):
         """
@@ -40,20 +171,12 @@ class EmotionClassifier:
             list: A list of dictionaries containing emotion labels and their scores,
                   or None if the transcript file is not found.
         """
-        # Check if the transcript file exists
-        if not os.path.exists(self.transcript_path):
-            print(f"File not found: {self.transcript_path}")
-            return None
-
         # Load the transcript content
-        with open(self.transcript_path, "r", encoding="utf-8") as f:
-            transcript = f.read()
-
-        # Truncate long text if needed (BERT models have a token limit of 512)
-        chunk = transcript[:1000]
+        transcript = read_transcript(self.transcript_path)
+        if transcript is None:
+            return None
 
-        # Run emotion classification using the pre-trained model
-        results = self.classifier(chunk)
+        results = self.classify(transcript)
 
         # Print all emotions and their scores
         print("All emotions and their scores:")
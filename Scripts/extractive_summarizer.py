@@ -0,0 +1,131 @@
+"""
+Extractive Summarizer Module
+
+This module provides a fast extractive summarizer for diarized transcripts. Utterances are ranked
+with TextRank over a TF-IDF cosine-similarity graph built with sparse matrix operations, and the
+highest ranked utterances are returned in conversation order. It needs no neural model and runs in
+milliseconds, which makes it the cheap tier in front of the abstractive summarizers. The
+`ExtractiveSummarizer` class is the main component of this module.
+"""
+
+import re
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from transcript_format import parse_utterances
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class ExtractiveSummarizer:
+    """
+    A TextRank summarizer that picks the most central utterances of a conversation.
+
+    Attributes:
+        ratio (float): Fraction of the utterances kept in the summary.
+        min_units (int): Minimum number of utterances kept.
+        max_units (int): Maximum number of utterances kept.
+        max_unit_words (int): Utterances longer than this are ranked sentence by sentence.
+        damping (float): TextRank damping factor.
+        similarity_threshold (float): Cosine similarities below this are dropped from the graph.
+    """
+
+    def __init__(self, ratio=0.2, min_units=1, max_units=8, max_unit_words=60, damping=0.85,
+                 similarity_threshold=0.05):
+        """
+        Initialize the summarizer settings.
+
+        Args:
+            ratio (float): Fraction of the utterances kept in the summary.
+            min_units (int): Minimum number of utterances kept.
+            max_units (int): Maximum number of utterances kept.
+            max_unit_words (int): Utterances longer than this are split into sentences before ranking.
+            damping (float): TextRank damping factor.
+            similarity_threshold (float): Minimum cosine similarity for an edge in the graph.
+        """
+        self.ratio = ratio
+        self.min_units = min_units
+        self.max_units = max_units
+        self.max_unit_words = max_unit_words
+        self.damping = damping
+        self.similarity_threshold = similarity_threshold
+
+    def split_units(self, transcript):
+        """
+        Split a speaker-labeled transcript into rankable (speaker, text) units.
+
+        Args:
+            transcript (str): The speaker-labeled transcript.
+
+        Returns:
+            list: (speaker, text) tuples in transcript order.
+        """
+        units = []
+        for speaker, text in parse_utterances(transcript):
+            if len(text.split()) > self.max_unit_words:
+                units.extend((speaker, sentence) for sentence in SENTENCE_END.split(text) if sentence.strip())
+            else:
+                units.append((speaker, text))
+        return units
+
+    def rank(self, texts):
+        """
+        Score texts by TextRank centrality over their TF-IDF similarity graph.
+
+        Args:
+            texts (list): The texts to rank.
+
+        Returns:
+            numpy.ndarray: One score per text; higher is more central. Scores sum to 1.
+        """
+        n = len(texts)
+        if n < 3:
+            return np.full(n, 1.0 / max(n, 1))
+        try:
+            # Rows are L2-normalized, so X @ X.T is the cosine similarity matrix
+            tfidf = TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(texts)
+        except ValueError:
+            # Only stop words (e.g. "Thanks, bye."): fall back to ranking by length
+            lengths = np.array([len(text) for text in texts], dtype=np.float64)
+            return lengths / lengths.sum()
+
+        similarity = (tfidf @ tfidf.T).tocsr()
+        similarity.setdiag(0)
+        similarity.data[similarity.data < self.similarity_threshold] = 0
+        similarity.eliminate_zeros()
+
+        # Row-normalize into a transition matrix; utterances with no edges jump uniformly
+        out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        transition = sparse.diags(np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)) @ similarity
+        transition_t = transition.T.tocsr()
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(100):
+            updated = (1 - self.damping) / n + self.damping * (transition_t @ scores + scores[dangling].sum() / n)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+        return scores / scores.sum()
+
+    def summarize(self, transcript):
+        """
+        Summarize a transcript by its most central utterances, in conversation order.
+
+        Args:
+            transcript (str): The speaker-labeled transcript.
+
+        Returns:
+            str: One `Speaker: text` line per selected utterance, or "No content to summarize.".
+        """
+        units = self.split_units(transcript)
+        if not units:
+            return "No content to summarize."
+
+        scores = self.rank([text for _, text in units])
+        keep = int(np.clip(round(len(units) * self.ratio), self.min_units, self.max_units))
+        selected = np.sort(np.argsort(-scores, kind="stable")[:keep])
+        return "\n".join(f"{units[i][0]}: {units[i][1]}" for i in selected)
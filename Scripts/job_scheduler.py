@@ -0,0 +1,246 @@
+"""
+Job Scheduler Module
+
+This module provides a bounded job queue served by a fixed pool of workers. Producers block (or
+time out) when the queue is full, so bursts of work apply backpressure instead of piling up threads.
+Jobs run either in the worker threads themselves or in a process pool, and the scheduler keeps
+queue-depth and latency metrics. The `JobScheduler` class is the main component of this module.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_STOP = object()  # Sentinel that tells a worker thread to exit
+
+
+class Job:
+    """
+    A unit of work submitted to a `JobScheduler`.
+
+    Attributes:
+        id (str): Unique job identifier, safe to use in file names.
+        payload (object): Argument passed to the scheduler's handler.
+        submitted_at (float): Time the job was queued.
+        started_at (float): Time a worker picked the job up.
+        finished_at (float): Time the job finished.
+        result (object): Return value of the handler.
+        error (Exception): Exception raised by the handler, if any.
+    """
+
+    def __init__(self, payload, job_id=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.payload = payload
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the job to finish.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if the job finished.
+        """
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class JobScheduler:
+    """
+    A bounded job queue processed by a pool of worker threads or processes.
+
+    Attributes:
+        handler (callable): Function called as `handler(payload, job_id=...)` for each job
+                            (must be picklable in process mode).
+        workers (int): Number of jobs processed concurrently.
+        max_queue (int): Maximum number of jobs waiting in the queue.
+        mode (str): "thread" runs jobs in the worker threads, "process" runs them in a process pool.
+        on_done (callable): Called with each finished `Job` in the worker thread, in the parent process.
+    """
+
+    def __init__(self, handler, workers=2, max_queue=8, mode="thread", initializer=None, name="jobs", on_done=None):
+        """
+        Initialize the scheduler and start its workers.
+
+        Args:
+            handler (callable): Function called as `handler(payload, job_id=...)` for each job.
+            workers (int): Number of jobs processed concurrently.
+            max_queue (int): Maximum number of queued jobs before `submit` blocks.
+            mode (str): "thread" or "process".
+            initializer (callable): Optional function run once in each worker process (process mode only).
+            name (str): Name used for worker threads and log messages.
+            on_done (callable): Optional function called with each job once it has finished or failed.
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown scheduler mode: {mode}")
+
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.mode = mode
+        self.name = name
+        self.on_done = on_done
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._accepting = True
+        self._metrics_lock = threading.Lock()
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0}
+        self._in_flight = 0
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer) if mode == "process" else None
+
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"{name}-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, payload, block=True, timeout=None):
+        """
+        Queue a job, blocking while the queue is full.
+
+        Args:
+            payload (object): Argument passed to the handler.
+            block (bool): Wait for space in the queue if it is full.
+            timeout (float): Maximum time to wait for space, in seconds.
+
+        Returns:
+            Job: The queued job, or None if the scheduler is shut down or the queue stayed full.
+        """
+        if not self._accepting:
+            print(f"[{self.name}] Scheduler is shutting down; job rejected.")
+            return None
+
+        job = Job(payload)
+        try:
+            self._queue.put(job, block=block, timeout=timeout)
+        except queue.Full:
+            with self._metrics_lock:
+                self._counts["rejected"] += 1
+            print(f"[{self.name}] Queue full ({self.max_queue} jobs); job rejected.")
+            return None
+
+        with self._metrics_lock:
+            self._counts["submitted"] += 1
+        return job
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                self._queue.task_done()
+                return
+
+            job.started_at = time.perf_counter()
+            with self._metrics_lock:
+                self._in_flight += 1
+                self._wait_times.append(job.started_at - job.submitted_at)
+            try:
+                if self._pool is not None:
+                    job.result = self._pool.submit(self.handler, job.payload, job_id=job.id).result()
+                else:
+                    job.result = self.handler(job.payload, job_id=job.id)
+                outcome = "completed"
+            except Exception as e:
+                job.error = e
+                outcome = "failed"
+                print(f"[{self.name}] Job {job.id} failed: {e}")
+            finally:
+                job.finished_at = time.perf_counter()
+                with self._metrics_lock:
+                    self._in_flight -= 1
+                    self._counts[outcome] += 1
+                    self._run_times.append(job.finished_at - job.started_at)
+                if self.on_done is not None:
+                    try:
+                        self.on_done(job)
+                    except Exception as e:
+                        print(f"[{self.name}] Completion callback for job {job.id} failed: {e}")
+                job._done.set()
+                self._queue.task_done()
+
+    def shutdown(self, drain=True, timeout=None):
+        """
+        Stop accepting jobs and stop the workers.
+
+        Args:
+            drain (bool): Finish every queued job first. If False, queued jobs are cancelled and only
+                          the jobs already running are waited for.
+            timeout (float): Maximum time to wait for each worker, in seconds.
+        """
+        self._accepting = False
+        if not drain:
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    # Left by an earlier draining shutdown that was interrupted; the loop below adds new ones
+                    self._queue.task_done()
+                    continue
+                job.error = RuntimeError("Cancelled at shutdown")
+                job._done.set()
+                self._queue.task_done()
+                with self._metrics_lock:
+                    self._counts["cancelled"] += 1
+
+        print(f"[{self.name}] Shutting down ({'draining' if drain else 'cancelling'} "
+              f"{self._queue.qsize()} queued jobs)...")
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        if timeout is None:
+            # A join interrupted by Ctrl+C can leave a still-running worker marked as stopped (CPython
+            # before 3.13), so the repeated join above returns at once; wait for the running jobs directly
+            while self._in_flight:
+                time.sleep(0.05)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def metrics(self):
+        """
+        Return queue depth, job counts and wait/run latency statistics.
+
+        Returns:
+            dict: The scheduler metrics.
+        """
+        with self._metrics_lock:
+            wait_times = sorted(self._wait_times)
+            run_times = sorted(self._run_times)
+            metrics = dict(self._counts)
+            metrics.update(
+                queue_depth=self._queue.qsize(),
+                max_queue=self.max_queue,
+                in_flight=self._in_flight,
+                workers=self.workers,
+            )
+        for label, values in (("wait", wait_times), ("run", run_times)):
+            metrics[f"{label}_mean"] = sum(values) / len(values) if values else 0.0
+            metrics[f"{label}_p95"] = values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0.0
+        return metrics
+
+    def print_metrics(self):
+        """
+        Print a one-line summary of the scheduler metrics.
+        """
+        m = self.metrics()
+        print(f"[{self.name}] queue={m['queue_depth']}/{m['max_queue']} in_flight={m['in_flight']} "
+              f"done={m['completed']} failed={m['failed']} rejected={m['rejected']} "
+              f"wait_mean={m['wait_mean']:.2f}s wait_p95={m['wait_p95']:.2f}s "
+              f"run_mean={m['run_mean']:.2f}s run_p95={m['run_p95']:.2f}s")
@@ -0,0 +1,290 @@
+"""
+Model Registry Module
+
+This module provides a process-wide registry for the heavy models used by the pipeline (Whisper,
+PyAnnote, the RoBERTa emotion classifier, VADER and the LED summarizer). Each model is loaded lazily
+the first time it is requested and then shared by every component in the process. The `ModelRegistry`
+class is the main component of this module; `get_registry()` returns the shared instance.
+"""
+
+import os
+import threading
+import time
+
+import psutil
+
+
+def default_device():
+    """
+    Return the preferred device for inference ("cuda" when available, otherwise "cpu").
+
+    Returns:
+        str: The device name.
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+class ModelRegistry:
+    """
+    A thread-safe registry that loads each model once and shares it across components.
+
+    Models are keyed by (name, device, dtype). Loads are serialized behind a single lock so that the
+    resident memory measured around each load can be attributed to that model; lookups of models that
+    are already loaded do not take the lock.
+
+    Attributes:
+        models (dict): Loaded models keyed by (name, device, dtype).
+        stats (dict): Load statistics keyed by (name, device, dtype).
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self.models = {}
+        self.stats = {}
+        self._load_lock = threading.Lock()
+        self._usage_locks = {}
+        self._process = psutil.Process(os.getpid())
+
+    def get(self, name, loader, device="cpu", dtype=None):
+        """
+        Return the model registered under (name, device, dtype), loading it on first use.
+
+        Args:
+            name (str): Model identifier (e.g. "whisper/base").
+            loader (callable): Zero-argument function that builds the model.
+            device (str): Device the model is loaded on.
+            dtype (str): Optional dtype name the model is loaded with.
+
+        Returns:
+            object: The loaded model.
+        """
+        key = (name, device, dtype)
+        model = self.models.get(key)
+        if model is not None:
+            self._record_hit(key)
+            return model
+
+        with self._load_lock:
+            # Another thread may have finished loading while we waited for the lock
+            model = self.models.get(key)
+            if model is not None:
+                self._record_hit(key)
+                return model
+
+            print(f"Loading model {name} (device={device}, dtype={dtype})...")
+            rss_before = self._process.memory_info().rss
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            rss_after = self._process.memory_info().rss
+
+            self.stats[key] = {
+                "name": name,
+                "device": device,
+                "dtype": dtype,
+                "load_seconds": load_seconds,
+                "rss_bytes": max(0, rss_after - rss_before),
+                "hits": 0,
+            }
+            self.models[key] = model
+            print(f"Loaded model {name} in {load_seconds:.2f}s "
+                  f"(+{self.stats[key]['rss_bytes'] / 2**20:.1f} MiB resident)")
+            return model
+
+    def _record_hit(self, key):
+        stat = self.stats.get(key)
+        if stat is not None:
+            stat["hits"] += 1
+
+    def usage_lock(self, model):
+        """
+        Return a lock shared by every component that uses `model`.
+
+        Models such as Whisper keep per-call state and are not safe to call from several threads at
+        once; components hold this lock around inference so that sharing one instance stays safe.
+
+        Args:
+            model (object): A model returned by `get`.
+
+        Returns:
+            threading.Lock: The lock for this model.
+        """
+        with self._load_lock:
+            return self._usage_locks.setdefault(id(model), threading.Lock())
+
+    def is_loaded(self, name, device="cpu", dtype=None):
+        """
+        Check whether a model has already been loaded.
+
+        Args:
+            name (str): Model identifier.
+            device (str): Device the model is loaded on.
+            dtype (str): Optional dtype name.
+
+        Returns:
+            bool: True if the model is in the registry.
+        """
+        return (name, device, dtype) in self.models
+
+    def release(self, name, device="cpu", dtype=None):
+        """
+        Drop a model from the registry so it can be garbage collected.
+
+        Args:
+            name (str): Model identifier.
+            device (str): Device the model is loaded on.
+            dtype (str): Optional dtype name.
+        """
+        key = (name, device, dtype)
+        with self._load_lock:
+            model = self.models.pop(key, None)
+            self.stats.pop(key, None)
+            self._usage_locks.pop(id(model), None)
+
+    def report(self):
+        """
+        Return load time and resident memory for each loaded model.
+
+        Returns:
+            list: A list of dictionaries, one per loaded model, sorted by resident memory.
+        """
+        rows = [dict(stat) for stat in list(self.stats.values())]
+        return sorted(rows, key=lambda row: row["rss_bytes"], reverse=True)
+
+    def print_report(self):
+        """
+        Print a table of the loaded models with their load time and resident memory.
+        """
+        print("Loaded models:")
+        for row in self.report():
+            print(f"  {row['name']:<40} {row['device']:<5} load={row['load_seconds']:.2f}s "
+                  f"rss={row['rss_bytes'] / 2**20:.1f} MiB hits={row['hits']}")
+        print(f"  Process resident memory: {self._process.memory_info().rss / 2**20:.1f} MiB")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Return the process-wide model registry, creating it on first use.
+
+    Returns:
+        ModelRegistry: The shared registry.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+# Loaders for the models used by the pipeline components
+
+def load_whisper(model_name="base", device=None, registry=None):
+    """
+    Return a shared Whisper model.
+
+    Args:
+        model_name (str): Name of the Whisper model.
+        device (str): Device to load the model on. Defaults to `default_device()`.
+        registry (ModelRegistry): Registry to use. Defaults to the process-wide registry.
+
+    Returns:
+        whisper.Whisper: The Whisper model.
+    """
+    import whisper
+
+    registry = registry or get_registry()
+    device = device or default_device()
+    return registry.get(
+        f"whisper/{model_name}",
+        lambda: whisper.load_model(model_name, device=device),
+        device=device
+    )
+
+
+def load_diarization_pipeline(model_name="pyannote/speaker-diarization-3.1", device=None, registry=None):
+    """
+    Return a shared PyAnnote speaker diarization pipeline, or None if it cannot be loaded.
+
+    Args:
+        model_name (str): Name of the PyAnnote pipeline on the Hugging Face hub.
+        device (str): Device to run the pipeline on. Defaults to `default_device()`.
+        registry (ModelRegistry): Registry to use. Defaults to the process-wide registry.
+
+    Returns:
+        pyannote.audio.Pipeline: The diarization pipeline, or None on failure.
+    """
+    from pyannote.audio import Pipeline
+    from dotenv import load_dotenv
+
+    registry = registry or get_registry()
+    device = device or default_device()
+
+    def loader():
+        import torch
+
+        load_dotenv()
+        pipeline = Pipeline.from_pretrained(model_name, use_auth_token=os.getenv("HUGGINGFACE_TOKEN"))
+        if pipeline is not None and device != "cpu":
+            pipeline.to(torch.device(device))
+        return pipeline
+
+    try:
+        return registry.get(model_name, loader, device=device)
+    except Exception as e:
+        print(f"Failed to initialize speaker diarization pipeline: {e}")
+        return None
+
+
+def load_hf_pipeline(task, model_name, device=None, registry=None, **kwargs):
+    """
+    Return a shared Hugging Face `transformers` pipeline.
+
+    Args:
+        task (str): Pipeline task (e.g. "summarization").
+        model_name (str): Model name on the Hugging Face hub.
+        device (str): Device to load the model on. Defaults to `default_device()`.
+        registry (ModelRegistry): Registry to use. Defaults to the process-wide registry.
+        **kwargs: Extra arguments passed to `transformers.pipeline`.
+
+    Returns:
+        transformers.Pipeline: The pipeline.
+    """
+    from transformers import pipeline
+
+    registry = registry or get_registry()
+    device = device or default_device()
+    dtype = kwargs.get("torch_dtype")
+    dtype_name = str(dtype).replace("torch.", "") if dtype is not None else None
+    return registry.get(
+        f"{task}/{model_name}",
+        lambda: pipeline(task, model=model_name, device=0 if device == "cuda" else -1, **kwargs),
+        device=device,
+        dtype=dtype_name
+    )
+
+
+def load_vader(registry=None):
+    """
+    Return a shared VADER SentimentIntensityAnalyzer.
+
+    Args:
+        registry (ModelRegistry): Registry to use. Defaults to the process-wide registry.
+
+    Returns:
+        SentimentIntensityAnalyzer: The VADER analyzer.
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    registry = registry or get_registry()
+    return registry.get("vader", SentimentIntensityAnalyzer)
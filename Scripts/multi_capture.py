@@ -0,0 +1,235 @@
+"""
+Multi Capture Module
+
+This module records several counters from one process. Each source is either its own input device
+or one channel of a multichannel interface, and gets its own `CaptureEngine`: its own ring, VAD
+state, gain and silence segmentation, so a conversation at one counter never cuts or delays another.
+Every conversation is tagged with the ID of its source and all sources feed the same callbacks, so a
+single pipeline (and one copy of each model) serves the whole store. Sources can be backed by WAV
+files instead of hardware for tests. The `MultiCapture` class is the main component of this module.
+"""
+
+import threading
+import time
+from functools import partial
+
+import numpy as np
+import pyaudio
+
+from audio_recorder import AudioRecorder
+from capture_engine import CaptureEngine, WavInputStream
+
+
+class CaptureSource:
+    """
+    One input of a multi-source capture.
+
+    Attributes:
+        source_id (str): Identifier conversations from this source are tagged with.
+        device (int): PyAudio input device index, or None for the default device.
+        channel (int): Channel of the shared multichannel interface, or None for a device of its own.
+        input_wav (str): WAV file that stands in for the device.
+        gain (float): Input gain of the source.
+    """
+
+    def __init__(self, source_id, device=None, channel=None, input_wav=None, gain=1.0):
+        self.source_id = source_id
+        self.device = device
+        self.channel = channel
+        self.input_wav = input_wav
+        self.gain = gain
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse a `--source-input` specification.
+
+        Forms: `ID=DEVICE_INDEX`, `ID=ch:CHANNEL` (channel of the shared interface), `ID=FILE.wav`
+        or `ID=default`, each optionally followed by `@GAIN`, e.g. `counter2=ch:1@1.5`.
+
+        Args:
+            spec (str): The specification.
+
+        Returns:
+            CaptureSource: The parsed source.
+        """
+        source_id, sep, target = spec.partition("=")
+        if not sep or not source_id:
+            raise ValueError(f"Invalid source '{spec}'; expected ID=DEVICE, ID=ch:N or ID=FILE.wav")
+        target, _, gain = target.partition("@")
+        gain = float(gain) if gain else 1.0
+        if target.startswith("ch:"):
+            return cls(source_id, channel=int(target[3:]), gain=gain)
+        if target.lower().endswith(".wav"):
+            return cls(source_id, input_wav=target, gain=gain)
+        if target in ("", "default"):
+            return cls(source_id, gain=gain)
+        return cls(source_id, device=int(target), gain=gain)
+
+
+class MultiCapture:
+    """
+    Concurrent capture of several sources, each segmented independently.
+
+    Sources with a device (or WAV file) of their own each open a callback stream. Channel sources
+    share one stream on the multichannel `interface`, whose callback splits the interleaved audio into
+    the engines' rings without copying it first.
+
+    Attributes:
+        sources (list): The `CaptureSource` objects.
+        engines (dict): `CaptureEngine` per source ID.
+    """
+
+    def __init__(self, sources, on_conversation_end, on_conversation_start=None, on_audio=None, interface=None,
+                 vad="energy", rate=44100, chunk=1024, silence_duration=5.0, ring_seconds=10.0, speed=1.0,
+                 output_folder="recordings"):
+        """
+        Initialize the sources.
+
+        Args:
+            sources (list): `CaptureSource` objects (or specification strings, see `CaptureSource.parse`).
+            on_conversation_end (function): Called with a `CaptureSegment` (tagged with `source_id`) when a
+                                            conversation ends at any source; it must `release` the segment.
+            on_conversation_start (function): Optional; called as `on_conversation_start(source_id)`.
+            on_audio (function): Optional; called as `on_audio(source_id, raw_chunk)`.
+            interface (int or str): Device index or WAV file of the multichannel interface used by channel sources.
+            vad (str): Voice activity detector kind for each source ("energy", "silero" or None).
+            rate (int): Sample rate of the devices.
+            chunk (int): Frames per callback.
+            silence_duration (float): Silence that ends a conversation.
+            ring_seconds (float): Audio each source's ring can hold while its segmenter catches up.
+            speed (float): Playback speed of WAV-backed sources, or None for as fast as possible.
+            output_folder (str): Folder of the per-source recorders.
+        """
+        self.sources = [CaptureSource.parse(s) if isinstance(s, str) else s for s in sources]
+        ids = [source.source_id for source in self.sources]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate source IDs: {ids}")
+        self.interface = interface
+        self.speed = speed
+        self.audio = None
+        self.interface_stream = None
+        self.engines = {}
+
+        channel_sources = [source for source in self.sources if source.channel is not None]
+        if channel_sources and interface is None:
+            raise ValueError("Channel sources need an interface (device index or WAV file)")
+        self._interface_channels = max((source.channel for source in channel_sources), default=-1) + 1
+        if channel_sources and isinstance(interface, str):
+            self.interface_stream = WavInputStream(interface, self._on_interface_input, chunk=chunk, speed=speed)
+            self._interface_channels = self.interface_stream.channels
+            rate = self.interface_stream.rate
+        self._channel_engines = []
+        needs_device = any(source.input_wav is None and source.channel is None for source in self.sources)
+        if needs_device or (channel_sources and self.interface_stream is None):
+            self.audio = pyaudio.PyAudio()
+
+        for source in self.sources:
+            # A recorder per source keeps the VAD state and capture buffers apart
+            recorder = AudioRecorder(output_folder=output_folder, silence_duration=silence_duration, rate=rate,
+                                     chunk=chunk, vad=vad)
+            engine = CaptureEngine(
+                recorder,
+                on_conversation_end,
+                on_conversation_start=partial(on_conversation_start, source.source_id) if on_conversation_start else None,
+                on_audio=partial(on_audio, source.source_id) if on_audio else None,
+                ring_seconds=ring_seconds,
+                input_wav=source.input_wav,
+                speed=speed,
+                source_id=source.source_id,
+                gain=source.gain,
+                device_index=source.device,
+                external_input=source.channel is not None,
+                audio=self.audio,
+            )
+            self.engines[source.source_id] = engine
+            if source.channel is not None:
+                if source.channel >= self._interface_channels:
+                    raise ValueError(f"Source {source.source_id}: the interface has no channel {source.channel}")
+                self._channel_engines.append((source.channel, engine))
+        if isinstance(self.interface_stream, WavInputStream):
+            self.interface_stream.rings = [engine.ring for _, engine in self._channel_engines]
+
+    def _on_interface_input(self, in_data, frame_count, time_info, status):
+        # Each engine's ring copies its channel straight out of the strided view
+        frames = np.frombuffer(in_data, dtype=np.int16)
+        frames = frames[:len(frames) - len(frames) % self._interface_channels].reshape(-1, self._interface_channels)
+        for channel, engine in self._channel_engines:
+            engine.feed(frames[:, channel], status)
+        return None, pyaudio.paContinue
+
+    def start(self):
+        """
+        Start every engine and the shared interface stream.
+        """
+        for engine in self.engines.values():
+            engine.start()
+        if self._channel_engines:
+            if self.interface_stream is None:
+                rate = self._channel_engines[0][1].rate
+                self.interface_stream = self.audio.open(
+                    format=pyaudio.paInt16,
+                    channels=self._interface_channels,
+                    rate=rate,
+                    input=True,
+                    input_device_index=self.interface,
+                    frames_per_buffer=self._channel_engines[0][1].chunk,
+                    stream_callback=self._on_interface_input,
+                    start=False
+                )
+            self.interface_stream.start_stream()
+        print(f"Capturing {len(self.engines)} sources: {', '.join(self.engines)}")
+
+    def _streams(self):
+        streams = [engine.stream for engine in self.engines.values() if engine.stream is not None]
+        return streams + ([self.interface_stream] if self.interface_stream is not None else [])
+
+    def stop(self, flush=True):
+        """
+        Stop every stream and engine.
+
+        Args:
+            flush (bool): Hand conversations in progress to `on_conversation_end` instead of dropping them.
+        """
+        if self.interface_stream is not None:
+            self.interface_stream.stop_stream()
+            self.interface_stream.close()
+        # Engines stop in parallel so one slow final callback does not hold up the others
+        threads = [threading.Thread(target=engine.stop, args=(flush,)) for engine in self.engines.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.audio is not None:
+            self.audio.terminate()
+
+    def run(self):
+        """
+        Capture until Ctrl+C or until every input stream has ended, then stop.
+        """
+        print("Listening on all sources... Press Ctrl+C to stop.")
+        self.start()
+        try:
+            while any(stream.is_active() for stream in self._streams()):
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            print("Stopping continuous listening...")
+        finally:
+            self.stop(flush=True)
+            self.print_stats()
+
+    def stats(self):
+        """
+        Return the capture counters of every source.
+
+        Returns:
+            dict: `CaptureEngine.stats()` per source ID.
+        """
+        return {source_id: engine.stats() for source_id, engine in self.engines.items()}
+
+    def print_stats(self):
+        """
+        Print the capture counters of every source.
+        """
+        for engine in self.engines.values():
+            engine.print_stats()
@@ -0,0 +1,209 @@
+"""
+Result Cache Module
+
+This module provides a content-addressed, on-disk cache for the outputs of the pipeline stages.
+Each entry is keyed on a hash of its input content (the decoded audio or the transcript text),
+the identifier of the model that produced it and the parameters it was produced with, and each
+stage is stored separately, so changing the summarizer settings still reuses the cached
+diarization and transcription. The cache is bounded in size and evicts the least recently used
+entries. The `ResultCache` class is the main component of this module.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    """
+    Hash text, bytes or a NumPy array.
+
+    Args:
+        data (str, bytes or numpy.ndarray): The content to hash.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        data = memoryview(data).cast("B")  # NumPy arrays are hashed without copying
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    A size-bounded, least-recently-used cache of JSON stage outputs on local disk.
+
+    Entries live in `<cache_dir>/<stage>/<key[:2]>/<key>.json`. The file modification time is the
+    last-use time, so the recency order survives restarts and is shared by processes using the
+    same directory.
+
+    Attributes:
+        cache_dir (str): Root directory of the cache.
+        max_bytes (int): Size budget; the oldest entries are evicted once it is exceeded.
+        hits (dict): Cache hits per stage.
+        misses (dict): Cache misses per stage.
+    """
+
+    def __init__(self, cache_dir="cache", max_bytes=2 * 2**30):
+        """
+        Open a cache directory and index the entries already in it.
+
+        Args:
+            cache_dir (str): Root directory of the cache.
+            max_bytes (int): Size budget in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # Path -> size, least recently used first
+        self._size = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        found = []
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._size += size
+
+    @staticmethod
+    def key(input_hash, model, params=None):
+        """
+        Build the cache key of a stage output.
+
+        Args:
+            input_hash (str): Content hash of the stage input (see `content_hash`).
+            model (str): Identifier of the model that produces the output, including its version.
+            params (dict): Parameters that change the output.
+
+        Returns:
+            str: The SHA-256 hex digest of the three parts.
+        """
+        material = json.dumps([input_hash, model, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, stage, key):
+        return os.path.join(self.cache_dir, stage, key[:2], f"{key}.json")
+
+    def get(self, stage, key):
+        """
+        Look up a stage output.
+
+        Args:
+            stage (str): Stage name, e.g. "transcription".
+            key (str): Key from `ResultCache.key`.
+
+        Returns:
+            object: The cached value, or None on a miss.
+        """
+        path = self._path(stage, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses[stage] = self.misses.get(stage, 0) + 1
+            return None
+
+        with self._lock:
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        return value
+
+    def put(self, stage, key, value):
+        """
+        Store a stage output and evict old entries if the cache is over budget.
+
+        Args:
+            stage (str): Stage name.
+            key (str): Key from `ResultCache.key`.
+            value (object): JSON-serializable stage output.
+        """
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value, default=float).encode("utf-8")  # NumPy scalars are stored as floats
+
+        # Write to a temporary file first so readers never see a partial entry
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._evict()
+
+    def cached(self, stage, key, compute):
+        """
+        Return the cached output of a stage, computing and storing it on a miss.
+
+        Args:
+            stage (str): Stage name.
+            key (str): Key from `ResultCache.key`.
+            compute (callable): Function producing the output; a None result is not cached.
+
+        Returns:
+            object: The cached or computed value.
+        """
+        value = self.get(stage, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(stage, key, value)
+        return value
+
+    def _evict(self):
+        # Called with the lock held; trims to 90% of the budget so eviction does not run on every put
+        if self._size <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        while self._entries and self._size > target:
+            path, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Return hit and miss counts per stage and the size of the cache.
+
+        Returns:
+            dict: {"hits", "misses", "entries", "bytes", "max_bytes"}
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def print_stats(self):
+        """
+        Print a one-line summary of the cache statistics.
+        """
+        s = self.stats()
+        stages = sorted(set(s["hits"]) | set(s["misses"]))
+        counts = ", ".join(f"{stage}={s['hits'].get(stage, 0)}/{s['hits'].get(stage, 0) + s['misses'].get(stage, 0)}"
+                           for stage in stages)
+        print(f"Result cache: {s['entries']} entries, {s['bytes'] / 2**20:.1f}/{s['max_bytes'] / 2**20:.0f} MiB; "
+              f"hits {counts or 'none'}")
@@ -1,32 +1,221 @@
 """
 Sentiment Analyzer Module
 
-This module provides functionality to analyze the sentiment of a transcript file using the VADER
+This module provides functionality to analyze the sentiment of transcripts using the VADER
 SentimentIntensityAnalyzer. It includes the `SentimentAnalyzer` class and an example usage for testing.
 """
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import os
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import numpy as np
+from model_registry import load_vader
+from transcript_format import read_transcript, as_text_list, parse_utterances
+
+SCORE_COLUMNS = ("neg", "neu", "pos", "compound")
+PARALLEL_MIN_TEXTS = 5000  # Below this, VADER scores in-process faster than a pool round trip
+
+
+class SentimentTimeline:
+    """
+    Per-utterance sentiment scores for a conversation, stored in NumPy arrays.
+
+    Attributes:
+        speakers (list): Distinct speaker labels, in order of first appearance.
+        speaker_codes (numpy.ndarray): Index into `speakers` for each utterance.
+        texts (list): Utterance texts.
+        scores (numpy.ndarray): Array of shape (utterances, 4) with the neg, neu, pos and compound scores.
+    """
+
+    def __init__(self, utterances, scores):
+        """
+        Build the timeline from parsed utterances and their VADER scores.
+
+        Args:
+            utterances (list): A list of (speaker, text) tuples.
+            scores (list): One VADER score dictionary per utterance.
+        """
+        self.speakers = list(dict.fromkeys(speaker for speaker, _ in utterances))
+        speaker_index = {speaker: i for i, speaker in enumerate(self.speakers)}
+        self.speaker_codes = np.fromiter((speaker_index[speaker] for speaker, _ in utterances),
+                                         dtype=np.int64, count=len(utterances))
+        self.texts = [text for _, text in utterances]
+        self.scores = np.array([[score[column] for column in SCORE_COLUMNS] for score in scores],
+                               dtype=np.float64).reshape(len(scores), len(SCORE_COLUMNS))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def column(self, name):
+        """
+        Return one score column (neg, neu, pos or compound) for all utterances.
+        """
+        return self.scores[:, SCORE_COLUMNS.index(name)]
+
+    def speaker_means(self):
+        """
+        Compute the mean scores of each speaker.
+
+        Returns:
+            dict: Speaker label -> dictionary of mean scores and utterance count.
+        """
+        counts = np.bincount(self.speaker_codes, minlength=len(self.speakers))
+        sums = np.zeros((len(self.speakers), len(SCORE_COLUMNS)))
+        np.add.at(sums, self.speaker_codes, self.scores)
+        means = sums / np.maximum(counts, 1)[:, None]
+        return {
+            speaker: dict(zip(SCORE_COLUMNS, means[i].tolist()), utterances=int(counts[i]))
+            for i, speaker in enumerate(self.speakers)
+        }
+
+    def rolling(self, window=5, column="compound"):
+        """
+        Compute the rolling mean of a score column over consecutive utterances.
+
+        Args:
+            window (int): Number of utterances per window.
+            column (str): Score column to average.
+
+        Returns:
+            numpy.ndarray: The rolling means (empty if there are fewer utterances than `window`).
+        """
+        values = self.column(column)
+        if len(values) < window:
+            return np.empty(0)
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    def trajectory(self, fraction=0.2, column="compound"):
+        """
+        Compare sentiment at the start of the call with sentiment at the end.
+
+        Args:
+            fraction (float): Fraction of the utterances that makes up the start and end of the call.
+            column (str): Score column to compare.
+
+        Returns:
+            dict: Mean score at the start, at the end, and the change between them.
+        """
+        values = self.column(column)
+        if not len(values):
+            return {"start": 0.0, "end": 0.0, "change": 0.0}
+        size = max(1, int(round(len(values) * fraction)))
+        start, end = float(values[:size].mean()), float(values[-size:].mean())
+        return {"start": start, "end": end, "change": end - start}
+
+
+# VADER instance used by pool worker processes
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = load_vader()
+
+
+def _score_in_worker(text):
+    return _worker_analyzer.polarity_scores(text)
+
+
+# Pool shared by every analyzer in this process, started on first use and kept for later calls
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            _pool_workers = workers
+        return _pool
 
 
 class SentimentAnalyzer:
     """
-    A class to analyze the sentiment of a transcript file using the VADER SentimentIntensityAnalyzer.
+    A class to analyze the sentiment of transcripts using the VADER SentimentIntensityAnalyzer.
+
+    The analyzer is built once and can then score any number of in-memory transcripts with `score`.
+    Passing a `transcript_path` keeps the original file-based `analyze_sentiment` API.
 
     Attributes:
-        transcript_path (str): Path to the transcript file.
+        transcript_path (str): Path to the transcript file, if one was given.
         analyzer (SentimentIntensityAnalyzer): Instance of the VADER sentiment analyzer.
     """
 
-    def __init__(self, transcript_path):
+    def __init__(self, transcript_path=None, registry=None):
         """
-        Initialize the SentimentAnalyzer with the path to the transcript file.
+        Initialize the SentimentAnalyzer, optionally bound to a transcript file.
 
         Args:
-            transcript_path (str): Path to the transcript file.
+            transcript_path (str): Path to the transcript file used by `analyze_sentiment`.
+            registry (ModelRegistry): Registry to load VADER from. Defaults to the process-wide registry.
         """
         self.transcript_path = transcript_path
-        self.analyzer = SentimentIntensityAnalyzer()
+        self.analyzer = load_vader(registry=registry)
+        self.cache = {}  # Utterance text -> VADER scores
+        self.cache_size = 50000
+
+    def score(self, texts):
+        """
+        Score the sentiment of one or more in-memory transcripts.
+
+        Args:
+            texts (str or iterable): A transcript or an iterable of transcripts.
+
+        Returns:
+            list: One dictionary of sentiment scores (neg, neu, pos, compound) per transcript.
+        """
+        return [self.analyzer.polarity_scores(text) for text in as_text_list(texts)]
+
+    def score_utterances(self, texts, workers=1):
+        """
+        Score short utterances, reusing cached scores for texts seen before.
+
+        Args:
+            texts (iterable): Utterance texts.
+            workers (int): Number of worker processes for uncached texts. With 1, or fewer than
+                           `PARALLEL_MIN_TEXTS` uncached texts, they are scored in-process.
+
+        Returns:
+            list: One dictionary of sentiment scores per utterance.
+        """
+        texts = as_text_list(texts)
+        results = {text: self.cache.get(text) for text in texts}
+        missing = [text for text, scores in results.items() if scores is None]
+        if missing:
+            if workers > 1 and len(missing) >= PARALLEL_MIN_TEXTS:
+                scores = list(_get_pool(workers).map(_score_in_worker, missing, chunksize=64))
+            else:
+                scores = [self.analyzer.polarity_scores(text) for text in missing]
+            results.update(zip(missing, scores))
+
+            if len(self.cache) + len(missing) > self.cache_size:
+                self.cache.clear()
+            self.cache.update(zip(missing, scores))
+        return [results[text] for text in texts]
+
+    def analyze_timeline(self, transcript=None, workers=1):
+        """
+        Score each `Speaker: text` utterance of a transcript and build a sentiment timeline.
+
+        Args:
+            transcript (str): The speaker-labeled transcript. If None, the transcript file is read.
+            workers (int): Number of worker processes used for scoring.
+
+        Returns:
+            SentimentTimeline: The per-utterance timeline, or None if the transcript file is not found.
+        """
+        if transcript is None:
+            transcript = read_transcript(self.transcript_path)
+            if transcript is None:
+                return None
+
+        utterances = parse_utterances(transcript)
+        scores = self.score_utterances([text for _, text in utterances], workers=workers)
+        return SentimentTimeline(utterances, scores)
 
     def analyze_sentiment(self):
         """
@@ -36,17 +225,13 @@ class SentimentAnalyzer:
             dict: A dictionary containing sentiment scores (positive, neutral, negative, and compound).
                   Returns None if the transcript file is not found.
         """
-        # Check if the transcript file exists
-        if not os.path.exists(self.transcript_path):
-            print(f"File not found: {self.transcript_path}")
-            return None
-
         # Load the transcript content
-        with open(self.transcript_path, "r", encoding="utf-8") as f:
-            transcript = f.read()
+        transcript = read_transcript(self.transcript_path)
+        if transcript is None:
+            return None
 
         # Get sentiment scores using VADER
-        scores = self.analyzer.polarity_scores(transcript)
+        scores = self.score(transcript)[0]
 
         # Print the sentiment scores
         print("Sentiment Scores:", scores)
@@ -0,0 +1,192 @@
+"""
+Speaker Alignment Module
+
+This module assigns speaker labels from a diarization result to Whisper transcription segments (or to
+individual words when word timestamps are available). Diarization turns are sorted once into an
+interval tree, so each segment is matched to the speaker it overlaps the most in O(log m) time per
+overlapping turn instead of rescanning every turn. The `SpeakerIndex` class is the main component of this module.
+"""
+
+from bisect import bisect_left
+
+
+def diarization_turns(diarization_result):
+    """
+    Extract the speaker turns of a PyAnnote diarization result.
+
+    Args:
+        diarization_result (pyannote.core.Annotation): Speaker diarization output, None, or an
+            already extracted list of turns (returned unchanged).
+
+    Returns:
+        list: A list of (start, end, speaker_label) tuples.
+    """
+    if diarization_result is None:
+        return []
+    if isinstance(diarization_result, list):
+        return diarization_result
+    return [
+        (turn.start, turn.end, speaker_label)
+        for turn, _, speaker_label in diarization_result.itertracks(yield_label=True)
+    ]
+
+
+class SpeakerIndex:
+    """
+    An interval tree over diarization turns.
+
+    The turns are sorted by start time and the sorted list is read as an implicit balanced binary
+    tree (the middle turn of each range is the root of that range), in which every node also stores
+    the latest end time of its subtree. A query only descends into subtrees that can still reach the
+    query interval, so a long early turn does not make later queries scan all earlier turns.
+
+    Attributes:
+        starts (list): Turn start times, sorted.
+        ends (list): Turn end times, in the same order as `starts`.
+        labels (list): Turn speaker labels, in the same order as `starts`.
+        max_gap (float): Maximum distance in seconds to the nearest turn for a segment that overlaps no turn.
+    """
+
+    def __init__(self, turns, max_gap=1.0):
+        """
+        Build the index from a list of speaker turns.
+
+        Args:
+            turns (list): A list of (start, end, speaker_label) tuples, in any order.
+            max_gap (float): Maximum distance to the nearest turn for segments that overlap no turn.
+        """
+        turns = sorted(turns)
+        self.starts = [start for start, _, _ in turns]
+        self.ends = [end for _, end, _ in turns]
+        self.labels = [label for _, _, label in turns]
+        self.max_gap = max_gap
+
+        # Latest end time in the subtree rooted at each turn (see the class docstring)
+        self._subtree_end = list(self.ends)
+        self._build(0, len(self.starts))
+
+        # Turn with the latest end among the first i + 1 turns, for the nearest-turn fallback
+        self._max_end_index = []
+        best_end, best_index = float("-inf"), -1
+        for i, end in enumerate(self.ends):
+            if end > best_end:
+                best_end, best_index = end, i
+            self._max_end_index.append(best_index)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        self._subtree_end[mid] = max(self.ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._subtree_end[mid]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def speaker_for(self, start, end, default="Speaker"):
+        """
+        Return the speaker whose turns overlap the interval [start, end] the most.
+
+        If no turn overlaps the interval, the nearest turn within `max_gap` seconds is used.
+
+        Args:
+            start (float): Interval start time in seconds.
+            end (float): Interval end time in seconds.
+            default (str): Label returned when no turn is close enough.
+
+        Returns:
+            str: The speaker label.
+        """
+        if not self.starts:
+            return default
+        if end <= start:
+            end = start + 1e-3
+
+        # Turns [0, upper) start before the interval ends; of those, visit the subtrees reaching past its start
+        upper = bisect_left(self.starts, end)
+        overlaps = {}
+        latest = {}  # Ties go to the speaker of the later turn
+        ranges = [(0, len(self.starts))]
+        while ranges:
+            lo, hi = ranges.pop()
+            if lo >= hi or lo >= upper:
+                continue
+            mid = (lo + hi) // 2
+            if self._subtree_end[mid] <= start:
+                continue  # Nothing in this subtree ends after the interval starts
+            ranges.append((lo, mid))
+            if mid < upper:
+                overlap = min(end, self.ends[mid]) - max(start, self.starts[mid])
+                if overlap > 0:
+                    label = self.labels[mid]
+                    overlaps[label] = overlaps.get(label, 0.0) + overlap
+                    latest[label] = max(latest.get(label, -1), mid)
+                ranges.append((mid + 1, hi))
+        if overlaps:
+            return max(overlaps, key=lambda label: (overlaps[label], latest[label]))
+
+        # No overlap: fall back to the closest turn before or after the interval
+        best_label, best_gap = default, self.max_gap
+        if upper > 0:
+            previous = self._max_end_index[upper - 1]
+            gap = start - self.ends[previous]
+            if gap <= best_gap:
+                best_label, best_gap = self.labels[previous], gap
+        if upper < len(self.starts):
+            gap = self.starts[upper] - end
+            if gap < best_gap:
+                best_label = self.labels[upper]
+        return best_label
+
+
+def align_segments(turns, segments, default="Speaker", use_words=False, max_gap=1.0):
+    """
+    Assign a speaker to each transcription segment, or to each word when `use_words` is set.
+
+    With word-level assignment, consecutive words of the same speaker are merged into one utterance,
+    so a Whisper segment that spans a speaker change is split between the speakers.
+
+    Args:
+        turns (list): A list of (start, end, speaker_label) diarization turns.
+        segments (list): Whisper transcription segments.
+        default (str): Label used when no turn is close enough.
+        use_words (bool): Assign speakers per word using the segments' "words" entries.
+        max_gap (float): Maximum distance to the nearest turn for segments that overlap no turn.
+
+    Returns:
+        list: A list of (speaker, start, end, text) utterances in time order.
+    """
+    index = SpeakerIndex(turns, max_gap=max_gap)
+    utterances = []  # [speaker, start, end, text parts]
+    merging_words = False
+    for segment in segments:
+        words = segment.get("words") if use_words else None
+        if not words:
+            speaker = index.speaker_for(segment["start"], segment["end"], default)
+            utterances.append([speaker, segment["start"], segment["end"], [segment["text"]]])
+            merging_words = False
+            continue
+
+        for word in words:
+            speaker = index.speaker_for(word["start"], word["end"], default)
+            if merging_words and utterances[-1][0] == speaker:
+                utterances[-1][2] = word["end"]
+                utterances[-1][3].append(word["word"])
+            else:
+                utterances.append([speaker, word["start"], word["end"], [word["word"]]])
+                merging_words = True
+
+    return [(speaker, start, end, "".join(parts).strip()) for speaker, start, end, parts in utterances]
+
+
+def format_utterances(utterances):
+    """
+    Format aligned utterances as `Speaker: text` lines.
+
+    Args:
+        utterances (list): A list of (speaker, start, end, text) utterances.
+
+    Returns:
+        str: The speaker-labeled transcript, one utterance per line.
+    """
+    return "".join(f"{speaker}: {text}\n" for speaker, _, _, text in utterances)
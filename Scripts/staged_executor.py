@@ -0,0 +1,192 @@
+"""
+Staged Executor Module
+
+This module runs a sequence of processing stages as a pipeline: each stage has its own bounded
+input queue and its own worker threads, so different items can be in different stages at the same
+time (one conversation summarized while the next is transcribed and the one after is diarized).
+Per-stage throughput, busy time and stall time are tracked. The `StagedExecutor` class is the main
+component of this module.
+"""
+
+import queue
+import threading
+import time
+
+_STOP = object()  # Sentinel that tells a stage worker to exit
+
+
+class Stage:
+    """
+    One stage of a `StagedExecutor`.
+
+    Attributes:
+        name (str): Stage name, used in metrics and logs.
+        handler (callable): Function called with an item; returns the item for the next stage, or
+                            None to drop it (e.g. an empty transcription).
+        workers (int): Number of worker threads for this stage.
+        queue_size (int): Maximum number of items waiting for this stage.
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=4):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0     # Time spent in the handler
+        self.starved_seconds = 0.0  # Time workers waited for input
+        self.blocked_seconds = 0.0  # Time workers waited for space in the next stage's queue
+
+
+class StagedExecutor:
+    """
+    Runs items through a list of stages, each with its own queue and worker pool.
+
+    Attributes:
+        stages (list): The `Stage` objects, in order.
+        name (str): Name used for worker threads and log messages.
+        on_error (callable): Called as `on_error(stage_name, item, exception)` when a handler fails.
+    """
+
+    def __init__(self, stages, name="pipeline", on_error=None):
+        """
+        Initialize the executor and start the workers of every stage.
+
+        Args:
+            stages (list): The `Stage` objects, in order.
+            name (str): Name used for worker threads and log messages.
+            on_error (callable): Optional error callback. By default errors are printed.
+        """
+        self.stages = stages
+        self.name = name
+        self.on_error = on_error
+        self.started_at = time.perf_counter()
+        self._accepting = True
+
+        for index, stage in enumerate(stages):
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index,), name=f"{name}-{stage.name}-{i}", daemon=True
+                )
+                thread.start()
+                stage.threads.append(thread)
+
+    def submit(self, item, block=True, timeout=None):
+        """
+        Queue an item for the first stage, blocking while its queue is full.
+
+        Args:
+            item (object): The item to process.
+            block (bool): Wait for space in the queue if it is full.
+            timeout (float): Maximum time to wait for space, in seconds.
+
+        Returns:
+            bool: True if the item was queued.
+        """
+        if not self._accepting:
+            print(f"[{self.name}] Executor is shutting down; item rejected.")
+            return False
+        try:
+            self.stages[0].queue.put(item, block=block, timeout=timeout)
+        except queue.Full:
+            print(f"[{self.name}] Stage '{self.stages[0].name}' queue full; item rejected.")
+            return False
+        return True
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            waiting = time.perf_counter()
+            item = stage.queue.get()
+            started = time.perf_counter()
+            with stage.lock:
+                stage.starved_seconds += started - waiting
+            if item is _STOP:
+                return
+
+            try:
+                result = stage.handler(item)
+            except Exception as e:
+                result = None
+                with stage.lock:
+                    stage.failed += 1
+                if self.on_error is not None:
+                    self.on_error(stage.name, item, e)
+                else:
+                    print(f"[{self.name}] Stage '{stage.name}' failed: {e}")
+            else:
+                with stage.lock:
+                    stage.processed += 1
+                    if result is None:
+                        stage.dropped += 1
+            finished = time.perf_counter()
+            with stage.lock:
+                stage.busy_seconds += finished - started
+
+            if result is not None and next_stage is not None:
+                next_stage.queue.put(result)
+                with stage.lock:
+                    stage.blocked_seconds += time.perf_counter() - finished
+
+    def shutdown(self, drain=True):
+        """
+        Stop accepting items and stop every stage, front to back.
+
+        Args:
+            drain (bool): Let queued items flow through all stages first. If False, items still waiting
+                          in a queue are discarded; items already in a handler are finished.
+        """
+        self._accepting = False
+        for stage in self.stages:
+            if not drain:
+                while True:
+                    try:
+                        stage.queue.get_nowait()
+                    except queue.Empty:
+                        break
+            # Sentinels queue behind the remaining items, so each stage drains before it stops
+            for _ in stage.threads:
+                stage.queue.put(_STOP)
+            for thread in stage.threads:
+                thread.join()
+
+    def metrics(self):
+        """
+        Return per-stage counts, throughput, utilization and stall times.
+
+        Returns:
+            dict: Stage name -> metrics dictionary.
+        """
+        elapsed = max(1e-9, time.perf_counter() - self.started_at)
+        metrics = {}
+        for stage in self.stages:
+            with stage.lock:
+                metrics[stage.name] = {
+                    "workers": stage.workers,
+                    "queue_depth": stage.queue.qsize(),
+                    "processed": stage.processed,
+                    "dropped": stage.dropped,
+                    "failed": stage.failed,
+                    "throughput_per_min": 60.0 * stage.processed / elapsed,
+                    "utilization": stage.busy_seconds / (elapsed * stage.workers),
+                    "mean_seconds": stage.busy_seconds / stage.processed if stage.processed else 0.0,
+                    "starved_seconds": stage.starved_seconds,
+                    "blocked_seconds": stage.blocked_seconds,
+                }
+        return metrics
+
+    def print_metrics(self):
+        """
+        Print one line of metrics per stage.
+        """
+        for name, m in self.metrics().items():
+            print(f"[{self.name}] {name:<12} queue={m['queue_depth']} done={m['processed']} "
+                  f"failed={m['failed']} {m['throughput_per_min']:.1f}/min util={m['utilization']:.0%} "
+                  f"mean={m['mean_seconds']:.2f}s starved={m['starved_seconds']:.1f}s "
+                  f"blocked={m['blocked_seconds']:.1f}s")
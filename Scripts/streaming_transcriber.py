@@ -0,0 +1,218 @@
+"""
+Streaming Transcriber Module
+
+This module transcribes a conversation while it is still being captured. Audio is fed in as it
+arrives; a background thread runs Whisper on overlapping windows (30 s windows every 20 s by
+default), stitches the window segments into one timeline, drops the duplicates produced by the
+overlaps and reports the partial transcript through a callback. When the conversation ends only
+the last window is left to transcribe. Time ranges lost to failed windows are recorded so they can
+be transcribed again from the full recording. The `StreamingTranscriber` class is the main component of
+this module.
+"""
+
+import re
+import threading
+import time
+
+from audio_buffer import SAMPLE_RATE, AudioBuffer
+
+
+def _normalize(text):
+    return re.sub(r"[^\w ]+", "", text.lower()).strip()
+
+
+def _shifted(segment, offset):
+    # Window-relative Whisper times to conversation times
+    segment = dict(segment, start=segment["start"] + offset, end=segment["end"] + offset)
+    if "words" in segment:
+        segment["words"] = [
+            dict(word, start=word["start"] + offset, end=word["end"] + offset) for word in segment["words"]
+        ]
+    return segment
+
+
+class StreamingTranscriber:
+    """
+    Incremental Whisper transcription of a conversation in overlapping windows.
+
+    Each window is transcribed on its own, so segments in the overlap between two windows come out
+    twice. A segment is kept from the window in which its midpoint lies before the middle of the
+    overlap with the next window (the part of the window with the most context on both sides), and
+    a kept segment repeating the previous one is dropped.
+
+    Attributes:
+        transcriber (Transcriber): Transcriber whose Whisper model is used.
+        rate (int): Sample rate of the fed audio.
+        channels (int): Number of interleaved channels of the fed audio.
+        window_seconds (float): Length of each window.
+        stride_seconds (float): Distance between the starts of consecutive windows.
+        segments (list): Stitched segments so far, with times relative to the start of the conversation.
+        windows (int): Number of windows transcribed.
+        gaps (list): (start, end) times in seconds missing from `segments` because a window failed.
+    """
+
+    def __init__(self, transcriber, rate, channels=1, window_seconds=30.0, stride_seconds=20.0, on_partial=None,
+                 word_timestamps=False):
+        """
+        Initialize the streaming transcriber.
+
+        Args:
+            transcriber (Transcriber): Transcriber whose Whisper model is used.
+            rate (int): Sample rate of the 16-bit PCM audio passed to `feed`.
+            channels (int): Number of interleaved channels of that audio.
+            window_seconds (float): Window length; 30 s matches Whisper's native input length.
+            stride_seconds (float): Window stride; must be shorter than the window so windows overlap.
+            on_partial (callable): Called as `on_partial(segments, text)` after each window.
+            word_timestamps (bool): Ask Whisper for word-level timestamps.
+        """
+        if not 0 < stride_seconds < window_seconds:
+            raise ValueError("stride_seconds must be positive and shorter than window_seconds")
+
+        self.transcriber = transcriber
+        self.rate = rate
+        self.channels = channels
+        self.window_seconds = window_seconds
+        self.stride_seconds = stride_seconds
+        self.on_partial = on_partial
+        self.word_timestamps = word_timestamps
+        self.segments = []
+        self.windows = 0
+        self.busy_seconds = 0.0
+        self.gaps = []
+
+        self._frame_bytes = 2 * channels  # 16-bit samples
+        self._pcm = bytearray()           # Audio from `_pcm_start` (in frames) onwards
+        self._pcm_start = 0
+        self._received = 0                # Frames received so far
+        self._window_start = 0            # Start of the next window, in frames
+        self._cut = 0.0                   # Segments with an earlier midpoint are already committed
+        self._finished = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the background transcription thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="streaming-transcriber", daemon=True)
+        self._thread.start()
+
+    def feed(self, pcm):
+        """
+        Add captured audio. Cheap enough to call from the capture loop.
+
+        Args:
+            pcm (bytes): Interleaved 16-bit PCM audio.
+        """
+        with self._condition:
+            self._pcm.extend(pcm)
+            self._received += len(pcm) // self._frame_bytes
+            self._condition.notify()
+
+    def finish(self, timeout=None):
+        """
+        Mark the end of the conversation and wait for the last window.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            list: The stitched segments of the whole conversation.
+        """
+        with self._condition:
+            self._finished = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return list(self.segments)
+
+    @property
+    def text(self):
+        """
+        The transcript so far, without speaker labels.
+        """
+        return " ".join(segment["text"].strip() for segment in self.segments)
+
+    def _run(self):
+        window_frames = int(self.window_seconds * self.rate)
+        stride_frames = int(self.stride_seconds * self.rate)
+        while True:
+            with self._condition:
+                while not self._finished and self._received < self._window_start + window_frames:
+                    self._condition.wait()
+                final = self._received < self._window_start + window_frames
+                start = self._window_start
+                end = self._received if final else start + window_frames
+                offset = (start - self._pcm_start) * self._frame_bytes
+                pcm = bytes(self._pcm[offset:offset + (end - start) * self._frame_bytes])
+
+            if end > start:
+                try:
+                    self._transcribe_window(pcm, start, final)
+                except Exception as e:
+                    print(f"Streaming transcription of the window at {start / self.rate:.1f}s failed: {e}")
+                    # The next window keeps segments from the current cut onwards but its audio only
+                    # starts one stride later, so the span in between has no segments
+                    self._add_gap(self._cut, end / self.rate if final else (start + stride_frames) / self.rate)
+            if final:
+                return
+
+            with self._condition:
+                # Audio before the next window is no longer needed
+                self._window_start = start + stride_frames
+                del self._pcm[:(self._window_start - self._pcm_start) * self._frame_bytes]
+                self._pcm_start = self._window_start
+
+    def _add_gap(self, start, end):
+        if self.gaps and start <= self.gaps[-1][1]:
+            start = min(start, self.gaps[-1][0])
+            self.gaps.pop()  # Consecutive failed windows leave one longer gap
+        self.gaps.append((start, end))
+
+    def fill_gaps(self, samples):
+        """
+        Transcribe the time ranges lost to failed windows from the full recording.
+
+        Args:
+            samples (numpy.ndarray): The whole conversation as a 16 kHz mono waveform.
+
+        Returns:
+            list: The stitched segments with the gaps filled in.
+        """
+        for start, end in self.gaps:
+            print(f"Transcribing {start:.1f}s-{end:.1f}s again after a failed streaming window...")
+            waveform = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            for segment in self.transcriber.transcribe(waveform, self.word_timestamps, use_cache=False):
+                segment = _shifted(segment, start)
+                if segment["text"].strip() and start <= (segment["start"] + segment["end"]) / 2 < end:
+                    self.segments.append(segment)
+        self.segments.sort(key=lambda segment: segment["start"])
+        self.gaps = []
+        return list(self.segments)
+
+    def _transcribe_window(self, pcm, start_frame, final):
+        started = time.perf_counter()
+        audio = AudioBuffer.from_pcm(pcm, self.rate, self.channels)
+        segments = self.transcriber.transcribe(audio.samples, self.word_timestamps, use_cache=False)
+
+        offset = start_frame / self.rate
+        overlap = self.window_seconds - self.stride_seconds
+        cut = float("inf") if final else offset + self.stride_seconds + overlap / 2
+        for segment in segments:
+            segment = _shifted(segment, offset)
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if not self._cut <= midpoint < cut or not segment["text"].strip():
+                continue
+            previous = self.segments[-1] if self.segments else None
+            if (previous is not None and segment["start"] < previous["end"] + 1.0
+                    and _normalize(segment["text"]) == _normalize(previous["text"])):
+                continue  # The same words transcribed again at the edge of the overlap
+            self.segments.append(segment)
+        self._cut = cut
+
+        self.windows += 1
+        self.busy_seconds += time.perf_counter() - started
+        print(f"Streaming window {self.windows} ({offset:.0f}s-{offset + audio.duration:.0f}s) transcribed "
+              f"in {time.perf_counter() - started:.1f}s; {len(self.segments)} segments so far")
+        if self.on_partial is not None:
+            self.on_partial(list(self.segments), self.text)
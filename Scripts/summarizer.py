@@ -2,35 +2,146 @@
 Conversation Summarizer Module (Updated for GODEL)
 """
 
-import glob
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 from transcriber import Transcriber
-from emotion_classifier import EmotionClassifier
-from sentiment_analyzer import SentimentAnalyzer
+from model_registry import get_registry, load_hf_pipeline
+from extractive_summarizer import ExtractiveSummarizer
+from daily_digest import DailyDigest
+from result_cache import ResultCache, content_hash
+from transcript_format import as_text_list, parse_utterances
 import torch
 import os
+import threading
+import time
 import nltk
 from nltk import sent_tokenize
 
 
 class ConversationSummarizer:
-    def __init__(self):
+    model_name = "pszemraj/led-large-book-summary"  # Also part of the result cache key of summaries
+
+    # Transcripts longer than this many tokens are summarized hierarchically (see `map_reduce_summary`)
+    map_reduce_tokens = 4096
+    chunk_tokens = 2048
+    chunk_batch_size = 4
+    chunk_generation = {
+        "min_length": 32,
+        "max_length": 256,
+        "no_repeat_ngram_size": 4,
+        "encoder_no_repeat_ngram_size": 3,
+        "repetition_penalty": 3.5,
+        "num_beams": 2,
+        "early_stopping": True,
+    }
+
+    def __init__(self, transcriber=None, registry=None, cache=None, policy="auto", extractive_max_words=150,
+                 latency_budget=None, max_queue_depth=None):
+        """
+        Initialize the summarizer. The LED model is loaded on the first abstractive summary.
+
+        Args:
+            transcriber (Transcriber): Transcriber to reuse. If None, one is created on first use.
+            registry (ModelRegistry): Registry to load models from. Defaults to the process-wide registry.
+            cache (ResultCache): Optional on-disk cache for chunk summaries, shared across runs.
+            policy (str): "abstractive" (LED), "extractive" (TextRank), or "auto" to choose per transcript
+                          (see `choose_method`).
+            extractive_max_words (int): In auto mode, transcripts up to this many words are summarized
+                                        extractively.
+            latency_budget (float): In auto mode, seconds an abstractive summary may take; longer
+                                    estimates fall back to the extractive summary.
+            max_queue_depth (int): In auto mode, queue depth from which the extractive summary is used
+                                   to catch up.
+        """
+        if policy not in ("auto", "abstractive", "extractive"):
+            raise ValueError(f"Unknown summarization policy: {policy}")
         #nltk.download('punkt_tab')
         #nltk.download('punkt')
-        self.transcriber = Transcriber(model_name="base")
+        self.registry = registry or get_registry()
+        self._transcriber = transcriber
+        self._summarizer = None
+        self._load_lock = threading.Lock()
+        self.cache = cache
+        self.policy = policy
+        self.extractive_max_words = extractive_max_words
+        self.latency_budget = latency_budget
+        self.max_queue_depth = max_queue_depth
+        self.seconds_per_token = 0.02  # Running estimate of LED latency, updated after each abstractive summary
+        self.extractive = ExtractiveSummarizer()
+        self.chunk_cache = {}  # Chunk summary cache key -> summary
+        self.chunk_cache_size = 10000
         print("CUDA Availability:", torch.cuda.is_available())
         if torch.cuda.is_available():
             print("CUDA Device Name:", torch.cuda.get_device_name(0))
 
-        # Initialize the LED summarization pipeline
-        model_name = "pszemraj/led-large-book-summary"
-        self.summarizer = pipeline(
-            "summarization",
-            model=model_name,
-            device=0 if torch.cuda.is_available() else -1  # Use GPU if available
-        )
+    @property
+    def summarizer(self):
+        """
+        LED summarization pipeline (GPU if available), loaded on first access.
+        """
+        with self._load_lock:
+            if self._summarizer is None:
+                self._summarizer = load_hf_pipeline("summarization", self.model_name, registry=self.registry)
+            return self._summarizer
+
+    def _generate(self, inputs, **kwargs):
+        # The pipeline is shared with other worker threads and is not safe to call concurrently
+        summarizer = self.summarizer
+        with self.registry.usage_lock(summarizer):
+            return summarizer(inputs, **kwargs)
+
+    @property
+    def tokenizer(self):
+        """
+        LED tokenizer, available without loading the model.
+
+        This is a separate instance from the pipeline's own tokenizer, so counting tokens does not
+        touch the tokenizer a generation in another thread is using; hold `registry.usage_lock` around calls.
+        """
+        def load_tokenizer():
+            from transformers import AutoTokenizer
+
+            return AutoTokenizer.from_pretrained(self.model_name)
+
+        return self.registry.get(f"tokenizer/{self.model_name}", load_tokenizer)
+
+    def choose_method(self, transcript, queue_depth=None):
+        """
+        Pick the extractive or abstractive summarizer for a transcript.
+
+        In auto mode the extractive summarizer is used for short transcripts, when the estimated LED
+        latency exceeds `latency_budget`, or when `queue_depth` reaches `max_queue_depth`.
+
+        Args:
+            transcript (str): The transcript to summarize.
+            queue_depth (int): Number of conversations waiting to be summarized, if known.
+
+        Returns:
+            str: "extractive" or "abstractive".
+        """
+        if self.policy != "auto":
+            return self.policy
+        if len(transcript.split()) <= self.extractive_max_words:
+            return "extractive"
+        if self.max_queue_depth is not None and queue_depth is not None and queue_depth >= self.max_queue_depth:
+            print(f"Queue depth {queue_depth} >= {self.max_queue_depth}; using the extractive summarizer.")
+            return "extractive"
+        if self.latency_budget is not None:
+            estimate = self.count_tokens(transcript)[0] * self.seconds_per_token
+            if estimate > self.latency_budget:
+                print(f"Estimated summary time {estimate:.1f}s exceeds the {self.latency_budget:.1f}s budget; "
+                      f"using the extractive summarizer.")
+                return "extractive"
+        return "abstractive"
+
+    @property
+    def transcriber(self):
+        """
+        Transcriber used for audio input, created on first access.
+        """
+        if self._transcriber is None:
+            self._transcriber = Transcriber(model_name="base", registry=self.registry)
+        return self._transcriber
 
-    def summarize_conversation(self, transcription_path, output_dir, input_type="audio"):
+    def summarize_conversation(self, transcription_path, output_dir, input_type="audio", method=None, queue_depth=None):
         # Load and preprocess the transcription
         if not os.path.exists(transcription_path):
             print(f"Error: Transcription file not found at {transcription_path}")
@@ -43,15 +154,34 @@ class ConversationSummarizer:
             print("Error: Transcription file is empty.")
             return None
 
-        # Preprocess the text for the LED model
-        transcript = self.preprocess_text(transcript)
-
-        # Generate the summary
-        print("---------------------")
-        print(transcript)
-        print("---------------------")
-        print("Summarizing transcription...")
-        summary = self.generate_summary_independent(transcript)
+        method = method or self.choose_method(transcript, queue_depth)
+        if method == "extractive":
+            print("Summarizing transcription extractively...")
+            summary = self.extractive.summarize(transcript)
+            print("\n\n[[Summary]]:")
+            print(summary)
+            return summary
+
+        # Long transcripts are summarized chunk by chunk instead of being truncated
+        started = time.perf_counter()
+        token_count = self.count_tokens(transcript)[0]
+        if token_count > self.map_reduce_tokens:
+            print(f"Transcript has {token_count} tokens; summarizing in chunks...")
+            summary = self.map_reduce_summary(transcript)
+        else:
+            # Preprocess the text for the LED model
+            transcript = self.preprocess_text(transcript)
+
+            # Generate the summary
+            print("---------------------")
+            print(transcript)
+            print("---------------------")
+            print("Summarizing transcription...")
+            summary = self.generate_summary_independent(transcript)
+
+        # Update the latency estimate used by `choose_method`
+        measured = (time.perf_counter() - started) / max(token_count, 1)
+        self.seconds_per_token = 0.7 * self.seconds_per_token + 0.3 * measured
 
         print("\n\n[[Summary]]:")
         print(summary)
@@ -61,6 +191,10 @@ class ConversationSummarizer:
         """
         Generate an overall summary for a specific day.
 
+        The day digest is maintained incrementally by `DailyDigest`: only conversations added since the
+        last call are summarized, and the result is reused if nothing changed. Days recorded before
+        digests existed are imported from their summary files on first use.
+
         Args:
             day (str): The day to summarize (e.g., "20250723").
             summaries_dir (str): Directory containing daily summaries.
@@ -72,28 +206,46 @@ class ConversationSummarizer:
             print(f"Summaries directory not found: {summaries_dir}")
             return None
 
-        summary_files = glob.glob(os.path.join(summaries_dir, f"summary_{day}_*.txt"))
-        if not summary_files:
+        digest = DailyDigest(os.path.join(summaries_dir, "digests"), reduce=self.reduce_summaries)
+        if not digest.has_day(day) and not digest.import_summary_files(summaries_dir, day):
             print(f"No summaries found for the day: {day}")
             return None
 
-        combined_summaries = ""
-        for summary_file in summary_files:
-            with open(summary_file, "r", encoding="utf-8") as f:
-                combined_summaries += f.read() + "\n"
-
         print("Generating overall summary for the day...")
         try:
-            overall_summary = self.summarizer(
-                f"Summarize the following conversations:\n\n{combined_summaries}",
-                max_length=500,
-                min_length=200,
-                do_sample=False
-            )[0]['summary_text']
+            return digest.day_summary(day)
         except Exception as e:
             print(f"Error generating overall summary: {str(e)}")
             return None
 
+    def reduce_summaries(self, summaries):
+        """
+        Combine several conversation summaries into one summary.
+
+        Summaries that do not fit in one model input together are first summarized in chunks, as
+        in `map_reduce_summary`.
+
+        Args:
+            summaries (list): The summaries to combine.
+
+        Returns:
+            str: The combined summary.
+        """
+        texts = list(summaries)
+        for _ in range(4):
+            token_counts = self.count_tokens(texts)
+            if sum(token_counts) + len(texts) <= self.chunk_tokens or len(texts) == 1:
+                break
+            texts = self.summarize_chunks(self._pack(texts, token_counts, self.chunk_tokens))
+
+        combined = "\n".join(texts)
+        total_tokens = sum(self.count_tokens(texts))
+        overall_summary = self._generate(
+            f"Summarize the following conversations:\n\n{combined}",
+            max_length=500,
+            min_length=min(200, max(30, total_tokens // 3)),
+            do_sample=False
+        )[0]['summary_text']
         return self.clean_summary(overall_summary)
 
     def generate_summary(self, text, sentiment, emotion):
@@ -113,7 +265,7 @@ class ConversationSummarizer:
         for i, chunk in enumerate(chunks):
             print(f"Summarizing chunk {i + 1}/{len(chunks)}...")
             try:
-                output = self.summarizer(
+                output = self._generate(
                     chunk,
                     max_length=200,  # Adjusted for concise summaries
                     min_length=50,
@@ -166,7 +318,7 @@ class ConversationSummarizer:
         # Perform summarization using the LED model
         try:
             print("Summarizing the transcription...")
-            final_summary = self.summarizer(
+            final_summary = self._generate(
                 text,
                 min_length=min_length,
                 max_length=max_length,
@@ -183,6 +335,156 @@ class ConversationSummarizer:
         # Clean and return the final summary
         return self.clean_summary(final_summary)
         
+    def count_tokens(self, texts):
+        """
+        Count the LED tokens of one or more texts in a single tokenizer call.
+
+        Args:
+            texts (str or list): A text or a list of texts.
+
+        Returns:
+            list: The token count of each text.
+        """
+        tokenizer = self.tokenizer
+        with self.registry.usage_lock(tokenizer):
+            encoded = tokenizer(as_text_list(texts), add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def chunk_utterances(self, transcript, max_tokens=None):
+        """
+        Split a speaker-labeled transcript into chunks of whole utterances that fit a token budget.
+
+        Chunks are packed greedily from the start of the transcript, so when the transcript grows only
+        its last chunk changes and earlier chunk summaries stay valid in the cache. An utterance longer
+        than the budget on its own is split on word boundaries.
+
+        Args:
+            transcript (str): The speaker-labeled transcript.
+            max_tokens (int): Token budget per chunk. Defaults to `chunk_tokens`.
+
+        Returns:
+            list: The chunk texts, one `Speaker: text` line per utterance.
+        """
+        max_tokens = max_tokens or self.chunk_tokens
+        lines = [f"{speaker}: {text}" for speaker, text in parse_utterances(transcript)]
+        if not lines:
+            return []
+
+        pieces = []
+        for line, tokens in zip(lines, self.count_tokens(lines)):
+            if tokens <= max_tokens:
+                pieces.append((line, tokens))
+                continue
+            words = line.split()
+            step = max(1, int(len(words) * max_tokens / tokens * 0.9))  # Leave room for uneven token density
+            for start in range(0, len(words), step):
+                piece = " ".join(words[start:start + step])
+                pieces.append((piece, int(tokens * len(piece) / len(line)) + 1))
+
+        return self._pack([piece for piece, _ in pieces], [tokens for _, tokens in pieces], max_tokens)
+
+    def summarize_chunks(self, chunks, batch_size=None):
+        """
+        Summarize chunks in batched model calls, reusing cached chunk summaries.
+
+        Uncached chunks are sorted by length before batching so that each batch pads to similar
+        lengths; the summaries are returned in chunk order. If a batched call fails the chunks are
+        generated one at a time, and a chunk that still fails gets an extractive summary (not cached).
+
+        Args:
+            chunks (list): The chunk texts.
+            batch_size (int): Chunks per model call. Defaults to `chunk_batch_size`.
+
+        Returns:
+            list: One summary per chunk.
+        """
+        batch_size = batch_size or self.chunk_batch_size
+        keys = [ResultCache.key(content_hash(chunk), self.model_name, self.chunk_generation) for chunk in chunks]
+        summaries = [self._get_chunk_summary(key) for key in keys]
+        missing = sorted((i for i, summary in enumerate(summaries) if summary is None), key=lambda i: len(chunks[i]))
+        if missing:
+            print(f"Summarizing {len(missing)} of {len(chunks)} chunks ({len(chunks) - len(missing)} cached)...")
+            try:
+                outputs = self._generate([chunks[i] for i in missing], batch_size=batch_size, **self.chunk_generation)
+            except Exception as e:
+                print(f"Error summarizing chunks in batches: {e}. Retrying one chunk at a time...")
+                outputs = [self._generate_chunk(chunks[i]) for i in missing]
+            for i, output in zip(missing, outputs):
+                if output is None:
+                    summaries[i] = self._fallback_chunk_summary(chunks[i])
+                    continue
+                summaries[i] = self.clean_summary(output["summary_text"])
+                self._put_chunk_summary(keys[i], summaries[i])
+        return summaries
+
+    def _generate_chunk(self, chunk):
+        try:
+            return self._generate(chunk, **self.chunk_generation)[0]
+        except Exception as e:
+            print(f"Error summarizing chunk: {e}")
+            return None
+
+    def _fallback_chunk_summary(self, chunk):
+        # Chunks of a transcript have speaker labels to rank; chunks of earlier summaries do not
+        if self.extractive.split_units(chunk):
+            return self.extractive.summarize(chunk)
+        return " ".join(chunk.split()[:self.extractive_max_words])
+
+    def _get_chunk_summary(self, key):
+        summary = self.chunk_cache.get(key)
+        if summary is None and self.cache is not None:
+            summary = self.cache.get("summary_chunk", key)
+        return summary
+
+    def _put_chunk_summary(self, key, summary):
+        if len(self.chunk_cache) >= self.chunk_cache_size:
+            self.chunk_cache.clear()
+        self.chunk_cache[key] = summary
+        if self.cache is not None:
+            self.cache.put("summary_chunk", key, summary)
+
+    def map_reduce_summary(self, transcript, max_depth=4):
+        """
+        Summarize a transcript of any length hierarchically.
+
+        The transcript is chunked on utterance boundaries and every chunk is summarized (map). The
+        chunk summaries are then regrouped into chunks and summarized again until they fit in one
+        model input (reduce), and the final summary is generated from that.
+
+        Args:
+            transcript (str): The speaker-labeled transcript.
+            max_depth (int): Maximum number of reduce rounds before the remaining text is truncated.
+
+        Returns:
+            str: The summary.
+        """
+        chunks = self.chunk_utterances(transcript)
+        print(f"Map-reduce summarization: {len(chunks)} chunks of up to {self.chunk_tokens} tokens")
+        summaries = self.summarize_chunks(chunks)
+
+        for depth in range(max_depth):
+            combined = "\n".join(summaries)
+            if self.count_tokens(combined)[0] <= self.chunk_tokens or len(summaries) == 1:
+                break
+            chunks = self._pack(summaries, self.count_tokens(summaries), self.chunk_tokens)
+            print(f"Reduce round {depth + 1}: {len(summaries)} summaries -> {len(chunks)} chunks")
+            summaries = self.summarize_chunks(chunks)
+
+        return self.generate_summary_independent(self.preprocess_text("\n".join(summaries), self.chunk_tokens))
+
+    def _pack(self, texts, token_counts, max_tokens):
+        # Greedily pack consecutive texts into newline-joined chunks of at most `max_tokens` tokens
+        chunks, current, current_tokens = [], [], 0
+        for text, tokens in zip(texts, token_counts):
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens + 1
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
     def chunk_by_sentences(self, text, max_chars=1024):
         """
         Split the text into chunks based on sentences, ensuring each chunk is within the character limit.
@@ -265,13 +567,15 @@ class ConversationSummarizer:
         Returns:
             str: The truncated text.
         """
-        tokenized_input = self.summarizer.tokenizer(
-            text,
-            truncation=True,
-            max_length=max_tokens,
-            return_tensors="pt"
-        )
-        return self.summarizer.tokenizer.decode(tokenized_input["input_ids"][0], skip_special_tokens=True)
+        tokenizer = self.tokenizer
+        with self.registry.usage_lock(tokenizer):
+            tokenized_input = tokenizer(
+                text,
+                truncation=True,
+                max_length=max_tokens,
+                return_tensors="pt"
+            )
+            return tokenizer.decode(tokenized_input["input_ids"][0], skip_special_tokens=True)
 
 
 if __name__ == "__main__":
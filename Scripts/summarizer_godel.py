@@ -5,30 +5,36 @@ Conversation Summarizer Module (Updated for GODEL)
 import glob
 from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 from transcriber import Transcriber
-from emotion_classifier import EmotionClassifier
-from sentiment_analyzer import SentimentAnalyzer
+from model_registry import get_registry, default_device
 import torch
 import os
 from nltk import sent_tokenize
 
 
 class ConversationSummarizer:
-    def __init__(self):
-        self.transcriber = Transcriber(model_name="base")
+    def __init__(self, transcriber=None, registry=None, batch_size=8):
+        self.batch_size = batch_size  # Chunks per GODEL generation call
+        self.transcriber = transcriber or Transcriber(model_name="base", registry=registry)
         print("CUDA Availability:", torch.cuda.is_available())
         if torch.cuda.is_available():
             print("CUDA Device Name:", torch.cuda.get_device_name(0))
 
-        # Initialize GODEL summarization pipeline
+        # Initialize GODEL summarization pipeline (shared through the model registry)
         model_name = "microsoft/GODEL-v1_1-large-seq2seq"
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-
-        self.summarizer = pipeline(
-            "text2text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            device=0 if torch.cuda.is_available() else -1
+        device = default_device()
+
+        def load_godel():
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+            return pipeline(
+                "text2text-generation",
+                model=model,
+                tokenizer=tokenizer,
+                device=0 if device == "cuda" else -1
+            )
+
+        self.summarizer = (registry or get_registry()).get(
+            f"text2text-generation/{model_name}", load_godel, device=device
         )
 
     def summarize_conversation(self, input_path, output_dir, input_type="audio", sentiment_score=None, emotion_results=None):
@@ -97,17 +103,7 @@ class ConversationSummarizer:
         return self.clean_summary(overall_summary)
 
     def generate_summary(self, text, sentiment, emotion):
-        chunks = self.chunk_by_sentences(text)
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks):
-            print(f"Summarizing chunk {i + 1}/{len(chunks)}...")
-            prompt = f"Summarize the following conversation:\n\n{chunk}"
-            try:
-                output = self.summarizer(prompt, max_length=300, min_length=100, do_sample=False)[0]['generated_text']
-                chunk_summaries.append(output)
-            except Exception as e:
-                print(f"Error summarizing chunk {i + 1}: {str(e)}")
-                continue
+        chunk_summaries = self.summarize_chunks(self.chunk_by_sentences(text))
 
         combined_summary = " ".join(chunk_summaries)
         sentiment_summary = f"\n\nSentiment Analysis:\n{sentiment}"
@@ -115,19 +111,59 @@ class ConversationSummarizer:
         return self.clean_summary(combined_summary + sentiment_summary + emotion_summary)
 
     def generate_summary_independent(self, text):
-        chunks = self.chunk_by_sentences(text)
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks):
-            print(f"Summarizing chunk {i + 1}/{len(chunks)}...")
-            prompt = f"Summarize the following conversation:\n\n{chunk}"
+        chunk_summaries = self.summarize_chunks(self.chunk_by_sentences(text))
+        return self.clean_summary(" ".join(chunk_summaries))
+
+    def summarize_chunks(self, chunks):
+        """
+        Summarize text chunks with GODEL in batched calls.
+
+        Args:
+            chunks (list): The chunk texts.
+
+        Returns:
+            list: The chunk summaries in chunk order; chunks that failed are left out.
+        """
+        prompts = [f"Summarize the following conversation:\n\n{chunk}" for chunk in chunks]
+        print(f"Summarizing {len(prompts)} chunks in batches of {self.batch_size}...")
+        outputs = self._generate_batched(prompts, max_length=300, min_length=100, do_sample=False)
+        return [output for output in outputs if output is not None]
+
+    def _generate_batched(self, prompts, **generation):
+        """
+        Run prompts through the model as padded, length-bucketed batches.
+
+        Prompts are sorted by token length and cut into batches of `batch_size`, so each batch pads
+        to about the same length and short prompts are not held up by long ones. If a batch fails,
+        its prompts are retried one at a time so one bad chunk does not lose the others.
+
+        Args:
+            prompts (list): The prompts.
+            **generation: Generation parameters passed to the pipeline.
+
+        Returns:
+            list: The generated text for each prompt, in prompt order (None where generation failed).
+        """
+        if not prompts:
+            return []
+        lengths = [len(ids) for ids in self.summarizer.tokenizer(prompts)["input_ids"]]
+        order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+
+        outputs = [None] * len(prompts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
             try:
-                output = self.summarizer(prompt, max_length=300, min_length=100, do_sample=False)[0]['generated_text']
-                chunk_summaries.append(output)
+                results = self.summarizer([prompts[i] for i in batch], batch_size=len(batch), **generation)
+                for i, result in zip(batch, results):
+                    outputs[i] = result[0]['generated_text'] if isinstance(result, list) else result['generated_text']
             except Exception as e:
-                print(f"Error summarizing chunk {i + 1}: {str(e)}")
-                continue
-
-        return self.clean_summary(" ".join(chunk_summaries))
+                print(f"Error summarizing batch of {len(batch)} chunks: {str(e)}; retrying one by one")
+                for i in batch:
+                    try:
+                        outputs[i] = self.summarizer(prompts[i], **generation)[0]['generated_text']
+                    except Exception as e:
+                        print(f"Error summarizing chunk {i + 1}: {str(e)}")
+        return outputs
 
     def chunk_by_sentences(self, text, max_chars=1024):
         sentences = sent_tokenize(text)
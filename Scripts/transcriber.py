@@ -6,12 +6,41 @@ pre-trained models. It integrates Whisper for transcription and PyAnnote for spe
 The `Transcriber` class is the main component of this module.
 """
 
-import whisper
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
-from pyannote.audio import Pipeline
-from dotenv import load_dotenv
+from model_registry import get_registry, load_whisper, load_diarization_pipeline
+from speaker_alignment import diarization_turns, align_segments, format_utterances
+from audio_buffer import AudioBuffer
+from result_cache import ResultCache, content_hash
+
+
+def diarize_waveform(diarization_pipeline, waveform):
+    """
+    Run speaker diarization on an in-memory waveform.
+
+    The waveform is wrapped in a torch tensor without copying, in the {"waveform", "sample_rate"}
+    format PyAnnote accepts instead of a file path.
+
+    Args:
+        diarization_pipeline (pyannote.audio.Pipeline): Speaker diarization pipeline.
+        waveform (numpy.ndarray): 16 kHz mono float32 waveform.
+
+    Returns:
+        list: A list of (start, end, speaker_label) turns.
+    """
+    return diarization_turns(diarization_pipeline(AudioBuffer(waveform).to_pyannote()))
+
+
+def _diarize_in_process(waveform):
+    # Runs in a worker process, which loads its own copy of the pipeline through its registry
+    start = time.perf_counter()
+    diarization_pipeline = load_diarization_pipeline()
+    turns = diarize_waveform(diarization_pipeline, waveform) if diarization_pipeline is not None else []
+    return turns, time.perf_counter() - start
 
 
 class Transcriber:
@@ -21,113 +50,342 @@ class Transcriber:
     Attributes:
         model (whisper.Whisper): Pre-trained Whisper model for transcription.
         diarization_pipeline (pyannote.audio.Pipeline): Pre-trained speaker diarization pipeline.
+        concurrency (str): How diarization and transcription are run: "thread" or "process" runs them
+                           in parallel, "sequential" runs diarization first.
+        last_timings (dict): Wall time in seconds of each stage of the calling thread's last `transcribe_audio`
+                             call (kept per thread, as worker threads share one Transcriber).
+        cache (ResultCache): Optional cache of diarization, transcription and transcript results.
     """
 
-    def __init__(self, model_name="base"):
+    def __init__(self, model_name="base", registry=None, concurrency="thread", cache=None):
         """
         Initialize the Transcriber with a specified Whisper model and diarization pipeline.
 
+        Models are taken from the shared model registry, so creating several Transcribers in one
+        process does not load Whisper or PyAnnote more than once.
+
         Args:
             model_name (str): Name of the Whisper model to use for transcription.
+            registry (ModelRegistry): Registry to load models from. Defaults to the process-wide registry.
+            concurrency (str): "thread" (default) or "process" to run diarization alongside Whisper,
+                               or "sequential".
+            cache (ResultCache): Cache to reuse diarization and transcription results of audio seen before.
         """
+        if concurrency not in ("thread", "process", "sequential"):
+            raise ValueError(f"Unknown concurrency mode: {concurrency}")
+
         print(f"Using Python interpreter: {sys.executable}")
-        self.model = whisper.load_model(model_name)
+        registry = registry or get_registry()
+        self.model_name = model_name
+        self.diarization_model = "pyannote/speaker-diarization-3.1"
+        self.cache = cache
+        self.model = load_whisper(model_name, registry=registry)
         print(f"Loaded Whisper model: {model_name}")
 
-        # Initialize speaker diarization pipeline
-        load_dotenv()
-        huggingface_token = os.getenv("HUGGINGFACE_TOKEN")
+        # Whisper and PyAnnote are shared across threads but are not thread-safe
+        self._whisper_lock = registry.usage_lock(self.model)
+        self._diarization_lock = None
+
+        self.concurrency = concurrency
+        self._local = threading.local()
+        self._executor = None
+        self._executor_lock = threading.Lock()  # Scheduler workers may make the first call concurrently
+
+        # Initialize speaker diarization pipeline (process mode loads it in the worker process instead)
+        self.diarization_pipeline = None
+        if concurrency != "process":
+            print("Initializing speaker diarization pipeline...")
+            self.diarization_pipeline = load_diarization_pipeline(self.diarization_model, registry=registry)
+            if self.diarization_pipeline is not None:
+                self._diarization_lock = registry.usage_lock(self.diarization_pipeline)
+                print("Speaker diarization pipeline initialized successfully.")
+
+    @property
+    def last_timings(self):
+        if not hasattr(self._local, "timings"):
+            self._local.timings = {}
+        return self._local.timings
+
+    @last_timings.setter
+    def last_timings(self, timings):
+        self._local.timings = timings
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                if self.concurrency == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=1)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization")
+            return self._executor
+
+    def _cache_key(self, stage, audio_hash, word_timestamps=False):
+        if stage == "diarization":
+            return ResultCache.key(audio_hash, self.diarization_model)
+        model = f"whisper/{self.model_name}"
+        if stage == "transcript":
+            model = f"{model}+{self.diarization_model}"
+        return ResultCache.key(audio_hash, model, {"word_timestamps": word_timestamps})
+
+    def _cached(self, stage, waveform, audio_hash, word_timestamps=False):
+        # Returns (key, cached value); both are None when caching is off
+        if self.cache is None:
+            return None, None
+        key = self._cache_key(stage, audio_hash or content_hash(waveform), word_timestamps)
+        return key, self.cache.get(stage, key)
+
+    def diarize(self, waveform, audio_hash=None):
+        """
+        Run speaker diarization on a waveform (in the diarization worker process in process mode).
 
-        print("Initializing speaker diarization pipeline...")
-        try:
-            self.diarization_pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=huggingface_token  # Replace with your Hugging Face token
-            )
-            print("Speaker diarization pipeline initialized successfully.")
-        except Exception as e:
-            print(f"Failed to initialize speaker diarization pipeline: {e}")
-            self.diarization_pipeline = None
+        Args:
+            waveform (numpy.ndarray): 16 kHz mono float32 waveform.
+            audio_hash (str): Content hash of the waveform, if already known (used as the cache key).
 
-    def transcribe_audio(self, audio_path, output_dir):
+        Returns:
+            list: A list of (start, end, speaker_label) turns (empty if diarization is unavailable).
+        """
+        key, turns = self._cached("diarization", waveform, audio_hash)
+        if turns is not None:
+            return [tuple(turn) for turn in turns]
+
+        if self.concurrency == "process":
+            turns = self._get_executor().submit(_diarize_in_process, waveform).result()[0]
+        else:
+            turns = self._diarize_here(waveform)
+        self._store("diarization", key, turns)
+        return turns
+
+    def _diarize_here(self, waveform):
+        if self.diarization_pipeline is None:
+            print("Speaker diarization pipeline unavailable; skipping diarization.")
+            return []
+        with self._diarization_lock:
+            return diarize_waveform(self.diarization_pipeline, waveform)
+
+    def transcribe(self, waveform, word_timestamps=False, audio_hash=None, use_cache=True):
         """
-        Transcribe the given audio file and save the transcription to a text file.
+        Transcribe a waveform with Whisper.
 
         Args:
-            audio_path (str): Path to the audio file to transcribe.
+            waveform (numpy.ndarray): 16 kHz mono float32 waveform.
+            word_timestamps (bool): Ask Whisper for word-level timestamps.
+            audio_hash (str): Content hash of the waveform, if already known (used as the cache key).
+            use_cache (bool): Look up and store the result in the result cache (off for streaming windows).
+
+        Returns:
+            list: Whisper transcription segments.
+        """
+        key, segments = self._cached("transcription", waveform, audio_hash, word_timestamps) if use_cache else (None, None)
+        if segments is not None:
+            return segments
+
+        with self._whisper_lock:
+            segments = self.model.transcribe(waveform, word_timestamps=word_timestamps)["segments"]
+        self._store("transcription", key, segments)
+        return segments
+
+    def _store(self, stage, key, value):
+        # Empty results (no diarization pipeline, silence) are recomputed rather than cached
+        if key is not None and value:
+            self.cache.put(stage, key, value)
+
+    def diarize_and_transcribe(self, waveform, word_timestamps=False, audio_hash=None):
+        """
+        Run diarization and transcription on the same waveform, in parallel unless sequential.
+
+        Whisper runs in the calling thread while diarization runs in a worker thread or process.
+        Stages found in the result cache are not run. Per-stage wall times are stored in `last_timings`.
+
+        Args:
+            waveform (numpy.ndarray): 16 kHz mono float32 waveform.
+            word_timestamps (bool): Ask Whisper for word-level timestamps.
+            audio_hash (str): Content hash of the waveform, if already known (used as the cache key).
+
+        Returns:
+            tuple: (turns, segments) with the diarization turns and the Whisper segments.
+        """
+        # The calling thread's timings; diarization records into them from the executor's thread
+        timings = self.last_timings
+
+        def timed(stage, function, *args):
+            start = time.perf_counter()
+            result = function(*args)
+            timings[stage] = time.perf_counter() - start
+            return result
+
+        if self.cache is not None and audio_hash is None:
+            audio_hash = content_hash(waveform)
+
+        if self.concurrency == "sequential":
+            turns = timed("diarization", self.diarize, waveform, audio_hash)
+            segments = timed("transcription", self.transcribe, waveform, word_timestamps, audio_hash)
+            return turns, segments
+
+        key, turns = self._cached("diarization", waveform, audio_hash)
+        future = None
+        if turns is not None:
+            turns = [tuple(turn) for turn in turns]
+        elif self.concurrency == "process":
+            future = self._get_executor().submit(_diarize_in_process, waveform)
+        else:
+            future = self._get_executor().submit(timed, "diarization", self._diarize_here, waveform)
+
+        segments = timed("transcription", self.transcribe, waveform, word_timestamps, audio_hash)
+        if future is None:
+            return turns, segments
+        if self.concurrency == "process":
+            # The worker process reports its own wall time
+            turns, timings["diarization"] = future.result()
+        else:
+            turns = future.result()
+        self._store("diarization", key, turns)
+        return turns, segments
+
+    def transcribe_audio(self, audio, output_dir, word_timestamps=False, name=None):
+        """
+        Transcribe the given audio and save the transcription to a text file.
+
+        Audio files are decoded once; diarization and transcription then share the decoded waveform.
+        An `AudioBuffer` is used as-is, without touching the disk. With a result cache, audio that was
+        transcribed before reuses the cached stages and the transcript file already written.
+
+        Args:
+            audio (str or AudioBuffer): Path to the audio file to transcribe, or decoded audio.
             output_dir (str): Directory to save the transcription text file.
+            word_timestamps (bool): Assign speakers per word instead of per Whisper segment.
+            name (str): Optional suffix for the transcription file name (e.g. a job id), so that
+                        concurrent transcriptions never share a file.
 
         Returns:
             str: Path to the saved transcription file, or None if the transcription fails.
         """
-        if not os.path.exists(audio_path):
-            print(f"File not found: {audio_path}")
-            return None
+        timings = self.last_timings = {}
+        started = time.perf_counter()
+
+        # Step 1: Decode the audio once
+        if not isinstance(audio, AudioBuffer):
+            if not os.path.exists(audio):
+                print(f"File not found: {audio}")
+                return None
+            print(f"File exists: {audio}")
+            audio = AudioBuffer.from_file(audio)
+            timings["decode"] = time.perf_counter() - started
+
+        audio_hash = audio.content_hash() if self.cache is not None else None
+        output_file = self.cached_transcript(audio_hash, output_dir, word_timestamps)
+        if output_file is None:
+            # Step 2: Perform speaker diarization and transcription
+            print(f"Performing speaker diarization and transcription ({self.concurrency})...")
+            turns, segments = self.diarize_and_transcribe(audio.samples, word_timestamps, audio_hash)
+
+            # Step 3: Combine diarization and transcription
+            output_file = self.write_transcript(
+                turns, segments, output_dir, name=name, use_words=word_timestamps, audio_hash=audio_hash
+            )
 
-        print(f"File exists: {audio_path}")
+        timings["total"] = time.perf_counter() - started
+        print("Stage timings: " + ", ".join(
+            f"{stage}={seconds:.2f}s" for stage, seconds in timings.items()
+        ))
+
+        return output_file
+
+    def cached_transcript(self, audio_hash, output_dir, use_words=False):
+        """
+        Return the transcript file previously written for this audio, if the result cache has one.
+
+        If the file was deleted, it is written again from the cached text.
+
+        Args:
+            audio_hash (str): Content hash of the audio (None when caching is off).
+            output_dir (str): Directory to write the transcript to if the cached file is gone.
+            use_words (bool): Whether speakers were assigned per word.
+
+        Returns:
+            str: Path to the transcription file, or None on a cache miss.
+        """
+        if self.cache is None or audio_hash is None:
+            return None
+        key = self._cache_key("transcript", audio_hash, use_words)
+        cached = self.cache.get("transcript", key)
+        if cached is None:
+            return None
+        if not os.path.exists(cached["file"]):
+            cached["file"] = self._save_transcript(cached["text"], output_dir, name=audio_hash[:12])
+            self.cache.put("transcript", key, cached)
+        print(f"Reusing cached transcription {cached['file']}")
+        return cached["file"]
 
-        # Step 1: Perform speaker diarization
-        print("Performing speaker diarization...")
-        diarization_result = self.diarization_pipeline(audio_path)
+    def write_transcript(self, turns, segments, output_dir, name=None, use_words=False, audio_hash=None):
+        """
+        Align diarization turns with transcription segments and save the speaker-labeled transcript.
 
-        # Step 2: Transcribe the audio
-        print("Transcribing audio...")
-        transcription_result = self.model.transcribe(audio_path)
+        Args:
+            turns (list): A list of (start, end, speaker_label) diarization turns.
+            segments (list): Whisper transcription segments.
+            output_dir (str): Directory to save the transcription text file.
+            name (str): Optional suffix for the file name (e.g. a job id).
+            use_words (bool): Assign speakers per word using Whisper word timestamps.
+            audio_hash (str): Content hash of the audio; with a result cache, the transcript is cached
+                              under it so later runs reuse the file.
 
-        # Step 3: Combine diarization and transcription
+        Returns:
+            str: Path to the saved transcription file.
+        """
         print("Combining diarization and transcription...")
-        transcript_with_speakers = self.align_diarization_with_transcription(
-            diarization_result, transcription_result["segments"]
-        )
+        alignment_started = time.perf_counter()
+        transcript_with_speakers = self.align_diarization_with_transcription(turns, segments, use_words=use_words)
+        self.last_timings["alignment"] = time.perf_counter() - alignment_started
+
+        output_file = self._save_transcript(transcript_with_speakers, output_dir, name=name)
+        if self.cache is not None and audio_hash is not None and segments:
+            self.cache.put(
+                "transcript",
+                self._cache_key("transcript", audio_hash, use_words),
+                {"text": transcript_with_speakers, "file": output_file},
+            )
+        return output_file
 
+    def _save_transcript(self, text, output_dir, name=None):
         # Generate a unique filename based on the current timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(output_dir, f"transcription_{timestamp}.txt")
+        suffix = f"_{name}" if name else ""
+        output_file = os.path.join(output_dir, f"transcription_{timestamp}{suffix}.txt")
 
         # Ensure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
         # Save transcription with speaker labels to a text file
         with open(output_file, "w", encoding="utf-8") as f:
-            f.write(transcript_with_speakers)
+            f.write(text)
 
         print(f"Transcription saved to {output_file}")
-
         return output_file
 
-    def align_diarization_with_transcription(self, diarization_result, transcription_segments):
+    def align_diarization_with_transcription(self, diarization_result, transcription_segments, use_words=False):
         """
         Align speaker diarization results with transcription segments.
 
+        Each segment (or each word, with `use_words`) is assigned to the speaker whose turns overlap
+        it the most, using a sorted interval index over the diarization turns.
+
         Args:
-            diarization_result (pyannote.audio.Pipeline): Speaker diarization output.
+            diarization_result (pyannote.core.Annotation or list): Speaker diarization output, or a
+                list of (start, end, speaker_label) turns.
             transcription_segments (list): Whisper transcription segments.
+            use_words (bool): Assign speakers per word using Whisper word timestamps.
 
         Returns:
             str: A string containing the transcription with speaker labels.
         """
-        transcript_with_speakers = ""
-        for segment in transcription_segments:
-            start_time = segment["start"]
-            end_time = segment["end"]
-            text = segment["text"]
-
-            # Find the speaker for this segment based on diarization
-            speaker = "Speaker"
-            for turn, _, speaker_label in diarization_result.itertracks(yield_label=True):
-                if turn.start <= start_time and turn.end >= end_time:
-                    speaker = speaker_label
-                    break
-
-            # Append speaker label and text to the transcript
-            transcript_with_speakers += f"{speaker}: {text}\n"
+        utterances = align_segments(
+            diarization_turns(diarization_result), transcription_segments, default="Speaker", use_words=use_words
+        )
 
         # Add breaking line and timestamp
         current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        transcript_with_speakers += "----------\n"
-        transcript_with_speakers += f"{current_timestamp}\n"
-
-        return transcript_with_speakers
+        return format_utterances(utterances) + f"----------\n{current_timestamp}\n"
 
 
 # Example usage
@@ -5,6 +5,7 @@ import subprocess
 from pyannote.audio import Pipeline
 from whisper import load_model
 from pyannote.core import Segment
+from speaker_alignment import diarization_turns, align_segments, format_utterances
 import time  # Import the time module
 
 # Step 1: Convert MP4 to WAV
@@ -71,29 +72,17 @@ def combine_diarization_and_transcription(diarization_result, transcription_segm
         str: Combined transcript with speaker labels.
     """
     print("Combining diarization and transcription...")
-    transcript_with_speakers = ""
-    speaker_mapping = {}
-    speaker_counter = 1
-
-    for segment in transcription_segments:
-        start_time = segment["start"]
-        end_time = segment["end"]
-        text = segment["text"]
-
-        # Find the speaker for this segment
-        speaker = "Unknown"
-        for turn, _, speaker_label in diarization_result.itertracks(yield_label=True):
-            if turn.start <= start_time and turn.end >= end_time:
-                if speaker_label not in speaker_mapping:
-                    speaker_mapping[speaker_label] = f"Speaker {speaker_counter}"
-                    speaker_counter += 1
-                speaker = speaker_mapping[speaker_label]
-                break
-
-        # Append speaker label and text to the transcript
-        transcript_with_speakers += f"{speaker}: {text}\n"
-
-    return transcript_with_speakers
+    utterances = align_segments(diarization_turns(diarization_result), transcription_segments, default="Unknown")
+
+    # Number speakers in order of first appearance
+    speaker_mapping = {"Unknown": "Unknown"}
+    for speaker, _, _, _ in utterances:
+        if speaker not in speaker_mapping:
+            speaker_mapping[speaker] = f"Speaker {len(speaker_mapping)}"
+
+    return format_utterances(
+        [(speaker_mapping[speaker], start, end, text) for speaker, start, end, text in utterances]
+    )
 
 # Step 5: Main Function
 def main():
@@ -0,0 +1,81 @@
+"""
+Transcript Format Module
+
+This module provides helpers for reading transcript files and normalizing transcript input for the
+analysis components, so that they accept in-memory strings as well as file paths.
+"""
+
+import os
+import re
+
+
+def read_transcript(transcript_path):
+    """
+    Read a transcript file.
+
+    Args:
+        transcript_path (str): Path to the transcript file.
+
+    Returns:
+        str: The transcript content, or None if the file is not found.
+    """
+    if not os.path.exists(transcript_path):
+        print(f"File not found: {transcript_path}")
+        return None
+
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def as_text_list(texts):
+    """
+    Normalize a single string or an iterable of strings to a list of strings.
+
+    Args:
+        texts (str or iterable): A transcript or an iterable of transcripts.
+
+    Returns:
+        list: The transcripts as a list.
+    """
+    if isinstance(texts, str):
+        return [texts]
+    return list(texts)
+
+
+TRAILER_SEPARATOR = "----------"
+
+# Only the labels the transcriber writes: PyAnnote's "SPEAKER_00", the "Speaker" fallback (optionally
+# numbered) and "Unknown", so continuation lines such as "Price: $5" are not read as a new speaker
+SPEAKER_LINE = re.compile(r"^(SPEAKER_\d+|Speaker(?: \d+)?|Unknown):\s*(.*)$")
+
+
+def parse_utterances(transcript):
+    """
+    Parse the `Speaker: text` lines written by `Transcriber.align_diarization_with_transcription`.
+
+    Parsing stops at the separator line that precedes the timestamp trailer. Lines without a speaker
+    label are appended to the previous utterance.
+
+    Args:
+        transcript (str): The speaker-labeled transcript.
+
+    Returns:
+        list: A list of (speaker, text) tuples in transcript order.
+    """
+    utterances = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if line == TRAILER_SEPARATOR:
+            break
+        if not line:
+            continue
+
+        match = SPEAKER_LINE.match(line)
+        if match:
+            utterances.append((match.group(1), match.group(2).strip()))
+        elif utterances:
+            previous_speaker, previous_text = utterances[-1]
+            utterances[-1] = (previous_speaker, f"{previous_text} {line}".strip())
+        else:
+            utterances.append(("Speaker", line))
+    return [(speaker, text) for speaker, text in utterances if text]
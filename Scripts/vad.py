@@ -0,0 +1,283 @@
+"""
+Voice Activity Detection Module
+
+This module decides which parts of the audio contain speech. It provides an energy VAD that tracks
+the background noise floor, so steady noise such as HVAC hum is not mistaken for speech, and an
+optional Silero neural VAD that runs on the CPU. Both share the same decision logic: separate start
+and stop thresholds (hysteresis), a minimum onset before speech starts and a hangover before it
+ends. `speech_segments` turns the decisions into speech regions, so Whisper and PyAnnote only
+receive speech. The `EnergyVAD` class is the main component of this module.
+"""
+
+import math
+
+import numpy as np
+
+from audio_buffer import SAMPLE_RATE, resample
+
+
+class VoiceActivityDetector:
+    """
+    Base class that turns per-frame speech scores into stable speech/non-speech decisions.
+
+    Subclasses implement `score`, which says whether a frame is above the start threshold and
+    whether it is above the (lower) stop threshold.
+
+    Attributes:
+        onset_ms (float): Time above the start threshold before speech starts.
+        hangover_ms (float): Time below the stop threshold before speech ends.
+        active (bool): Whether speech is currently detected.
+    """
+
+    def __init__(self, onset_ms=90, hangover_ms=400):
+        self.onset_ms = onset_ms
+        self.hangover_ms = hangover_ms
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the state of the previous stream.
+        """
+        self.active = False
+        self._loud_ms = 0.0
+        self._quiet_ms = 0.0
+
+    def score(self, frame, rate):
+        """
+        Score one frame.
+
+        Args:
+            frame (numpy.ndarray): int16 or float32 mono samples.
+            rate (int): Sample rate of the frame.
+
+        Returns:
+            tuple: (above_start, above_stop) booleans.
+        """
+        raise NotImplementedError
+
+    def is_speech(self, frame, rate):
+        """
+        Decide whether a frame is part of speech, given the frames before it.
+
+        Args:
+            frame (numpy.ndarray): int16 or float32 mono samples, typically 10-50 ms.
+            rate (int): Sample rate of the frame.
+
+        Returns:
+            bool: True while speech is detected (including the hangover after it).
+        """
+        return self._decide(*self.score(frame, rate), 1000.0 * len(frame) / rate)
+
+    def _decide(self, above_start, above_stop, duration_ms):
+        if self.active:
+            if above_stop:
+                self._quiet_ms = 0.0
+            else:
+                self._quiet_ms += duration_ms
+                if self._quiet_ms >= self.hangover_ms:
+                    self.active = False
+                    self._loud_ms = 0.0
+        elif above_start:
+            self._loud_ms += duration_ms
+            if self._loud_ms >= self.onset_ms:
+                self.active = True
+                self._quiet_ms = 0.0
+        else:
+            self._loud_ms = 0.0
+        return self.active
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Energy VAD with an adaptive noise floor.
+
+    The noise floor follows the frame level down quickly and up slowly, so it settles on the level of
+    the pauses between words. A frame is speech when it is `start_db` above the floor (and above the
+    absolute `min_level_db`); speech continues while frames stay `stop_db` above the floor.
+
+    Attributes:
+        start_db (float): Margin above the noise floor that starts speech.
+        stop_db (float): Margin above the noise floor that keeps speech going.
+        min_level_db (float): Absolute level (dB re one int16 step) below which nothing is speech.
+        noise_floor_db (float): Current noise floor estimate.
+    """
+
+    def __init__(self, start_db=10.0, stop_db=6.0, min_level_db=30.0, rise_seconds=8.0, fall_seconds=0.1,
+                 onset_ms=90, hangover_ms=400):
+        """
+        Initialize the energy VAD.
+
+        Args:
+            start_db (float): Margin above the noise floor that starts speech.
+            stop_db (float): Margin above the noise floor that keeps speech going.
+            min_level_db (float): Absolute minimum speech level in dB re one int16 step (30 dB ~ RMS 32).
+            rise_seconds (float): Time constant of the noise floor rising to louder background noise.
+            fall_seconds (float): Time constant of the noise floor falling to quieter frames.
+            onset_ms (float): Time above the start threshold before speech starts.
+            hangover_ms (float): Time below the stop threshold before speech ends.
+        """
+        self.start_db = start_db
+        self.stop_db = stop_db
+        self.min_level_db = min_level_db
+        self.rise_seconds = rise_seconds
+        self.fall_seconds = fall_seconds
+        super().__init__(onset_ms=onset_ms, hangover_ms=hangover_ms)
+
+    def reset(self):
+        super().reset()
+        self.noise_floor_db = None
+
+    def score(self, frame, rate):
+        samples = frame.astype(np.float32)
+        if frame.dtype != np.int16:
+            samples *= 32768.0  # Float audio in [-1, 1]
+        level_db = 10.0 * math.log10(float(np.dot(samples, samples)) / max(len(samples), 1) + 1e-10)
+        return self._score_level(level_db, len(frame) / rate)
+
+    def is_speech_rms(self, rms, frames, rate):
+        """
+        Like `is_speech`, for a frame whose RMS is already known (no copy of the samples is made).
+
+        Args:
+            rms (float): RMS of the frame in int16 units.
+            frames (int): Number of frames (samples per channel) in the frame.
+            rate (int): Sample rate of the frame.
+
+        Returns:
+            bool: True while speech is detected (including the hangover after it).
+        """
+        level_db = 10.0 * math.log10(rms * rms + 1e-10)
+        return self._decide(*self._score_level(level_db, frames / rate), 1000.0 * frames / rate)
+
+    def _score_level(self, level_db, duration):
+        if self.noise_floor_db is None:
+            self.noise_floor_db = level_db
+        above_start = level_db >= self.noise_floor_db + self.start_db and level_db >= self.min_level_db
+        above_stop = level_db >= self.noise_floor_db + self.stop_db and level_db >= self.min_level_db
+
+        # Track the floor: quickly down to quieter frames, slowly up to steady louder noise
+        tau = self.fall_seconds if level_db < self.noise_floor_db else self.rise_seconds
+        self.noise_floor_db += (1.0 - math.exp(-duration / tau)) * (level_db - self.noise_floor_db)
+        return above_start, above_stop
+
+
+class SileroVAD(VoiceActivityDetector):
+    """
+    Silero neural VAD (a small recurrent model run on the CPU).
+
+    Attributes:
+        threshold (float): Speech probability that starts speech; speech continues above
+                           `threshold - 0.15`.
+    """
+
+    def __init__(self, threshold=0.5, onset_ms=60, hangover_ms=400):
+        """
+        Load the Silero VAD model.
+
+        The model keeps recurrent state between frames, so every detector loads its own copy
+        (about 2 MB) instead of sharing one through the model registry.
+
+        Args:
+            threshold (float): Speech probability that starts speech.
+            onset_ms (float): Time above the start threshold before speech starts.
+            hangover_ms (float): Time below the stop threshold before speech ends.
+        """
+        import torch
+
+        self.threshold = threshold
+        self._torch = torch
+        self.model, _ = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+        super().__init__(onset_ms=onset_ms, hangover_ms=hangover_ms)
+
+    def reset(self):
+        super().reset()
+        if hasattr(self, "model"):
+            self.model.reset_states()
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def score(self, frame, rate):
+        samples = frame.astype(np.float32) / 32768.0 if frame.dtype == np.int16 else frame.astype(np.float32)
+        samples = np.concatenate([self._pending, resample(samples, rate, SAMPLE_RATE)])
+
+        # The model takes 512-sample windows at 16 kHz; leftovers wait for the next frame
+        probability = None
+        usable = len(samples) - len(samples) % 512
+        with self._torch.no_grad():
+            for start in range(0, usable, 512):
+                window = self._torch.from_numpy(samples[start:start + 512])
+                p = float(self.model(window, SAMPLE_RATE))
+                probability = p if probability is None else max(probability, p)
+        self._pending = samples[usable:]
+
+        if probability is None:
+            return self.active, self.active  # Not enough audio yet: keep the current decision
+        return probability >= self.threshold, probability >= self.threshold - 0.15
+
+
+def make_vad(kind="energy"):
+    """
+    Create a voice activity detector.
+
+    Args:
+        kind (str or VoiceActivityDetector): "energy", "silero", or an existing detector.
+
+    Returns:
+        VoiceActivityDetector: The detector. Falls back to the energy VAD if Silero cannot be loaded.
+    """
+    if isinstance(kind, VoiceActivityDetector):
+        return kind
+    if kind == "silero":
+        try:
+            return SileroVAD()
+        except Exception as e:
+            print(f"Could not load the Silero VAD ({e}); using the energy VAD instead.")
+            return EnergyVAD()
+    if kind == "energy":
+        return EnergyVAD()
+    raise ValueError(f"Unknown VAD: {kind}")
+
+
+def speech_segments(samples, rate=SAMPLE_RATE, vad=None, frame_ms=30, pad_ms=200, min_speech_ms=250):
+    """
+    Find the speech regions of a waveform.
+
+    Args:
+        samples (numpy.ndarray): Mono int16 or float32 samples.
+        rate (int): Sample rate of `samples`.
+        vad (VoiceActivityDetector): Detector to use (reset before use). Defaults to a new `EnergyVAD`.
+        frame_ms (int): Frame length used for the decisions.
+        pad_ms (int): Padding added around each region so word edges are not clipped.
+        min_speech_ms (int): Regions shorter than this are dropped.
+
+    Returns:
+        list: (start_seconds, end_seconds) speech regions, sorted and non-overlapping.
+    """
+    vad = vad or EnergyVAD()
+    vad.reset()
+    frame = max(1, int(rate * frame_ms / 1000))
+    total = len(samples) / rate
+
+    regions = []
+    start = None
+    for offset in range(0, len(samples), frame):
+        speaking = vad.is_speech(samples[offset:offset + frame], rate)
+        t = offset / rate
+        if speaking and start is None:
+            start = max(0.0, t - vad.onset_ms / 1000.0)  # Speech began before the onset delay
+        elif not speaking and start is not None:
+            regions.append((start, max(start, t - vad.hangover_ms / 1000.0 + frame / rate)))
+            start = None
+    if start is not None:
+        regions.append((start, total))
+
+    merged = []
+    pad = pad_ms / 1000.0
+    for start, end in regions:
+        if end - start < min_speech_ms / 1000.0:
+            continue
+        start, end = max(0.0, start - pad), min(total, end + pad)
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -1,7 +1,9 @@
 # backend/app/auth.py
 from passlib.context import CryptContext
 from jose import jwt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -13,12 +15,23 @@ EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow CPU work; the async routes hand it to this bounded pool so a burst of
+# logins queues here instead of stalling the event loop or taking every threadpool slot
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
 def hash_password(password):
     return pwd_context.hash(password)
 
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
+async def hash_password_async(password):
+    return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, hash_password, password)
+
+async def verify_password_async(plain, hashed):
+    return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, verify_password, plain, hashed)
+
 def create_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=EXPIRE_MINUTES)
@@ -0,0 +1,176 @@
+# backend/app/benchmark_async.py
+# Load benchmark: the same conversation listing served by a sync route (threadpool + Session) and an
+# async route (event loop + AsyncSession), hit with concurrent requests in-process.
+# Runs against DATABASE_URL, e.g. a local Postgres or a SQLite file stand-in:
+#   DATABASE_URL=sqlite:///bench.sqlite python benchmark_async.py --db-latency-ms 20 --concurrency 100
+# --db-latency-ms adds a statement per request that takes that long on the database side (pg_sleep on
+# Postgres, a sleeping SQL function on SQLite) while holding the connection, standing in for the hop
+# to the hosted database; leave it at 0 when DATABASE_URL already points at a remote server.
+# Both routes get their own engine with --pool-size connections (default: one per concurrent request),
+# so the pool does not cap either side and the difference measured is threadpool vs event loop.
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+import httpx
+from database import DATABASE_URL, Base, engine_options
+from database_async import ASYNC_DATABASE_URL
+from models import Conversation, User
+
+BENCH_EMAIL = "benchmark@example.com"
+
+
+def bench_engines(pool_size):
+    """Sync and async engines on DATABASE_URL with a pool of pool_size connections each."""
+    sizing = dict(pool_size=pool_size, max_overflow=0, pool_timeout=60)
+    sync_engine = create_engine(DATABASE_URL, **{**engine_options(DATABASE_URL), **sizing})
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **{**engine_options(ASYNC_DATABASE_URL), **sizing})
+    if sync_engine.dialect.name == "sqlite":
+        # SQLite has no sleep function; the query runs on the driver's thread, so sleeping there
+        # behaves like waiting on a remote server (blocking for pysqlite, off-loop for aiosqlite)
+        for target in (sync_engine, async_engine.sync_engine):
+            event.listen(target, "connect", lambda dbapi_connection, record: dbapi_connection.create_function(
+                "pg_sleep", 1, lambda seconds: time.sleep(seconds) or 0))
+    return sync_engine, async_engine
+
+
+def seed(engine, conversations):
+    """Create the tables and a benchmark user with the requested number of conversations."""
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if user is None:
+            user = User(email=BENCH_EMAIL, hashed_password="", business_name="Benchmark", verified=True)
+            db.add(user)
+            db.commit()
+        existing = db.query(func.count(Conversation.id)).filter(Conversation.user_id == user.id).scalar()
+        now = datetime.utcnow()
+        db.add_all([
+            Conversation(
+                user_id=user.id,
+                transcript="benchmark transcript " * 50,
+                sentiment_score="neutral",
+                emotion_scores={"neutral": 0.9},
+                summary=f"Benchmark conversation {i}",
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(existing, conversations)
+        ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def listing(user_id, limit):
+    return (
+        select(Conversation.id, Conversation.created_at, Conversation.summary)
+        .where(Conversation.user_id == user_id)
+        .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+        .limit(limit)
+    )
+
+
+def build_app(sync_engine, async_engine, user_id, latency, limit):
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    query = listing(user_id, limit)
+    pause = select(func.pg_sleep(latency))
+
+    # The same shape as database.get_db / database_async.get_async_db, on the benchmark's engines
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        except PoolTimeoutError:
+            raise HTTPException(status_code=503, detail="Database busy, try again")
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSession() as db:
+            try:
+                yield db
+            except PoolTimeoutError:
+                raise HTTPException(status_code=503, detail="Database busy, try again")
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(db=Depends(get_sync_db)):
+        if latency:
+            db.execute(pause)
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    @app.get("/async")
+    async def async_route(db=Depends(get_async_db)):
+        if latency:
+            await db.execute(pause)
+        return [dict(row._mapping) for row in await db.execute(query)]
+
+    return app
+
+
+async def run_load(app, path, requests, concurrency):
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.get(path)  # Warm up the route
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async route throughput")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    parser.add_argument("--pool-size", type=int, default=None, help="Connections per engine (default: --concurrency)")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Database-side wait per request")
+    parser.add_argument("--rows", type=int, default=1000, help="Conversations to seed")
+    parser.add_argument("--limit", type=int, default=50, help="Conversations returned per request")
+    args = parser.parse_args()
+
+    pool_size = args.pool_size or args.concurrency
+    sync_engine, async_engine = bench_engines(pool_size)
+    user_id = seed(sync_engine, args.rows)
+    app = build_app(sync_engine, async_engine, user_id, args.db_latency_ms / 1000, args.limit)
+    print(f"Database: {sync_engine.url.render_as_string(hide_password=True)} | requests: {args.requests} | "
+          f"concurrency: {args.concurrency} | pool: {pool_size} | database latency: {args.db_latency_ms} ms")
+    for name in ("sync", "async"):
+        result = await run_load(app, f"/{name}", args.requests, args.concurrency)
+        print(f"{name:>5}: {result['rps']:8.1f} req/s | p50 {result['p50_ms']:7.1f} ms | "
+              f"p95 {result['p95_ms']:7.1f} ms | errors {result['errors']}")
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
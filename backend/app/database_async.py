@@ -0,0 +1,45 @@
+# backend/app/database_async.py
+# Async variant of database.py: the same database and pool settings, driven by asyncpg (Postgres)
+# or aiosqlite (SQLite), so requests wait on the database without holding a threadpool slot.
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import HTTPException
+from database import DATABASE_URL, PoolMetrics, engine_options, is_transaction_pooler
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url):
+    """Switch a database URL to the async driver of its backend (postgresql:// -> postgresql+asyncpg://)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    query = dict(url.query)
+    if "sslmode" in query:
+        # asyncpg takes ssl= instead of libpq's sslmode=
+        query["ssl"] = query.pop("sslmode")
+    if url.drivername == "postgresql+asyncpg" and is_transaction_pooler(url):
+        query["prepared_statement_cache_size"] = "0"
+    return url.set(query=query)
+
+
+ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+# expire_on_commit=False: returning an object after commit must not trigger a (blocking) refresh
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+async_pool_metrics = PoolMetrics(async_engine.sync_engine)
+
+
+# FastAPI dependency: one async session per request, always closed.
+# As with get_db, the connection is taken by the first query; pool timeouts become 503s.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except PoolTimeoutError:
+            async_pool_metrics.record_timeout()
+            raise HTTPException(status_code=503, detail="Database busy, try again")
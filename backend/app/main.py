@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes import auth_routes
 from routes import convo_routes
+from database import pool_metrics
+from database_async import async_pool_metrics
 import os
 from dotenv import load_dotenv
 
@@ -34,4 +36,9 @@ app.include_router(convo_routes.router, prefix="/conversations")
 
 @app.get("/")
 def root():
-    return {"message": "API is up"}
\ No newline at end of file
+    return {"message": "API is up"}
+
+# Connection pool health: checkouts, connection hold times, timeouts and saturation
+@app.get("/health/db")
+def db_health():
+    return {"async": async_pool_metrics.snapshot(), "sync": pool_metrics.snapshot()}
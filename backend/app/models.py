@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, Boolean
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Text, JSON, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -24,4 +24,24 @@ class Conversation(Base):
     summary = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+    __table_args__ = (
+        # Serves the keyset-paginated listing: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_conversations_user_created", "user_id", "created_at", "id"),
+    )
+
+
+# Per-user, per-day sentiment and emotion totals, kept in step with the conversations table (see rollups.py)
+class ConversationRollup(Base):
+    __tablename__ = "conversation_rollups"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    conversations = Column(Integer, nullable=False, default=0)
+    sentiment_counts = Column(JSON, nullable=False, default=dict)  # label -> number of conversations
+    emotion_sums = Column(JSON, nullable=False, default=dict)      # emotion -> sum of scores
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_conversation_rollups_user_day"),
+    )
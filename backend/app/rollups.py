@@ -0,0 +1,140 @@
+# backend/app/rollups.py
+# Daily per-user rollups of conversation sentiment and emotion scores.
+# The conversation routes apply every create/update/delete to the rollup of the conversation's day
+# in the same transaction, so the analytics endpoint reads a handful of rollup rows instead of
+# scanning every conversation's JSON.
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models import Conversation, ConversationRollup
+
+BUCKETS = ("day", "week", "month")
+
+
+def _sentiment_label(conversation):
+    return (conversation.sentiment_score or "unknown").strip().lower() or "unknown"
+
+
+def _get_rollup(db, user_id, day):
+    # Lock the row so concurrent writers to the same day do not lose each other's increments
+    rollup = (
+        db.query(ConversationRollup)
+        .filter(ConversationRollup.user_id == user_id, ConversationRollup.day == day)
+        .with_for_update()
+        .first()
+    )
+    if rollup is not None:
+        return rollup
+    try:
+        with db.begin_nested():
+            rollup = ConversationRollup(user_id=user_id, day=day, conversations=0, sentiment_counts={}, emotion_sums={})
+            db.add(rollup)
+    except IntegrityError:
+        # Another transaction created the row first
+        rollup = (
+            db.query(ConversationRollup)
+            .filter(ConversationRollup.user_id == user_id, ConversationRollup.day == day)
+            .with_for_update()
+            .one()
+        )
+    return rollup
+
+
+def apply_conversation(db, conversation, sign=1):
+    """Add (sign=1) or remove (sign=-1) a conversation from its day's rollup. The caller commits."""
+    rollup = _get_rollup(db, conversation.user_id, (conversation.created_at or datetime.utcnow()).date())
+    label = _sentiment_label(conversation)
+
+    # JSON columns are reassigned (not mutated in place) so SQLAlchemy sees the change
+    sentiment_counts = dict(rollup.sentiment_counts or {})
+    sentiment_counts[label] = sentiment_counts.get(label, 0) + sign
+    if sentiment_counts[label] <= 0:
+        del sentiment_counts[label]
+
+    emotion_sums = dict(rollup.emotion_sums or {})
+    for emotion, score in (conversation.emotion_scores or {}).items():
+        emotion_sums[emotion] = emotion_sums.get(emotion, 0.0) + sign * float(score)
+        if abs(emotion_sums[emotion]) < 1e-9:
+            del emotion_sums[emotion]
+
+    rollup.conversations = (rollup.conversations or 0) + sign
+    rollup.sentiment_counts = sentiment_counts
+    rollup.emotion_sums = emotion_sums
+    if rollup.conversations <= 0:
+        db.delete(rollup)
+        db.flush()  # So a following apply_conversation for the same day creates a fresh row
+
+
+def rebuild_rollups(db, user_id=None):
+    """Recompute the rollups from the conversations table (backfill or repair). Commits."""
+    rollups = db.query(ConversationRollup)
+    conversations = db.query(Conversation)
+    if user_id is not None:
+        rollups = rollups.filter(ConversationRollup.user_id == user_id)
+        conversations = conversations.filter(Conversation.user_id == user_id)
+    rollups.delete(synchronize_session=False)
+
+    totals = defaultdict(lambda: {"conversations": 0, "sentiment_counts": defaultdict(int), "emotion_sums": defaultdict(float)})
+    for convo in conversations.yield_per(1000):
+        total = totals[(convo.user_id, (convo.created_at or datetime.utcnow()).date())]
+        total["conversations"] += 1
+        total["sentiment_counts"][_sentiment_label(convo)] += 1
+        for emotion, score in (convo.emotion_scores or {}).items():
+            total["emotion_sums"][emotion] += float(score)
+
+    for (uid, day), total in totals.items():
+        db.add(ConversationRollup(
+            user_id=uid,
+            day=day,
+            conversations=total["conversations"],
+            sentiment_counts=dict(total["sentiment_counts"]),
+            emotion_sums=dict(total["emotion_sums"]),
+        ))
+    db.commit()
+    return len(totals)
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _summarize(total):
+    count = total["conversations"]
+    return {
+        "conversations": count,
+        "sentiment": dict(total["sentiment"]),
+        "emotion_sums": {emotion: round(value, 6) for emotion, value in total["emotion_sums"].items()},
+        "emotion_means": {emotion: round(value / count, 6) for emotion, value in total["emotion_sums"].items()} if count else {},
+    }
+
+
+def conversation_stats(db, user_id, start=None, end=None, bucket="day"):
+    """Sentiment counts and emotion sums/means per bucket between start and end (inclusive dates)."""
+    query = db.query(ConversationRollup).filter(ConversationRollup.user_id == user_id)
+    if start is not None:
+        query = query.filter(ConversationRollup.day >= start)
+    if end is not None:
+        query = query.filter(ConversationRollup.day <= end)
+
+    new_total = lambda: {"conversations": 0, "sentiment": defaultdict(int), "emotion_sums": defaultdict(float)}
+    buckets = defaultdict(new_total)
+    overall = new_total()
+    for rollup in query.order_by(ConversationRollup.day).all():
+        for total in (buckets[bucket_start(rollup.day, bucket)], overall):
+            total["conversations"] += rollup.conversations
+            for label, count in (rollup.sentiment_counts or {}).items():
+                total["sentiment"][label] += count
+            for emotion, value in (rollup.emotion_sums or {}).items():
+                total["emotion_sums"][emotion] += value
+
+    return {
+        "bucket": bucket,
+        "from": start.isoformat() if isinstance(start, date) else None,
+        "to": end.isoformat() if isinstance(end, date) else None,
+        "buckets": [dict(start=day.isoformat(), **_summarize(total)) for day, total in sorted(buckets.items())],
+        "totals": _summarize(overall),
+    }
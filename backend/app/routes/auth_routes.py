@@ -1,8 +1,11 @@
 # backend/app/routes/auth_routes.py
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
-from database import SessionLocal
-from auth import hash_password, verify_password, create_token
+from database_async import get_async_db
+from auth import hash_password_async, verify_password_async, create_token
 from pydantic import BaseModel, EmailStr
 from jose import jwt
 import os
@@ -67,38 +70,37 @@ def send_verification_email(email, token):
         raise HTTPException(status_code=500, detail="Failed to send email.")
 
 @router.post("/register")
-def register_user(data: RegisterRequest):
+async def register_user(data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     print(f"Received registration data: {data}")  # Debug log
 
-    db = SessionLocal()
-    if db.query(User).filter(User.email == data.email).first():
+    if await db.scalar(select(User).where(User.email == data.email)):
         raise HTTPException(400, detail="Email already exists")
 
     user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password_async(data.password),
         business_name=data.business_name,
         verified=False
     )
     db.add(user)
-    db.commit()
+    await db.commit()
 
     token = generate_verification_token(data.email)
     print(f"Generated token: {token}")  # Debug log
-    send_verification_email(data.email, token)
+    # smtplib blocks; keep it off the event loop
+    await run_in_threadpool(send_verification_email, data.email, token)
 
     return {"msg": "User created. Please verify your email."}
 
 @router.get("/verify/{token}")
-def verify_email(token: str):
+async def verify_email(token: str, db: AsyncSession = Depends(get_async_db)):
     try:
         # Decode the token to get the email
         email = verify_token(token)
         print(f"Verifying email: {email}")  # Debug log
 
         # Find the user in the database
-        db = SessionLocal()
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -107,7 +109,7 @@ def verify_email(token: str):
             return {"msg": "Email is already verified."}
 
         user.verified = True
-        db.commit()
+        await db.commit()
         return {"msg": "Email verified successfully!"}
     except Exception as e:
         print(f"Verification error: {e}")
@@ -118,10 +120,9 @@ class LoginRequest(BaseModel):
     password: str
 
 @router.post("/login")
-def login_user(data: LoginRequest):
-    db = SessionLocal()
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login_user(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
+    if not user or not await verify_password_async(data.password, user.hashed_password):
         raise HTTPException(400, detail="Invalid credentials")
     token = create_token({"sub": str(user.id)})
     return {"access_token": token}
@@ -138,16 +139,15 @@ def get_user_id_from_token(token: str):
 
 # New route to get user account information
 @router.get("/account")
-def get_account_info(authorization: str = Header(...)):
+async def get_account_info(authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
     try:
         # Extract the token from the "Bearer <token>" format
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
     user_id = get_user_id_from_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database_async import get_async_db
 from models import Conversation, User
+from rollups import BUCKETS, apply_conversation, conversation_stats
+from search import search_conversations
 from jose import jwt
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
+import base64
+import json
 import os
 from dotenv import load_dotenv
 
@@ -34,49 +40,132 @@ class ConversationRequest(BaseModel):
 
 # Routes
 
-## List all conversations for the authenticated user
+# Columns the listing can return; the transcript is left out unless asked for
+LIST_FIELDS = {
+    "id": Conversation.id,
+    "user_id": Conversation.user_id,
+    "created_at": Conversation.created_at,
+    "sentiment_score": Conversation.sentiment_score,
+    "emotion_scores": Conversation.emotion_scores,
+    "summary": Conversation.summary,
+    "transcript": Conversation.transcript,
+}
+DEFAULT_LIST_FIELDS = ["id", "created_at", "sentiment_score", "emotion_scores", "summary"]
+MAX_PAGE_SIZE = 200
+
+# The cursor is the (created_at, id) of the last row of the previous page, base64-encoded
+def encode_cursor(created_at, id):
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+## List the authenticated user's conversations, one page at a time
 @router.get("/")
-def list_conversations(authorization: str = Header(...)):
-    print(f"Authorization Header: {authorization}")  # Debug log
+async def list_conversations(
+    authorization: str = Header(...),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
     try:
         # Extract the token from the "Bearer <token>" format
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
+    requested = fields.split(",") if fields else DEFAULT_LIST_FIELDS
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id and created_at are always returned; the next cursor is built from them
+    selected = ["id", "created_at"] + [f for f in requested if f not in ("id", "created_at")]
+
     user_id = get_user(token)
-    conversations = db.query(Conversation).filter(Conversation.user_id == user_id).all()
+    key = tuple_(Conversation.created_at, Conversation.id)
+    query = select(*[LIST_FIELDS[f] for f in selected]).where(Conversation.user_id == user_id)
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.where(key < position if order == "desc" else key > position)
+    if order == "desc":
+        query = query.order_by(Conversation.created_at.desc(), Conversation.id.desc())
+    else:
+        query = query.order_by(Conversation.created_at.asc(), Conversation.id.asc())
+
+    # One extra row tells whether there is a next page
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+## Sentiment and emotion statistics per time bucket, read from the daily rollups
+# (declared before /{id} so "stats" is not taken for a conversation ID)
+@router.get("/stats")
+async def get_stats(
+    authorization: str = Header(...),
+    db: AsyncSession = Depends(get_async_db),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    bucket: str = Query("day", pattern="^(" + "|".join(BUCKETS) + ")$"),
+):
+    try:
+        token = authorization.split(" ")[1]
+    except IndexError:
+        raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    if not conversations:
-        return {"message": "No records found"}
+    user_id = get_user(token)
+    # The rollup and search helpers are shared with setup.py, so they run on the session's sync facade
+    return await db.run_sync(conversation_stats, user_id, start=start, end=end, bucket=bucket)
+
+## Ranked full-text search over the user's summaries and transcripts
+# Matches are wrapped in <mark></mark> in the returned summary and transcript excerpts
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    authorization: str = Header(...),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    try:
+        token = authorization.split(" ")[1]
+    except IndexError:
+        raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    return conversations
+    user_id = get_user(token)
+    # One extra row tells whether there is a next page
+    items = await db.run_sync(search_conversations, user_id, q, limit=limit + 1, offset=offset)
+    return {"items": items[:limit], "next_offset": offset + limit if len(items) > limit else None}
 
 ## Get a specific conversation by ID
 @router.get("/{id}")
-def get_conversation(id: int, authorization: str = Header(...)):
+async def get_conversation(id: int, authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
     try:
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
     user_id = get_user(token)
-    convo = db.query(Conversation).filter(Conversation.id == id).first()
+    convo = await db.get(Conversation, id)
     if not convo or convo.user_id != user_id:
         raise HTTPException(status_code=403, detail="Unauthorized or not found")
     return convo
 
 ## Create a new conversation
 @router.post("/")
-def create_conversation(data: ConversationRequest, authorization: str = Header(...)):
+async def create_conversation(data: ConversationRequest, authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
     try:
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
     user_id = get_user(token)
 
     convo = Conversation(
@@ -88,47 +177,50 @@ def create_conversation(data: ConversationRequest, authorization: str = Header(.
         created_at=datetime.utcnow()
     )
     db.add(convo)
-    db.commit()
-    db.refresh(convo)
+    await db.run_sync(apply_conversation, convo, 1)
+    await db.commit()
+    await db.refresh(convo)
     return convo
 
 ## Update an existing conversation
 @router.put("/{id}")
-def update_conversation(id: int, data: ConversationRequest, authorization: str = Header(...)):
+async def update_conversation(id: int, data: ConversationRequest, authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
     try:
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
     user_id = get_user(token)
 
-    convo = db.query(Conversation).filter(Conversation.id == id).first()
+    convo = await db.get(Conversation, id)
     if not convo or convo.user_id != user_id:
         raise HTTPException(status_code=403, detail="Unauthorized or not found")
 
+    # Swap the old scores for the new ones in the rollup, in the same transaction
+    await db.run_sync(apply_conversation, convo, -1)
     convo.transcript = data.transcript
     convo.sentiment_score = data.sentiment_score
     convo.emotion_scores = data.emotion_scores
     convo.summary = data.summary
-    db.commit()
+    await db.run_sync(apply_conversation, convo, 1)
+    await db.commit()
     return convo
 
 ## Delete a conversation
 @router.delete("/{id}")
-def delete_conversation(id: int, authorization: str = Header(...)):
+async def delete_conversation(id: int, authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
     try:
         token = authorization.split(" ")[1]
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
 
-    db = SessionLocal()
     user_id = get_user(token)
 
-    convo = db.query(Conversation).filter(Conversation.id == id).first()
+    convo = await db.get(Conversation, id)
     if not convo or convo.user_id != user_id:
         raise HTTPException(status_code=403, detail="Unauthorized or not found")
 
-    db.delete(convo)
-    db.commit()
+    await db.run_sync(apply_conversation, convo, -1)
+    await db.delete(convo)
+    await db.commit()
     return {"message": f"Conversation {id} deleted"}
\ No newline at end of file
@@ -0,0 +1,113 @@
+# backend/app/search.py
+# Full-text search over conversation summaries and transcripts.
+# Postgres: a generated tsvector column (summary weighted above transcript) with a GIN index, so the
+# index is kept in sync on every insert and update by the database itself. Queries use
+# websearch_to_tsquery, are ranked with ts_rank_cd and highlighted with ts_headline.
+# SQLite (local/dev): an external-content FTS5 table kept in sync by triggers, ranked with bm25 and
+# highlighted with snippet().
+from sqlalchemy import text
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+POSTGRES_SCHEMA = [
+    """
+    ALTER TABLE conversations ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(summary, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(transcript, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_conversations_search ON conversations USING GIN (search_vector)",
+]
+
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+        summary, transcript, content='conversations', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+        INSERT INTO conversations_fts(rowid, summary, transcript) VALUES (new.id, new.summary, new.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+        INSERT INTO conversations_fts(conversations_fts, rowid, summary, transcript)
+        VALUES ('delete', old.id, old.summary, old.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE ON conversations BEGIN
+        INSERT INTO conversations_fts(conversations_fts, rowid, summary, transcript)
+        VALUES ('delete', old.id, old.summary, old.transcript);
+        INSERT INTO conversations_fts(rowid, summary, transcript) VALUES (new.id, new.summary, new.transcript);
+    END
+    """,
+    # Index the rows that existed before the table was created (a no-op cost on an empty database)
+    "INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_SEARCH = text(f"""
+    WITH query AS (SELECT websearch_to_tsquery('english', :q) AS q),
+    hits AS (
+        SELECT c.id, ts_rank_cd(c.search_vector, query.q) AS rank
+        FROM conversations c, query
+        WHERE c.user_id = :user_id AND c.search_vector @@ query.q
+        ORDER BY rank DESC, c.id DESC
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT c.id, c.created_at, c.sentiment_score, hits.rank,
+        ts_headline('english', coalesce(c.summary, ''), query.q,
+                    'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, HighlightAll=true') AS summary,
+        ts_headline('english', coalesce(c.transcript, ''), query.q,
+                    'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxFragments=3, MaxWords=20, MinWords=8, '
+                    'FragmentDelimiter=" … "') AS transcript
+    FROM hits JOIN conversations c ON c.id = hits.id, query
+    ORDER BY hits.rank DESC, c.id DESC
+""")
+
+SQLITE_SEARCH = text(f"""
+    SELECT c.id, c.created_at, c.sentiment_score, -bm25(conversations_fts, 2.0, 1.0) AS rank,
+        highlight(conversations_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') AS summary,
+        snippet(conversations_fts, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', ' … ', 24) AS transcript
+    FROM conversations_fts JOIN conversations c ON c.id = conversations_fts.rowid
+    WHERE conversations_fts MATCH :q AND c.user_id = :user_id
+    ORDER BY bm25(conversations_fts, 2.0, 1.0), c.id DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def ensure_search_schema(engine):
+    """Create the search column/index (Postgres) or FTS table and triggers (SQLite). Idempotent."""
+    if engine.dialect.name == "postgresql":
+        statements = POSTGRES_SCHEMA
+    elif engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'conversations_fts'")).first()
+        statements = [] if exists else SQLITE_SCHEMA
+    else:
+        raise NotImplementedError(f"Full-text search is not available on {engine.dialect.name}")
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def _fts5_query(q):
+    # Quote every term so user input cannot use FTS5 syntax; the terms are ANDed
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def search_conversations(db, user_id, q, limit=20, offset=0):
+    """Ranked, highlighted matches of q among the user's conversations (best first)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement, query = POSTGRES_SEARCH, q
+    else:
+        statement, query = SQLITE_SEARCH, _fts5_query(q)
+    if not query.strip():
+        return []
+    rows = db.execute(statement, {"q": query, "user_id": user_id, "limit": limit, "offset": offset})
+    return [dict(row._mapping) for row in rows]
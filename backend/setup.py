@@ -1,9 +1,36 @@
 # create_db.py
 # This script creates the database tables defined in the models. (just used once, removed later)
 # backend/create_db.py
-from app.database import Base, engine
-from app import models
+import os
+import sys
+
+# The app modules import each other by bare name (models.py does `from database import Base`), so
+# import them the same way here; via the app package they would load twice and register on another Base
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from database import Base, engine, SessionLocal
+import models
+from rollups import rebuild_rollups
 
 
 Base.metadata.create_all(bind=engine)
-print("done.")
\ No newline at end of file
+
+# create_all skips tables that already exist, so add indexes introduced later to them
+from sqlalchemy import inspect
+inspector = inspect(engine)
+for table in Base.metadata.sorted_tables:
+    existing = {index["name"] for index in inspector.get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(bind=engine)
+            print(f"Created index {index.name} on {table.name}.")
+
+# Full-text search index (tsvector + GIN on Postgres, FTS5 on SQLite)
+from search import ensure_search_schema
+ensure_search_schema(engine)
+print(f"Full-text search ready ({engine.dialect.name}).")
+
+# Backfill the daily rollups from the existing conversations
+print(f"{rebuild_rollups(SessionLocal())} rollup rows built.")
+
+print("done.")
@@ -1,47 +1,80 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import Navbar from '../components/Navbar';
 import { BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 
 const REACT_APP_API_URL = process.env.REACT_APP_API_URL;
+const PAGE_SIZE = 50;
 
-function aggregateEmotions(conversations) {
-  const totals = {};
-
-  conversations.forEach((c) => {
-    const scores = c.emotion_scores || {};
-    Object.entries(scores).forEach(([emotion, score]) => {
-      totals[emotion] = (totals[emotion] || 0) + score;
-    });
-  });
-
-  return Object.entries(totals)
+// Chart data from the server-side totals of GET /conversations/stats
+function emotionChartData(totals) {
+  return Object.entries(totals?.emotion_sums || {})
     .map(([emotion, score]) => ({ emotion, score }))
     .sort((a, b) => b.score - a.score);
 }
 
-function aggregateSentiments(conversations) {
+function sentimentChartData(totals) {
   const counts = { positive: 0, neutral: 0, negative: 0 };
-
-  conversations.forEach((c) => {
-    const sentiment = (c.sentiment_score || "").toLowerCase();
+  Object.entries(totals?.sentiment || {}).forEach(([sentiment, count]) => {
     if (sentiment in counts) {
-      counts[sentiment] += 1;
+      counts[sentiment] = count;
     }
   });
 
   return Object.entries(counts).map(([sentiment, count]) => ({ sentiment, count }));
 }
 
+// Render search excerpts, where the server wraps matches in <mark></mark>, without injecting HTML
+function Highlighted({ text }) {
+  if (!text) {
+    return null;
+  }
+  return text.split(/<\/?mark>/).map((part, i) =>
+    i % 2 === 1 ? <mark key={i}>{part}</mark> : <React.Fragment key={i}>{part}</React.Fragment>
+  );
+}
+
 function DashboardPage() {
   const [conversations, setConversations] = useState([]);
   const [filteredConversations, setFilteredConversations] = useState([]);
   const [searchQuery, setSearchQuery] = useState("");
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextSearchOffset, setNextSearchOffset] = useState(null);
+  const activeQuery = useRef(""); // The query the search results shown belong to
   const [businessName, setBusinessName] = useState(""); // State for business name
 
-  const emotionData = aggregateEmotions(conversations);
-  const sentimentData = aggregateSentiments(conversations);
+  const [stats, setStats] = useState(null);
+
+  const emotionData = emotionChartData(stats?.totals);
+  const sentimentData = sentimentChartData(stats?.totals);
+
+  // Fetch one page of conversations (without transcripts) and append it to the list
+  const fetchConversations = (cursor) => {
+    const token = localStorage.getItem("token");
+    return axios
+      .get(`${REACT_APP_API_URL}/conversations/`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+        params: { limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+      })
+      .then((res) => {
+        const items = Array.isArray(res.data?.items) ? res.data.items : [];
+        setConversations((previous) => (cursor ? [...previous, ...items] : items));
+        setNextCursor(res.data?.next_cursor || null);
+      });
+  };
+
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchConversations(nextCursor)
+      .catch((err) => {
+        console.error("Failed to fetch conversations:", err.response?.data || err.message);
+      })
+      .finally(() => setLoadingMore(false));
+  };
 
   useEffect(() => {
     const token = localStorage.getItem("token");
@@ -69,17 +102,23 @@ function DashboardPage() {
         }
       });
 
-    // Fetch conversations
+    // Fetch the insight totals
     axios
-      .get(`${REACT_APP_API_URL}/conversations/`, {
+      .get(`${REACT_APP_API_URL}/conversations/stats`, {
         headers: {
           Authorization: `Bearer ${token}`,
         },
       })
       .then((res) => {
-        const data = Array.isArray(res.data) ? res.data : [];
-        setConversations(data);
-        setFilteredConversations(data);
+        setStats(res.data);
+      })
+      .catch((err) => {
+        console.error("Failed to fetch conversation stats:", err.response?.data || err.message);
+      });
+
+    // Fetch the first page of conversations
+    fetchConversations(null)
+      .then(() => {
         setLoading(false);
       })
       .catch((err) => {
@@ -88,38 +127,66 @@ function DashboardPage() {
         setFilteredConversations([]);
         setLoading(false);
       });
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  useEffect(() => {
-    const normalizeString = (str) =>
-      str
-        ?.toLowerCase()
-        .replace(/[^a-z0-9\s]/gi, " ")
-        .replace(/\s+/g, " ")
-        .trim();
+  // Fetch one page of search results; later pages are appended unless the query has changed since
+  const fetchSearchResults = (query, offset) => {
+    const token = localStorage.getItem("token");
+    return axios
+      .get(`${REACT_APP_API_URL}/conversations/search`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+        params: { q: query, ...(offset ? { offset } : {}) },
+      })
+      .then((res) => {
+        if (activeQuery.current !== query) {
+          return;
+        }
+        const items = Array.isArray(res.data?.items) ? res.data.items : [];
+        setFilteredConversations((previous) => (offset ? [...previous, ...items] : items));
+        setNextSearchOffset(res.data?.next_offset ?? null);
+      });
+  };
+
+  const loadMoreResults = () => {
+    setLoadingMore(true);
+    fetchSearchResults(activeQuery.current, nextSearchOffset)
+      .catch((err) => {
+        console.error("Search failed:", err.response?.data || err.message);
+      })
+      .finally(() => setLoadingMore(false));
+  };
 
+  // Without a query the list shows the loaded conversations
+  useEffect(() => {
     if (searchQuery.trim() === "") {
       setFilteredConversations(conversations);
-    } else {
-      setFilteredConversations(
-        conversations.filter((c) => {
-          const conversationName = normalizeString(c.name || `Conversation ${c.id}`);
-          const transcript = normalizeString(c.transcript || "");
-          const summary = normalizeString(c.summary || "");
-          const sentiment = normalizeString(c.sentiment_score || "");
-          const normalizedQuery = normalizeString(searchQuery);
-
-          return (
-            conversationName.includes(normalizedQuery) ||
-            transcript.includes(normalizedQuery) ||
-            summary.includes(normalizedQuery) ||
-            sentiment.includes(normalizedQuery)
-          );
-        })
-      );
     }
   }, [searchQuery, conversations]);
 
+  // Search on the server (ranked full-text search) once typing pauses
+  useEffect(() => {
+    const query = searchQuery.trim();
+    activeQuery.current = query; // Responses to queries the user has typed past are ignored
+    setNextSearchOffset(null);
+    if (query === "") {
+      return;
+    }
+
+    const timer = setTimeout(() => {
+      fetchSearchResults(query, 0).catch((err) => {
+        console.error("Search failed:", err.response?.data || err.message);
+        if (activeQuery.current === query) {
+          setFilteredConversations([]);
+        }
+      });
+    }, 300);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [searchQuery]);
+
   if (loading) {
     return <div className="flex items-center justify-center min-h-screen">Loading...</div>;
   }
@@ -175,7 +242,7 @@ function DashboardPage() {
         <div className="mb-4">
           <input
             type="text"
-            placeholder="Search conversations by name, keywords, date, or sentiment..."
+            placeholder="Search conversations by keywords in summaries and transcripts..."
             className="w-full p-2 border border-gray-300 rounded"
             value={searchQuery}
             onChange={(e) => setSearchQuery(e.target.value)}
@@ -197,11 +264,41 @@ function DashboardPage() {
                   <a className="text-blue-700 font-medium" href={`/conversation/${c.id}`}>
                     {conversationName}
                   </a>
+                  {searchQuery.trim() !== "" && (
+                    <div className="mt-2 text-sm text-gray-700 space-y-1">
+                      <p><Highlighted text={c.summary} /></p>
+                      <p className="text-gray-500"><Highlighted text={c.transcript} /></p>
+                    </div>
+                  )}
                 </li>
               );
             })}
           </ul>
         )}
+
+        {nextCursor && searchQuery.trim() === "" && (
+          <div className="mt-6 text-center">
+            <button
+              className="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700 disabled:opacity-50"
+              onClick={loadMore}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
+
+        {nextSearchOffset !== null && searchQuery.trim() !== "" && (
+          <div className="mt-6 text-center">
+            <button
+              className="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700 disabled:opacity-50"
+              onClick={loadMoreResults}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : "More results"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );